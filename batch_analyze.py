@@ -1,17 +1,20 @@
 import os
 import glob
-import subprocess
-import sys
-from datetime import datetime
 
-def batch_analyze_images(image_dir="test_images", mock=True, headless=True):
+from pdfexpy.utils.batch import BatchAnalyzer, print_progress
+
+def batch_analyze_images(image_dir="test_images", mock=True, headless=True, workers=None):
     """
     指定したディレクトリ内の画像を一括で分析します
     
+    画像ごとにプロセスを起動せず、モデルを常駐させたワーカープールで解析します
+    （pdfexpy.utils.batch.BatchAnalyzer を使用します）。
+    
     Args:
         image_dir (str): 画像が格納されているディレクトリパス
         mock (bool): モックデータを使用するかどうか
-        headless (bool): ヘッドレスモードで実行するかどうか
+        headless (bool): ヘッドレスモードで実行するかどうか（一括解析は常にヘッドレスで実行されます）
+        workers (int, optional): ワーカープロセス数（Noneの場合はCPUコア数）
     """
     # 画像ファイルのリストを取得
     image_files = glob.glob(os.path.join(image_dir, "*.png"))
@@ -20,40 +23,16 @@ def batch_analyze_images(image_dir="test_images", mock=True, headless=True):
         print(f"[エラー] {image_dir} ディレクトリに画像ファイルが見つかりません")
         return
     
+    if not headless:
+        print("[警告] 一括解析ではGUIモードは使用できないため、ヘッドレスモードで実行します")
+    
     print(f"[情報] {len(image_files)}個の画像ファイルを処理します")
     
-    # 各画像を処理
-    for i, image_file in enumerate(image_files, 1):
-        print(f"[処理中] {i}/{len(image_files)}: {image_file}")
-        
-        # コマンドを構築
-        cmd = [sys.executable, "-m", "pdfexpy.app", "--image", image_file]
-        
-        if mock:
-            cmd.append("--mock")
-        
-        if headless:
-            cmd.append("--headless")
-        
-        # 環境変数を設定
-        env = os.environ.copy()
-        env["PYTHONPATH"] = os.getcwd()
-        
-        # プロセスを実行
-        start_time = datetime.now()
-        result = subprocess.run(cmd, env=env, capture_output=True, text=True)
-        end_time = datetime.now()
-        
-        # 結果を表示
-        duration = (end_time - start_time).total_seconds()
-        
-        if result.returncode == 0:
-            print(f"[成功] 処理時間: {duration:.2f}秒")
-        else:
-            print(f"[失敗] 処理時間: {duration:.2f}秒")
-            print(f"エラー出力: {result.stderr}")
+    with BatchAnalyzer(output_dir="analysis_results", workers=workers, mock=mock) as analyzer:
+        summary = analyzer.run(image_files, progress_callback=print_progress)
     
-    print(f"[完了] 全ての画像処理が終了しました")
+    print(f"[完了] 全ての画像処理が終了しました: {summary['succeeded']}/{summary['total']}件成功 "
+          f"({summary['elapsed_seconds']:.2f}秒, {summary['images_per_second']:.1f}枚/秒)")
 
 if __name__ == "__main__":
     import argparse
@@ -62,11 +41,13 @@ if __name__ == "__main__":
     parser.add_argument("--dir", default="test_images", help="画像ディレクトリ")
     parser.add_argument("--no-mock", action="store_true", help="モックデータを使用しない")
     parser.add_argument("--no-headless", action="store_true", help="GUIモードで実行")
+    parser.add_argument("--workers", "-j", type=int, help="ワーカープロセス数")
     
     args = parser.parse_args()
     
     batch_analyze_images(
         image_dir=args.dir,
         mock=not args.no_mock,
-        headless=not args.no_headless
+        headless=not args.no_headless,
+        workers=args.workers
     ) 
\ No newline at end of file
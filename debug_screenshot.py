@@ -29,6 +29,7 @@ from pdfexpy.utils.screenshot_analyzer import (
     analyze_screenshot,
     debug_with_screenshot_analysis
 )
+from pdfexpy.utils.profiling import PROFILERS, Profiler
 
 
 def parse_arguments():
@@ -38,6 +39,10 @@ def parse_arguments():
     )
     
     # サブコマンドの設定
+    parser.add_argument("--profile", action="store_true", help="実行をプロファイルし、ステージごとの上位の関数を出力")
+    parser.add_argument("--profiler", default="cprofile", choices=PROFILERS, help="使用するプロファイラ")
+    parser.add_argument("--profile-dir", default="profiles", help="プロファイル結果の出力ディレクトリ")
+    
     subparsers = parser.add_subparsers(dest="command", help="実行するコマンド")
     
     # スクリーンショットを撮影するコマンド
@@ -52,6 +57,8 @@ def parse_arguments():
     analyze_parser.add_argument("--model", help="使用するYOLOモデルのパス")
     analyze_parser.add_argument("--confidence", type=float, default=0.25, help="検出の信頼度しきい値 (0-1)")
     analyze_parser.add_argument("--take-new", action="store_true", help="新しいスクリーンショットを撮影")
+    analyze_parser.add_argument("--visual-format", default="svg", choices=["svg", "json", "png", "jpg", "webp"],
+                                help="視覚的フィードバックの形式")
     
     # デバッグモードで実行するコマンド
     debug_parser = subparsers.add_parser("debug", help="デバッグモード（スクリーンショット撮影と解析）")
@@ -75,6 +82,14 @@ def main():
         args.model = None
         args.confidence = 0.25
     
+    if args.profile:
+        with Profiler(output_dir=args.profile_dir, profiler=args.profiler, name=f"profile_{args.command}"):
+            return run_command(args)
+    return run_command(args)
+
+
+def run_command(args):
+    """サブコマンドを実行します"""
     # スクリーンショットを撮影
     if args.command == "take":
         logger.info(f"スクリーンショットを撮影します")
@@ -95,7 +110,8 @@ def main():
             output_dir=args.output_dir,
             model_path=args.model,
             confidence=args.confidence,
-            take_new_screenshot=args.take_new
+            take_new_screenshot=args.take_new,
+            visual_format=args.visual_format
         )
         
         if result["success"]:
@@ -4,11 +4,13 @@
 import os
 import time
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-import json
 import pyautogui
 import logging
 
+from pdfexpy.utils.result_sink import ResultSink, JsonFileSink, iter_recent_records
+
 # ロガーの設定
 logging.basicConfig(
     level=logging.INFO,
@@ -17,17 +19,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class DevAssistant:
-    def __init__(self, base_dir: str = "dev_history"):
+    def __init__(self, base_dir: str = "dev_history", sink: ResultSink = None):
         """
         開発支援ツールの初期化
         
         Args:
             base_dir: 開発履歴を保存するベースディレクトリ
+            sink: コンテキスト情報の出力先（Noneの場合は記録ごとにJSONファイルを作成）
         """
         self.base_dir = Path(base_dir)
         self.screenshots_dir = self.base_dir / "screenshots"
         self.context_dir = self.base_dir / "context"
         self._ensure_directories()
+        self.sink = sink or JsonFileSink(self.context_dir, prefix="")
         
     def _ensure_directories(self):
         """必要なディレクトリを作成"""
@@ -66,11 +70,7 @@ class DevAssistant:
                 "screenshot_path": str(screenshot_path)
             }
             
-            context_filename = f"{context_name}_{timestamp}.json"
-            context_path = self.context_dir / context_filename
-            
-            with open(context_path, 'w', encoding='utf-8') as f:
-                json.dump(context_info, f, ensure_ascii=False, indent=2)
+            context_path = self.sink.write(context_info, context_name)
             
             logger.info(f"コンテキスト情報を保存しました: {context_path}")
             
@@ -91,20 +91,11 @@ class DevAssistant:
             list: 最近の記録のリスト
         """
         try:
-            # コンテキストファイルを時系列で取得
-            context_files = sorted(
-                self.context_dir.glob("*.json"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
-            
-            recent_contexts = []
-            for context_file in context_files[:limit]:
-                with open(context_file, 'r', encoding='utf-8') as f:
-                    context_info = json.load(f)
-                    recent_contexts.append(context_info)
+            # バッファ中の記録も含めて、新しいファイルから必要な件数だけ読み込む
+            self.sink.flush()
+            contexts = list(islice(iter_recent_records(self.context_dir), limit))
             
-            return recent_contexts
+            return sorted(contexts, key=lambda x: x.get("timestamp", ""), reverse=True)
             
         except Exception as e:
             logger.error(f"履歴の取得中にエラーが発生しました: {str(e)}")
@@ -5,13 +5,18 @@
 import os
 import sys
 import argparse
+import datetime
 from pathlib import Path
 import logging
 
 from pdfexpy.utils.logger import setup_logger, get_logger
 from pdfexpy.utils.config import load_config, save_config
 from pdfexpy.utils.screenshot import take_screenshot, ScreenshotError
-from pdfexpy.utils.image_analysis import analyze_image, ImageAnalysisError
+from pdfexpy.utils.image_analysis import analyze_image, watch_directory, ImageAnalysisError
+from pdfexpy.utils.inventory import write_inventory
+from pdfexpy.utils.manifest import open_manifest
+from pdfexpy.utils.profiling import PROFILERS, profiler_from_config
+from pdfexpy.utils.metrics import start_metrics_server
 from pdfexpy.models.model_loader import ModelLoader, test_model_loading
 
 # ロガー初期化
@@ -42,10 +47,13 @@ def parse_args():
     parser.add_argument("--image", "-i", type=str, help="解析する画像ファイルのパス")
     parser.add_argument("--watch-dir", "-w", type=str, help="画像ファイルを監視するディレクトリ")
     parser.add_argument("--delay", "-d", type=int, default=0, help="スクリーンショット取得前の遅延（秒）")
+    parser.add_argument("--inventory", type=str, help="ディレクトリ内の画像のメタデータ一覧（NDJSON）を作成")
     
     # 画像解析オプション
     parser.add_argument("--no-visual", action="store_true", help="視覚的フィードバックを生成しない")
     parser.add_argument("--analyze-only", action="store_true", help="画像解析のみを実行（スクリーンショットを撮影しない）")
+    parser.add_argument("--incremental", action="store_true",
+                      help="ディレクトリ監視で解析済みの画像をスキップする（設定の manifest.enabled と同じ）")
     
     # モデルテスト
     parser.add_argument("--test-model", "-t", type=str, 
@@ -55,6 +63,15 @@ def parse_args():
     # モックモード
     parser.add_argument("--mock", "-m", action="store_true", help="モックデータを使用（モデルをロードしない）")
     
+    # プロファイル
+    parser.add_argument("--profile", action="store_true", help="実行をプロファイルし、ステージごとの上位の関数を出力")
+    parser.add_argument("--profiler", choices=PROFILERS, help="使用するプロファイラ（デフォルトは設定の profiling.profiler）")
+    parser.add_argument("--profile-dir", type=str, help="プロファイル結果の出力ディレクトリ")
+    
+    # メトリクス
+    parser.add_argument("--metrics-port", type=int,
+                      help="実行中のメトリクスを Prometheus 形式で公開するポート（設定の metrics.port より優先）")
+    
     return parser.parse_args()
 
 
@@ -104,7 +121,8 @@ def process_screenshot(args, config):
                     image_path=filepath,
                     output_dir=analysis_dir,
                     generate_visual=generate_visual,
-                    mock=args.mock
+                    mock=args.mock,
+                    config=config
                 )
                 
                 if analysis_result["success"]:
@@ -186,7 +204,8 @@ def process_image_analysis(args, config):
             image_path=image_path,
             output_dir=analysis_dir,
             generate_visual=generate_visual,
-            mock=args.mock
+            mock=args.mock,
+            config=config
         )
         
         if analysis_result["success"]:
@@ -237,6 +256,26 @@ def main():
     config_path = args.config or "config.json"
     config = load_config(config_path)
     
+    metrics_server = start_metrics_server(config, port=args.metrics_port)
+    try:
+        if args.profile:
+            with profiler_from_config(config, profiler=args.profiler, output_dir=args.profile_dir):
+                run(args, config)
+        else:
+            run(args, config)
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+
+
+def run(args, config):
+    """
+    コマンドライン引数に応じた処理を実行します
+    
+    Args:
+        args: コマンドライン引数
+        config: 設定
+    """
     # ヘッドレスモード
     if args.headless:
         logger.info("ヘッドレスモードで実行します")
@@ -267,15 +306,41 @@ def main():
                 logger.error(f"画像解析に失敗しました: {result.get('error', '不明なエラー')}")
             return
         
+        # インベントリ作成
+        if args.inventory:
+            analysis_dir = args.output_dir or config.get("output", {}).get("analysis_dir", "analysis_results")
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            result = write_inventory(args.inventory, Path(analysis_dir) / f"inventory_{timestamp}.ndjson")
+            if result["success"]:
+                logger.info(f"インベントリの作成が完了しました: {result['output_file']}")
+            else:
+                logger.error(f"インベントリの作成に失敗しました: {result.get('error', '不明なエラー')}")
+            return
+        
         # ディレクトリ監視
         if args.watch_dir:
-            # TODO: ディレクトリ監視を実装
-            logger.info(f"ディレクトリの監視を開始します: {args.watch_dir}")
-            # watch_directory(args.watch_dir, args.output_dir)
+            if not os.path.isdir(args.watch_dir):
+                logger.error(f"指定されたディレクトリが存在しません: {args.watch_dir}")
+                return
+            analysis_dir = args.output_dir or config.get("output", {}).get("analysis_dir", "analysis_results")
+            manifest = open_manifest(config, analysis_dir, mock=args.mock, force=args.incremental)
+            try:
+                for result in watch_directory(args.watch_dir, analysis_dir,
+                                              generate_visual=not args.no_visual,
+                                              mock=args.mock, config=config, manifest=manifest):
+                    if result["success"]:
+                        logger.info(f"画像解析成功: {result['result_file']}")
+                    else:
+                        logger.error(f"画像解析に失敗しました: {result['image_path']}: {result['error']}")
+            except KeyboardInterrupt:
+                logger.info("ディレクトリの監視を終了します")
+            finally:
+                if manifest is not None:
+                    manifest.close()
             return
         
         # コマンドが指定されていない場合
-        logger.error("ヘッドレスモードでは --screenshot、--image、--watch-dir、または --test-model オプションが必要です")
+        logger.error("ヘッドレスモードでは --screenshot、--image、--inventory、--watch-dir、または --test-model オプションが必要です")
         return
     
     # GUIモード（デフォルト）
@@ -247,6 +247,9 @@ class MainWindow(QMainWindow):
             if load_time is not None:
                 text += f"  - ロード時間: {load_time:.2f}秒\n"
             
+            if loaded and model_status.get("memory_mb") is not None:
+                text += f"  - メモリ使用量: {model_status['memory_mb']:.1f}MB\n"
+            
             if error:
                 text += f"  - エラー: {error}\n"
             
@@ -3,9 +3,13 @@ AIモデルのロード機能を提供するモジュール
 """
 
 import os
+import gc
+import sys
 import time
 import importlib
+import threading
 import traceback
+from collections import OrderedDict
 from pathlib import Path
 
 try:
@@ -20,7 +24,15 @@ try:
 except ImportError:
     TESSERACT_AVAILABLE = False
 
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
 from pdfexpy.utils.logger import get_logger
+from pdfexpy.utils.metrics import get_metrics
+from .ocr_engine import get_engine_pool_usage, shutdown_engine_pools
 
 logger = get_logger(__name__)
 
@@ -30,6 +42,48 @@ class ModelLoadError(Exception):
     pass
 
 
+def get_process_memory() -> int:
+    """
+    現在のプロセスの常駐メモリ (RSS) を取得します
+    
+    Returns:
+        int: 常駐メモリ（バイト）。取得できない場合は0
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def estimate_model_memory(model) -> int:
+    """
+    モデルが保持するパラメータのメモリ量を見積もります
+    
+    Args:
+        model: ロード済みのモデル
+        
+    Returns:
+        int: 見積もりメモリ量（バイト）
+    """
+    try:
+        # TensorFlow/Kerasモデル
+        if hasattr(model, "weights"):
+            return int(sum(w.shape.num_elements() * w.dtype.size for w in model.weights))
+        
+        # PyTorchモデル（ultralyticsなど）
+        inner = getattr(model, "model", model)
+        if hasattr(inner, "parameters"):
+            return int(sum(p.numel() * p.element_size() for p in inner.parameters()))
+    except Exception as e:
+        logger.debug(f"モデルのメモリ量を見積もれませんでした: {e}")
+    
+    return sys.getsizeof(model)
+
+
 class ModelLoader:
     """
     AIモデルをロードするための基本クラス
@@ -44,11 +98,31 @@ class ModelLoader:
         self.config = config or {}
         self.models = {}
         self.model_status = {
-            "mobilenet": {"loaded": False, "error": None, "time": None},
-            "cocossd": {"loaded": False, "error": None, "time": None},
-            "tesseract": {"loaded": False, "error": None, "time": None}
+            "mobilenet": {"loaded": False, "error": None, "time": None, "memory_mb": 0.0, "last_used": None},
+            "cocossd": {"loaded": False, "error": None, "time": None, "memory_mb": 0.0, "last_used": None},
+            "tesseract": {"loaded": False, "error": None, "time": None, "memory_mb": 0.0, "last_used": None}
+        }
+        
+        # メモリ管理（使用順に並べ、先頭が最も長く使われていないモデル）
+        cache_config = self.config.get("model_cache", {})
+        self.memory_budget_mb = cache_config.get("memory_budget_mb")
+        self.idle_timeout_seconds = cache_config.get("idle_timeout_seconds")
+        self._memory_bytes = {}
+        self._pool_memory_bytes = 0
+        self._lru = OrderedDict()
+        self._lock = threading.RLock()
+        self._loaders = {
+            "mobilenet": self.load_mobilenet_model,
+            "cocossd": self.load_cocossd_model,
+            "tesseract": self.load_tesseract_model
         }
         
+        # アイドル時間・メモリ予算を定期的に確認するスレッド
+        self._monitor_stop = threading.Event()
+        self._monitor_thread = None
+        if self.idle_timeout_seconds or self.memory_budget_mb:
+            self._start_monitor()
+        
         # TensorFlowの警告を抑制
         if TF_AVAILABLE:
             try:
@@ -84,6 +158,7 @@ class ModelLoader:
             
         try:
             start_time = time.time()
+            memory_before = get_process_memory()
             logger.info(f"{model_name}モデルをロードしています...")
             
             if not TF_AVAILABLE:
@@ -103,17 +178,11 @@ class ModelLoader:
                 dummy_input = preprocess_input(dummy_input)
                 _ = model(dummy_input)
                 
-                # モデルを保存
-                self.models["mobilenet"] = model
-                
                 elapsed = time.time() - start_time
                 logger.info(f"{model_name}モデルのロードが完了しました ({elapsed:.2f}秒)")
                 
-                self.model_status[model_name] = {
-                    "loaded": True, 
-                    "error": None, 
-                    "time": elapsed
-                }
+                # モデルを保存
+                self._register_model(model_name, model, elapsed, memory_before)
                 
                 return {
                     "success": True,
@@ -136,7 +205,9 @@ class ModelLoader:
             self.model_status[model_name] = {
                 "loaded": False, 
                 "error": error_msg, 
-                "time": elapsed
+                "time": elapsed,
+                "memory_mb": 0.0,
+                "last_used": None
             }
             
             return {
@@ -163,6 +234,7 @@ class ModelLoader:
             
         try:
             start_time = time.time()
+            memory_before = get_process_memory()
             logger.info(f"{model_name}モデルをロードしています...")
             
             if not TF_AVAILABLE:
@@ -182,17 +254,11 @@ class ModelLoader:
                 
                 model = DummyCocoSSD()
                 
-                # モデルを保存
-                self.models["cocossd"] = model
-                
                 elapsed = time.time() - start_time
                 logger.info(f"{model_name}モデルのロードが完了しました ({elapsed:.2f}秒)")
                 
-                self.model_status[model_name] = {
-                    "loaded": True, 
-                    "error": None, 
-                    "time": elapsed
-                }
+                # モデルを保存
+                self._register_model(model_name, model, elapsed, memory_before)
                 
                 return {
                     "success": True,
@@ -217,7 +283,9 @@ class ModelLoader:
             self.model_status[model_name] = {
                 "loaded": False, 
                 "error": error_msg, 
-                "time": elapsed
+                "time": elapsed,
+                "memory_mb": 0.0,
+                "last_used": None
             }
             
             return {
@@ -244,6 +312,7 @@ class ModelLoader:
             
         try:
             start_time = time.time()
+            memory_before = get_process_memory()
             logger.info(f"{model_name}モデルをロードしています...")
             
             if not TESSERACT_AVAILABLE:
@@ -264,21 +333,15 @@ class ModelLoader:
                     if single_lang.strip() not in languages:
                         logger.warning(f"言語 '{single_lang}' が利用可能な言語リストにありません")
                 
+                elapsed = time.time() - start_time
+                logger.info(f"{model_name}モデルのロードが完了しました ({elapsed:.2f}秒)")
+                
                 # モデルを保存（Tesseractの場合は特に何も保存しない）
-                self.models["tesseract"] = {
+                self._register_model(model_name, {
                     "version": tesseract_version,
                     "languages": languages,
                     "config": model_config.get("config", "--psm 3")
-                }
-                
-                elapsed = time.time() - start_time
-                logger.info(f"{model_name}モデルのロードが完了しました ({elapsed:.2f}秒)")
-                
-                self.model_status[model_name] = {
-                    "loaded": True, 
-                    "error": None, 
-                    "time": elapsed
-                }
+                }, elapsed, memory_before)
                 
                 return {
                     "success": True,
@@ -303,7 +366,9 @@ class ModelLoader:
             self.model_status[model_name] = {
                 "loaded": False, 
                 "error": error_msg, 
-                "time": elapsed
+                "time": elapsed,
+                "memory_mb": 0.0,
+                "last_used": None
             }
             
             return {
@@ -315,6 +380,262 @@ class ModelLoader:
                 "message": f"モデルのロードに失敗しました: {error_msg}"
             }
     
+    def _register_model(self, model_name, model, elapsed, memory_before):
+        """
+        ロードしたモデルを登録し、メモリ使用量を記録します
+        
+        Args:
+            model_name (str): モデル名
+            model: ロードしたモデル
+            elapsed (float): ロード時間（秒）
+            memory_before (int): ロード前のプロセスの常駐メモリ（バイト）
+        """
+        # 常駐メモリの増分とパラメータ量の見積もりの大きい方を採用する
+        memory_bytes = max(get_process_memory() - memory_before, estimate_model_memory(model), 0)
+        
+        with self._lock:
+            self.models[model_name] = model
+            self._memory_bytes[model_name] = memory_bytes
+            self._lru[model_name] = time.time()
+            self._lru.move_to_end(model_name)
+            
+            self.model_status[model_name] = {
+                "loaded": True, 
+                "error": None, 
+                "time": elapsed,
+                "memory_mb": memory_bytes / (1024 * 1024),
+                "last_used": self._lru[model_name]
+            }
+        
+        get_metrics().set("pdfexpy_model_loaded", 1, model=model_name)
+        get_metrics().set("pdfexpy_model_load_seconds", elapsed, model=model_name)
+        
+        logger.info(f"{model_name}モデルのメモリ使用量: {memory_bytes / (1024 * 1024):.1f}MB "
+                    f"(合計: {self.get_total_memory_mb():.1f}MB)")
+        
+        self._enforce_memory_budget(keep=model_name)
+    
+    def touch(self, model_name):
+        """
+        モデルを使用したことを記録し、LRUの順序を更新します
+        
+        Args:
+            model_name (str): モデル名
+        """
+        with self._lock:
+            if model_name not in self._lru:
+                return
+            self._lru[model_name] = time.time()
+            self._lru.move_to_end(model_name)
+            self.model_status[model_name]["last_used"] = self._lru[model_name]
+    
+    def _sync_engine_pools(self):
+        """
+        常駐OCRワーカープールの使用状況をtesseractモデルのメモリ・使用時刻に反映します
+        
+        OCRワーカーは解析時に遅延起動され、ワーカーごとにtraineddataを保持するため、
+        tesseractモデルの実際のメモリ使用量の大部分を占めます。
+        """
+        usage = get_engine_pool_usage()
+        with self._lock:
+            self._pool_memory_bytes = usage["memory_bytes"]
+            if not usage["pools"]:
+                if "tesseract" not in self.models:
+                    self._lru.pop("tesseract", None)
+                return
+            
+            last_used = usage["last_used"] or time.time()
+            if last_used > self._lru.get("tesseract", 0):
+                self._lru["tesseract"] = last_used
+                self._lru.move_to_end("tesseract")
+            
+            status = self.model_status["tesseract"]
+            status["memory_mb"] = (self._memory_bytes.get("tesseract", 0) + usage["memory_bytes"]) / (1024 * 1024)
+            status["last_used"] = self._lru["tesseract"]
+            status["workers"] = usage["pools"]
+    
+    def _model_memory_bytes(self, model_name):
+        """
+        モデルのメモリ使用量を取得します（tesseractは常駐OCRワーカーを含む）
+        
+        Args:
+            model_name (str): モデル名
+            
+        Returns:
+            int: メモリ使用量（バイト）
+        """
+        memory = self._memory_bytes.get(model_name, 0)
+        if model_name == "tesseract":
+            memory += self._pool_memory_bytes
+        return memory
+    
+    def get_total_memory_mb(self):
+        """
+        ロード中のモデルの合計メモリ使用量を取得します
+        
+        Returns:
+            float: 合計メモリ使用量 (MB)
+        """
+        with self._lock:
+            return (sum(self._memory_bytes.values()) + self._pool_memory_bytes) / (1024 * 1024)
+    
+    def get_memory_report(self):
+        """
+        モデルごとのメモリ使用量のレポートを取得します
+        
+        Returns:
+            dict: 合計・予算・モデルごとのメモリ使用量
+        """
+        self._sync_engine_pools()
+        return {
+            "total_mb": self.get_total_memory_mb(),
+            "budget_mb": self.memory_budget_mb,
+            "process_rss_mb": get_process_memory() / (1024 * 1024),
+            "models": {
+                name: {
+                    "loaded": status.get("loaded", False),
+                    "memory_mb": status.get("memory_mb", 0.0),
+                    "last_used": status.get("last_used")
+                }
+                for name, status in self.model_status.items()
+            }
+        }
+    
+    def unload_model(self, model_name):
+        """
+        モデルをアンロードしてメモリを解放します
+        
+        Args:
+            model_name (str): モデル名
+            
+        Returns:
+            bool: アンロードした場合はTrue
+        """
+        with self._lock:
+            if model_name not in self.models and model_name not in self._lru:
+                return False
+            
+            freed_mb = self._model_memory_bytes(model_name) / (1024 * 1024)
+            self._memory_bytes.pop(model_name, None)
+            self.models.pop(model_name, None)
+            self._lru.pop(model_name, None)
+            
+            # 常駐OCRワーカーも終了する
+            if model_name == "tesseract":
+                self._pool_memory_bytes = 0
+                shutdown_engine_pools()
+            
+            gc.collect()
+            
+            status = self.model_status.setdefault(model_name, {})
+            status.update({"loaded": False, "memory_mb": 0.0})
+        
+        get_metrics().set("pdfexpy_model_loaded", 0, model=model_name)
+        logger.info(f"{model_name}モデルをアンロードしました (解放: {freed_mb:.1f}MB)")
+        return True
+    
+    def _enforce_memory_budget(self, keep=None):
+        """
+        メモリ予算を超えている場合、最も長く使われていないモデルからアンロードします
+        
+        Args:
+            keep (str, optional): アンロード対象から除外するモデル名
+        """
+        if not self.memory_budget_mb:
+            return
+        
+        self._sync_engine_pools()
+        with self._lock:
+            for model_name in list(self._lru):
+                if self.get_total_memory_mb() <= self.memory_budget_mb:
+                    break
+                if model_name != keep:
+                    logger.info(f"メモリ予算 ({self.memory_budget_mb}MB) を超えたため、"
+                                f"{model_name}モデルをアンロードします")
+                    self.unload_model(model_name)
+            
+            if self.get_total_memory_mb() > self.memory_budget_mb:
+                logger.warning(f"モデルの合計メモリ使用量 ({self.get_total_memory_mb():.1f}MB) が"
+                               f"予算 ({self.memory_budget_mb}MB) を超えています")
+    
+    def unload_idle_models(self, idle_seconds=None, keep=None):
+        """
+        一定時間使われていないモデルをアンロードします
+        
+        Args:
+            idle_seconds (float, optional): アイドル時間のしきい値（秒）。Noneの場合は設定値
+            keep (str, optional): アンロード対象から除外するモデル名
+            
+        Returns:
+            list: アンロードしたモデル名のリスト
+        """
+        idle_seconds = idle_seconds if idle_seconds is not None else self.idle_timeout_seconds
+        if idle_seconds is None:
+            return []
+        
+        self._sync_engine_pools()
+        with self._lock:
+            now = time.time()
+            idle = [name for name, last_used in self._lru.items()
+                    if now - last_used >= idle_seconds and name != keep]
+            for model_name in idle:
+                logger.info(f"{model_name}モデルが{idle_seconds}秒以上使われていないため、アンロードします")
+                self.unload_model(model_name)
+        return idle
+    
+    def _start_monitor(self):
+        """
+        アイドル時間とメモリ予算を定期的に確認するデーモンスレッドを起動します
+        """
+        interval = min(self.idle_timeout_seconds / 2, 60) if self.idle_timeout_seconds else 30
+        
+        def monitor():
+            while not self._monitor_stop.wait(interval):
+                try:
+                    self.unload_idle_models()
+                    self._enforce_memory_budget()
+                except Exception as e:
+                    logger.warning(f"モデルのメモリ管理中にエラーが発生しました: {e}")
+        
+        self._monitor_thread = threading.Thread(target=monitor, name="pdfexpy-model-monitor", daemon=True)
+        self._monitor_thread.start()
+    
+    def close(self):
+        """
+        監視スレッドを停止します
+        """
+        self._monitor_stop.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join()
+            self._monitor_thread = None
+    
+    async def get_model(self, model_name):
+        """
+        モデルを取得します。アンロードされている場合は再ロードします
+        
+        Args:
+            model_name (str): モデル名
+            
+        Returns:
+            object: ロード済みのモデル。ロードに失敗した場合はNone
+        """
+        # 要求されたモデル以外のアイドル中のモデルを先に解放する
+        self.unload_idle_models(keep=model_name)
+        
+        if model_name not in self.models:
+            loader = self._loaders.get(model_name)
+            if loader is None:
+                logger.warning(f"未知のモデル名: {model_name}")
+                return None
+            await loader()
+            if model_name not in self.models:
+                return None
+        
+        # 使用順を更新する
+        self.touch(model_name)
+        
+        return self.models[model_name]
+    
     async def load_models(self, models_to_load=None):
         """
         指定された、または全てのモデルをロードします
@@ -0,0 +1,405 @@
+"""
+常駐型のTesseract OCRエンジンを提供するモジュール
+
+言語設定ごとに長寿命のワーカープロセスを起動し、各ワーカー内で初期化済みの
+Tesseractエンジンを使い回します。tesserocr (C APIバインディング) が利用可能な場合は
+traineddataを一度だけ読み込み、利用できない場合はpytesseractにフォールバックします。
+"""
+
+import os
+import time
+import atexit
+import shlex
+import threading
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Tuple
+
+# 画像処理
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Tesseract C APIバインディング（常駐エンジン）
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Tesseractコマンドラインラッパー（フォールバック）
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+TESSERACT_AVAILABLE = TESSEROCR_AVAILABLE or PYTESSERACT_AVAILABLE
+
+from pdfexpy.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class OCREngineError(Exception):
+    """OCRエンジンのエラーを表すカスタム例外"""
+    pass
+
+
+def parse_tesseract_config(config: str) -> Dict[str, Any]:
+    """
+    Tesseractのコマンドライン設定文字列を解析します
+
+    Args:
+        config (str): 設定文字列（例: "--psm 6 --oem 1 -c preserve_interword_spaces=1"）
+
+    Returns:
+        Dict[str, Any]: psm, oem, variablesを含む辞書
+    """
+    result = {"psm": None, "oem": None, "variables": {}}
+    tokens = shlex.split(config or "")
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ("--psm", "--oem") and i + 1 < len(tokens):
+            result[token[2:]] = int(tokens[i + 1])
+            i += 2
+        elif token == "-c" and i + 1 < len(tokens) and "=" in tokens[i + 1]:
+            name, value = tokens[i + 1].split("=", 1)
+            result["variables"][name] = value
+            i += 2
+        else:
+            i += 1
+
+    return result
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """
+    使用するOCRバックエンドを決定します
+
+    Args:
+        backend (str): 'auto'、'tesserocr'、'pytesseract'のいずれか
+
+    Returns:
+        str: 使用するバックエンド名
+
+    Raises:
+        OCREngineError: 利用可能なバックエンドがない場合
+    """
+    if backend == "auto":
+        if TESSEROCR_AVAILABLE:
+            return "tesserocr"
+        if PYTESSERACT_AVAILABLE:
+            return "pytesseract"
+        raise OCREngineError("tesserocrまたはpytesseractがインストールされていません。'pip install tesserocr' を実行してください。")
+
+    if backend == "tesserocr" and not TESSEROCR_AVAILABLE:
+        raise OCREngineError("tesserocrがインストールされていません")
+    if backend == "pytesseract" and not PYTESSERACT_AVAILABLE:
+        raise OCREngineError("pytesseractがインストールされていません")
+    if backend not in ("tesserocr", "pytesseract"):
+        raise OCREngineError(f"未知のOCRバックエンド: {backend}")
+
+    return backend
+
+
+class TesseractEngine:
+    """初期化済みのTesseractを保持し、繰り返し認識を行うエンジン"""
+
+    def __init__(self, language: str = "jpn+eng", config: str = "--psm 6", backend: str = "auto"):
+        """
+        エンジンを初期化します
+
+        Args:
+            language (str): Tesseractの言語設定
+            config (str): Tesseractの追加設定
+            backend (str): 'auto'、'tesserocr'、'pytesseract'のいずれか
+        """
+        self.language = language
+        self.config = config
+        self.backend = resolve_backend(backend)
+        self._api = None
+
+        if self.backend == "tesserocr":
+            # traineddataの読み込みはここで一度だけ行う
+            options = parse_tesseract_config(config)
+            kwargs = {"lang": language}
+            if options["psm"] is not None:
+                kwargs["psm"] = options["psm"]
+            if options["oem"] is not None:
+                kwargs["oem"] = options["oem"]
+            self._api = tesserocr.PyTessBaseAPI(**kwargs)
+            for name, value in options["variables"].items():
+                self._api.SetVariable(name, value)
+
+    def recognize(self, crop) -> Dict[str, Any]:
+        """
+        画像のテキストを認識します
+
+        Args:
+            crop (np.ndarray): 認識する画像配列
+
+        Returns:
+            Dict[str, Any]: 認識したテキストと信頼度 (0.0-1.0)
+        """
+        image = Image.fromarray(crop)
+
+        if self._api is not None:
+            self._api.SetImage(image)
+            text = self._api.GetUTF8Text()
+            confidences = [c for c in self._api.AllWordConfidences() if c >= 0]
+            self._api.Clear()
+            lines = [line.strip() for line in text.splitlines() if line.strip()]
+        else:
+            data = pytesseract.image_to_data(
+                image, lang=self.language, config=self.config,
+                output_type=pytesseract.Output.DICT
+            )
+
+            # 行ごとに単語をまとめる
+            grouped = {}
+            confidences = []
+            for i, word in enumerate(data["text"]):
+                word = word.strip()
+                conf = float(data["conf"][i])
+                if not word or conf < 0:
+                    continue
+                key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                grouped.setdefault(key, []).append(word)
+                confidences.append(conf)
+            lines = [" ".join(words) for _, words in sorted(grouped.items())]
+
+        confidence = sum(confidences) / len(confidences) / 100 if confidences else 0.0
+        return {"text": "\n".join(lines), "confidence": confidence}
+
+    def close(self):
+        """
+        エンジンが保持するリソースを解放します
+        """
+        if self._api is not None:
+            self._api.End()
+            self._api = None
+
+
+# ワーカープロセス内で常駐するエンジン
+_worker_engine = None
+
+
+def _process_memory(pid: int) -> int:
+    """
+    指定したプロセスの常駐メモリ (RSS) を取得します
+
+    Args:
+        pid (int): プロセスID
+
+    Returns:
+        int: 常駐メモリ（バイト）。取得できない場合は0
+    """
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return 0
+
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _init_worker(language: str, config: str, backend: str, thread_limit: int = 1):
+    """
+    ワーカープロセスの初期化処理（エンジンを一度だけ生成します）
+
+    OMP_THREAD_LIMITはワーカープロセスの環境変数にのみ設定し、親プロセスの環境は変更しません。
+    pytesseractが起動するtesseractプロセスはこの値を引き継ぎます。
+
+    Args:
+        language (str): Tesseractの言語設定
+        config (str): Tesseractの追加設定
+        backend (str): 使用するバックエンド
+        thread_limit (int): OpenMPスレッド数の上限
+    """
+    global _worker_engine
+    os.environ["OMP_THREAD_LIMIT"] = str(thread_limit)
+    _worker_engine = TesseractEngine(language, config, backend)
+
+
+def _recognize_in_worker(crop) -> Dict[str, Any]:
+    """
+    ワーカープロセス内の常駐エンジンで認識を行います
+
+    Args:
+        crop (np.ndarray): 認識する画像配列
+
+    Returns:
+        Dict[str, Any]: 認識したテキストと信頼度
+    """
+    return _worker_engine.recognize(crop)
+
+
+class TesseractEnginePool:
+    """言語設定ごとに常駐エンジンを持つワーカープロセスのプール"""
+
+    def __init__(self, language: str = "jpn+eng", config: str = "--psm 6",
+                 max_workers: Optional[int] = None, thread_limit: int = 1, backend: str = "auto"):
+        """
+        プールを初期化します
+
+        Args:
+            language (str): Tesseractの言語設定
+            config (str): Tesseractの追加設定
+            max_workers (Optional[int]): ワーカー数。Noneの場合はCPUコア数をthread_limitで割った数
+            thread_limit (int): ワーカーごとのOpenMPスレッド数の上限（過剰なスレッド生成を防ぎます）
+            backend (str): 'auto'、'tesserocr'、'pytesseract'のいずれか
+        """
+        self.language = language
+        self.config = config
+        self.thread_limit = max(1, int(thread_limit))
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // self.thread_limit)
+        self.backend = resolve_backend(backend)
+
+        logger.info(f"OCRエンジンプールを起動します (言語: {language}, バックエンド: {self.backend}, "
+                    f"ワーカー数: {self.max_workers}, スレッド上限: {self.thread_limit})")
+        self.broken = False
+        self.last_used = time.time()
+
+        # ワーカーは投入時に遅延して起動されるため、OMP_THREAD_LIMITは親プロセスではなく
+        # 各ワーカーの初期化処理で設定する（親や他のサブプロセスに上限が漏れないようにする）
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(language, config, self.backend, self.thread_limit)
+        )
+
+    def submit(self, crop) -> Future:
+        """
+        認識処理をプールに投入します
+
+        Args:
+            crop (np.ndarray): 認識する画像配列
+
+        Returns:
+            Future: 認識結果を返すFuture
+        """
+        self.last_used = time.time()
+        try:
+            future = self._executor.submit(_recognize_in_worker, crop)
+        except BrokenProcessPool:
+            self.broken = True
+            raise
+        future.add_done_callback(self._check_broken)
+        return future
+
+    def _check_broken(self, future: Future):
+        """
+        ワーカーの異常終了（初期化失敗など）を検出し、プールを使用不可として記録します
+
+        Args:
+            future (Future): 完了したFuture
+        """
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self.broken = True
+
+    def recognize(self, crop) -> Dict[str, Any]:
+        """
+        認識処理を実行し、結果を待ちます
+
+        Args:
+            crop (np.ndarray): 認識する画像配列
+
+        Returns:
+            Dict[str, Any]: 認識したテキストと信頼度
+        """
+        return self.submit(crop).result()
+
+    def memory_bytes(self) -> int:
+        """
+        ワーカープロセスの常駐メモリ (RSS) の合計を取得します
+
+        Returns:
+            int: 常駐メモリの合計（バイト）。取得できない場合は0
+        """
+        # ProcessPoolExecutorはワーカーのPIDを公開していないため、内部の辞書から取得する
+        processes = getattr(self._executor, "_processes", None) or {}
+        return sum(_process_memory(pid) for pid in list(processes))
+
+    def shutdown(self, wait: bool = True):
+        """
+        ワーカープロセスを終了します
+
+        Args:
+            wait (bool): ワーカーの終了を待つかどうか
+        """
+        self._executor.shutdown(wait=wait)
+
+
+# 設定ごとのエンジンプール
+_pools: Dict[Tuple, TesseractEnginePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_engine_pool(language: str = "jpn+eng", config: str = "--psm 6",
+                    max_workers: Optional[int] = None, thread_limit: int = 1,
+                    backend: str = "auto") -> TesseractEnginePool:
+    """
+    設定に対応するエンジンプールを取得します（なければ起動します）
+
+    Args:
+        language (str): Tesseractの言語設定
+        config (str): Tesseractの追加設定
+        max_workers (Optional[int]): ワーカー数
+        thread_limit (int): ワーカーごとのOpenMPスレッド数の上限
+        backend (str): 'auto'、'tesserocr'、'pytesseract'のいずれか
+
+    Returns:
+        TesseractEnginePool: エンジンプール
+    """
+    key = (language, config, max_workers, thread_limit, backend)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.broken:
+            # ワーカーの初期化に失敗したプールは再利用せず、作り直す
+            logger.warning("OCRエンジンプールが異常終了したため、再起動します")
+            pool.shutdown(wait=False)
+            pool = None
+        if pool is None:
+            pool = TesseractEnginePool(language, config, max_workers, thread_limit, backend)
+            _pools[key] = pool
+        return pool
+
+
+def get_engine_pool_usage() -> Dict[str, Any]:
+    """
+    起動中のエンジンプールの使用状況を取得します
+
+    Returns:
+        Dict[str, Any]: プール数、ワーカーの常駐メモリの合計、最終使用時刻
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {
+        "pools": len(pools),
+        "memory_bytes": sum(pool.memory_bytes() for pool in pools),
+        "last_used": max((pool.last_used for pool in pools), default=None)
+    }
+
+
+def shutdown_engine_pools():
+    """
+    起動中の全エンジンプールを終了します
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+atexit.register(shutdown_engine_pools)
@@ -2,6 +2,7 @@
 YOLOv8モデルを扱うためのクラス
 """
 import os
+import time
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
@@ -46,34 +47,49 @@ class YOLOModel:
             self.logger.error("YOLOモデルをロードできません: ultralytics がインポートできません")
             return False
         
+        # pdfexpy.models の初期化中に pdfexpy.utils を読み込まないよう、ここでインポートする
+        from pdfexpy.utils.metrics import get_metrics
+        
         try:
             self.logger.info(f"YOLOモデルをロードしています: {self.model_path}")
+            start = time.perf_counter()
             self.model = YOLO(self.model_path)
             self.is_loaded = True
             self.logger.info("YOLOモデルのロードに成功しました")
+            get_metrics().set("pdfexpy_model_loaded", 1, model="yolov8")
+            get_metrics().set("pdfexpy_model_load_seconds", time.perf_counter() - start, model="yolov8")
             return True
         except Exception as e:
             self.logger.error(f"YOLOモデルのロード中にエラーが発生しました: {str(e)}")
             self.is_loaded = False
+            get_metrics().set("pdfexpy_model_loaded", 0, model="yolov8")
             return False
     
-    def detect(self, image_path: str) -> Dict:
+    def detect(self, image_path) -> Dict:
         """
         画像内のオブジェクトを検出します
         
         Args:
-            image_path: 分析する画像ファイルのパス
+            image_path: 分析する画像ファイルのパス、BGR形式の画像配列、または画像コンテキスト
+                （画像コンテキストの場合はデコード済みのBGR配列を使い、再デコードしません）
             
         Returns:
             Dict: 検出結果を含む辞書
         """
+        # 画像コンテキストの場合はデコード済みの配列を渡す（デコードは下のtry内で行う）
+        # （インスタンスのhasattrはプロパティを評価してデコードしてしまうため、クラスで判定する）
+        context = image_path if hasattr(type(image_path), "bgr") else None
+        if context is not None:
+            image_path = context.path
+        
         if not self.is_loaded:
             if not self.load():
                 self.logger.error("モデルがロードされていないため、検出を実行できません")
                 return {"error": "モデルがロードされていません", "objects": []}
         
         try:
-            results = self.model(image_path, conf=self.confidence, verbose=False)
+            source = context.bgr if context is not None else image_path
+            results = self.model(source, conf=self.confidence, verbose=False)
             
             # 検出結果を処理
             detected_objects = []
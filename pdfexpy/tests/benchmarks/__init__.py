@@ -0,0 +1,3 @@
+"""
+解析の主要な関数のベンチマーク
+"""
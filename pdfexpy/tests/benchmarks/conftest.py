@@ -0,0 +1,82 @@
+"""
+ベンチマークの共通フィクスチャ
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from pdfexpy.tests.benchmarks.harness import (
+    BENCHMARK_ENABLED,
+    PYTEST_BENCHMARK_AVAILABLE,
+    RESOLUTIONS,
+    ROUNDS,
+    SAVE_BASELINE,
+    SELECTED_RESOLUTIONS,
+    BaselineRecorder,
+    measure,
+    synthetic_objects
+)
+
+_recorder = BaselineRecorder()
+
+
+@pytest.fixture(scope="session")
+def synthetic_images(tmp_path_factory):
+    """解像度ごとの合成画像（グラデーションと矩形のスクリーンショット風の画像）を作成する"""
+    directory = tmp_path_factory.mktemp("benchmark_images")
+    paths = {}
+    for name in SELECTED_RESOLUTIONS:
+        width, height = RESOLUTIONS[name]
+        x = np.linspace(0, 255, width, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        rgb = np.stack([np.broadcast_to(x, (height, width)),
+                        np.broadcast_to(y, (height, width)),
+                        (x + y) / 2], axis=-1).astype(np.uint8)
+        for obj in synthetic_objects(width, height, count=20):
+            box = obj["bbox"]
+            rgb[box["y"]:box["y"] + box["height"], box["x"]:box["x"] + box["width"]] = 240
+        path = directory / f"synthetic_{name}.png"
+        Image.fromarray(rgb).save(path, compress_level=1)
+        paths[name] = str(path)
+    return paths
+
+
+@pytest.fixture
+def bench(request):
+    """
+    関数の実行時間の中央値を計測し、ベースラインより遅くなっていれば失敗にする関数を返す
+
+    bench(func, setup) の setup は各回の引数のタプルを返す関数です（計測に含みません）。
+    """
+    name = f"{request.node.module.__name__.rsplit('.', 1)[-1]}::{request.node.name}"
+
+    def run(func, setup=tuple):
+        if PYTEST_BENCHMARK_AVAILABLE:
+            benchmark = request.getfixturevalue("benchmark")
+            benchmark.pedantic(func, setup=lambda: (setup(), {}), rounds=ROUNDS, warmup_rounds=1)
+            median = benchmark.stats.stats.median
+        else:
+            median = measure(func, setup)
+
+        regression = _recorder.record(name, median)
+        if regression:
+            pytest.fail(f"処理時間がベースラインより増加しました: {regression}")
+        return median
+
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if BENCHMARK_ENABLED and SAVE_BASELINE and _recorder.results:
+        _recorder.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not (BENCHMARK_ENABLED and _recorder.results):
+        return
+    terminalreporter.section("pdfexpy benchmarks (median)")
+    for line in _recorder.summary_lines():
+        terminalreporter.write_line(line)
+    if SAVE_BASELINE:
+        terminalreporter.write_line(f"ベースラインを更新しました: {_recorder.path}")
@@ -0,0 +1,168 @@
+"""
+ベンチマークの計測とベースラインとの比較
+
+PDFEXPY_BENCHMARK=1 の場合のみベンチマークを実行します（通常のテストでは全てスキップします）。
+pytest-benchmark がインストールされている場合はその計測を使い、ない場合は time.perf_counter による
+計測にフォールバックします。各ベンチマークの中央値をベースライン（JSON）と比較し、
+しきい値を超えて遅くなった場合は失敗にします。
+
+環境変数:
+    PDFEXPY_BENCHMARK: 1 の場合にベンチマークを実行する
+    PDFEXPY_BENCHMARK_BASELINE: ベースラインのファイル（デフォルト: .benchmarks/pdfexpy_baseline.json）
+    PDFEXPY_BENCHMARK_SAVE: 1 の場合は今回の結果でベースラインを更新する
+    PDFEXPY_BENCHMARK_THRESHOLD: 失敗とする中央値の増加率（デフォルト: 0.2 = 20%）
+    PDFEXPY_BENCHMARK_ROUNDS: 計測回数（デフォルト: 5）
+    PDFEXPY_BENCHMARK_RESOLUTIONS: 計測する解像度（カンマ区切り、デフォルト: 720p,1080p,4k,8k）
+"""
+
+import os
+import json
+import time
+import platform
+import statistics
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+# pytest-benchmark（任意）
+try:
+    import pytest_benchmark  # noqa: F401
+    PYTEST_BENCHMARK_AVAILABLE = True
+except ImportError:
+    PYTEST_BENCHMARK_AVAILABLE = False
+
+BENCHMARK_ENABLED = os.environ.get("PDFEXPY_BENCHMARK") == "1"
+BASELINE_PATH = Path(os.environ.get("PDFEXPY_BENCHMARK_BASELINE", ".benchmarks/pdfexpy_baseline.json"))
+SAVE_BASELINE = os.environ.get("PDFEXPY_BENCHMARK_SAVE") == "1"
+THRESHOLD = float(os.environ.get("PDFEXPY_BENCHMARK_THRESHOLD", "0.2"))
+ROUNDS = int(os.environ.get("PDFEXPY_BENCHMARK_ROUNDS", "5"))
+
+# 合成画像の解像度
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+}
+SELECTED_RESOLUTIONS = [
+    name.strip() for name in os.environ.get("PDFEXPY_BENCHMARK_RESOLUTIONS", ",".join(RESOLUTIONS)).split(",")
+    if name.strip() in RESOLUTIONS
+]
+
+
+def synthetic_objects(width: int, height: int, count: int = 50) -> List[Dict[str, Any]]:
+    """
+    画像の大きさに合わせた検出オブジェクトを作成します
+
+    Args:
+        width (int): 画像の幅
+        height (int): 画像の高さ
+        count (int): オブジェクトの数
+
+    Returns:
+        List[Dict[str, Any]]: analyze_image の objects と同じ形式のリスト
+    """
+    rng = np.random.default_rng(count)
+    labels = ["button", "text", "icon", "window", "menu"]
+    objects = []
+    for i in range(count):
+        box_width, box_height = int(width * rng.uniform(0.05, 0.2)), int(height * rng.uniform(0.03, 0.1))
+        objects.append({
+            "label": labels[i % len(labels)],
+            "confidence": float(rng.uniform(0.3, 0.99)),
+            "bbox": {
+                "x": int(rng.integers(0, width - box_width)),
+                "y": int(rng.integers(0, height - box_height)),
+                "width": box_width,
+                "height": box_height
+            }
+        })
+    return objects
+
+
+def measure(func: Callable, setup: Callable[[], Tuple], rounds: int = ROUNDS) -> float:
+    """
+    関数の実行時間の中央値を計測します（1回のウォームアップの後）
+
+    Args:
+        func (Callable): 計測する関数
+        setup (Callable[[], Tuple]): 各回の引数を作成する関数（計測に含みません）
+        rounds (int): 計測回数
+
+    Returns:
+        float: 実行時間の中央値（秒）
+    """
+    func(*setup())
+    times = []
+    for _ in range(rounds):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+class BaselineRecorder:
+    """ベンチマークの結果を記録し、ベースラインと比較するクラス"""
+
+    def __init__(self, path: Path = BASELINE_PATH, threshold: float = THRESHOLD):
+        """
+        ベースラインを読み込みます
+
+        Args:
+            path (Path): ベースラインのファイル
+            threshold (float): 失敗とする中央値の増加率
+        """
+        self.path = Path(path)
+        self.threshold = threshold
+        self.results: Dict[str, float] = {}
+        self.baseline: Dict[str, float] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.baseline = json.load(f).get("benchmarks", {})
+
+    def record(self, name: str, median: float) -> Optional[str]:
+        """
+        結果を記録し、ベースラインより遅くなっていないか確認します
+
+        Args:
+            name (str): ベンチマーク名
+            median (float): 実行時間の中央値（秒）
+
+        Returns:
+            Optional[str]: しきい値を超えて遅くなった場合はその説明、それ以外はNone
+        """
+        self.results[name] = median
+        baseline = self.baseline.get(name)
+        if baseline and median > baseline * (1 + self.threshold):
+            return (f"{name}: {median * 1000:.2f}ms（ベースライン {baseline * 1000:.2f}ms から "
+                    f"{median / baseline - 1:+.0%}、しきい値 {self.threshold:.0%}）")
+        return None
+
+    def summary_lines(self) -> List[str]:
+        """
+        結果とベースラインとの差の一覧を作成します
+
+        Returns:
+            List[str]: 1ベンチマーク1行の文字列
+        """
+        lines = []
+        for name, median in sorted(self.results.items()):
+            baseline = self.baseline.get(name)
+            change = f"{median / baseline - 1:+.0%}" if baseline else "(新規)"
+            lines.append(f"{name:<60} {median * 1000:>10.2f}ms {change:>8}")
+        return lines
+
+    def save(self):
+        """
+        今回の結果でベースラインを更新します（今回計測していないベンチマークは残します）
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data: Dict[str, Any] = {
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "benchmarks": {**self.baseline, **self.results}
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
@@ -0,0 +1,78 @@
+"""
+解析の主要な関数のベンチマーク（PDFEXPY_BENCHMARK=1 の場合のみ実行）
+"""
+
+import pytest
+
+from pdfexpy.tests.benchmarks.harness import BENCHMARK_ENABLED, RESOLUTIONS, SELECTED_RESOLUTIONS, synthetic_objects
+from pdfexpy.utils.image_analysis import (
+    YOLO_AVAILABLE,
+    analyze_image,
+    build_analysis_results,
+    generate_mock_analysis_results,
+    generate_visual_feedback,
+    get_image_details
+)
+from pdfexpy.utils.image_context import ImageContext
+from pdfexpy.utils.image_processing import visualize_annotations
+from pdfexpy.utils.result_sink import JsonFileSink
+
+pytestmark = pytest.mark.skipif(not BENCHMARK_ENABLED, reason="PDFEXPY_BENCHMARK=1 の場合のみ実行します")
+
+
+@pytest.mark.parametrize("resolution", SELECTED_RESOLUTIONS)
+class TestAnalysisBenchmarks:
+    """解像度ごとの解析の主要な関数のベンチマーク"""
+
+    @pytest.fixture
+    def image_path(self, synthetic_images, resolution):
+        """解像度に対応する合成画像のパス"""
+        return synthetic_images[resolution]
+
+    @pytest.fixture
+    def analysis_results(self, image_path, resolution):
+        """合成画像の大きさに合わせた検出オブジェクトを含む解析結果"""
+        results = generate_mock_analysis_results(image_path, get_image_details(image_path))
+        results["objects"] = synthetic_objects(*RESOLUTIONS[resolution])
+        return results
+
+    def test_get_image_details(self, bench, image_path):
+        """画像のデコードと詳細情報の取得"""
+        bench(get_image_details, lambda: (image_path,))
+
+    def test_visualize_annotations(self, bench, image_path, analysis_results):
+        """OpenCV での注釈の描画（描画先の画像の複製は計測に含まない）"""
+        bgr = ImageContext(image_path).bgr
+        bench(visualize_annotations, lambda: (bgr.copy(), analysis_results["objects"]))
+
+    @pytest.mark.parametrize("suffix", [".svg", ".png"])
+    def test_generate_visual_feedback(self, bench, tmp_path, image_path, analysis_results, suffix):
+        """視覚的フィードバックの生成（オーバーレイとフル解像度の画像）"""
+        output_path = str(tmp_path / f"feedback{suffix}")
+        bench(generate_visual_feedback, lambda: (image_path, analysis_results, output_path))
+
+    def test_build_analysis_results(self, bench, image_path, analysis_results):
+        """検出結果からの解析結果の構築（OCRステージを含む）"""
+        details = get_image_details(image_path)
+        detection = {"objects": analysis_results["objects"]}
+        bench(build_analysis_results, lambda: (ImageContext(image_path), details, detection))
+
+    def test_analyze_image_mock(self, bench, tmp_path, image_path):
+        """モックでの解析全体（視覚的フィードバックと保存を含む）"""
+        output_dir = str(tmp_path / "out")
+        bench(analyze_image, lambda: (image_path, output_dir))
+
+    @pytest.mark.skipif(not YOLO_AVAILABLE, reason="ultralytics がインストールされていません")
+    def test_analyze_image_yolo(self, bench, tmp_path, image_path):
+        """YOLOv8 での解析全体（モデルのロードは計測に含まない）"""
+        from pdfexpy.models import YOLOModel
+
+        model = YOLOModel()
+        output_dir = str(tmp_path / "out")
+        bench(lambda path: analyze_image(path, output_dir, mock=False, model=model), lambda: (image_path,))
+
+    def test_json_persistence(self, bench, tmp_path, image_path, analysis_results):
+        """解析結果の JSON ファイルへの保存"""
+        sink = JsonFileSink(tmp_path / "out")
+        record = {"image_path": image_path, "analysis": analysis_results}
+        bench(sink.write, lambda: (record, "benchmark"))
@@ -0,0 +1,29 @@
+"""
+ベンチマークの計測・ベースライン比較のテスト（常に実行）
+"""
+
+from pdfexpy.tests.benchmarks.harness import BaselineRecorder, measure
+
+
+class TestBaselineRecorder:
+    """ベースライン比較のテストクラス"""
+
+    def test_regression(self, tmp_path):
+        """しきい値を超えて遅くなった場合のみ報告され、保存した結果が次回のベースラインになることを確認"""
+        path = tmp_path / "baseline.json"
+        recorder = BaselineRecorder(path, threshold=0.2)
+        assert recorder.record("decode", 0.100) is None
+        recorder.save()
+
+        recorder = BaselineRecorder(path, threshold=0.2)
+        assert recorder.record("decode", 0.115) is None
+        assert "+30%" in recorder.record("decode", 0.130)
+        assert recorder.record("render", 1.0) is None
+        assert "(新規)" in recorder.summary_lines()[1]
+
+    def test_measure(self):
+        """各回の引数が作成され、計測回数とウォームアップ分だけ実行されることを確認"""
+        calls = []
+        median = measure(calls.append, lambda: (len(calls),), rounds=3)
+        assert calls == [0, 1, 2, 3]
+        assert median >= 0
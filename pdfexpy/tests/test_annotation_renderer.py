@@ -0,0 +1,62 @@
+"""
+注釈レンダラーのテスト
+"""
+
+import numpy as np
+
+from pdfexpy.utils.annotation_renderer import AnnotationRenderer, cv2_text_size, get_renderer
+from pdfexpy.utils.image_processing import visualize_annotations
+
+
+OBJECTS = [
+    {"label": "button", "confidence": 0.9, "bbox": {"x": 10, "y": 30, "width": 40, "height": 20}},
+    {"label": "dialog", "confidence": 0.8, "bbox": {"x": 60, "y": 40, "width": 30, "height": 30}},
+]
+
+
+class TestAnnotationRenderer:
+    """注釈レンダラーのテストクラス"""
+
+    def test_color_for_is_persistent(self):
+        """同じラベルには常に同じ色が割り当てられ、異なるラベルは異なる色になることを確認"""
+        renderer = AnnotationRenderer()
+        first = renderer.color_for("button")
+        renderer.color_for("dialog")
+
+        assert renderer.color_for("button") == first
+        assert renderer.color_for("dialog") != first
+        assert get_renderer() is get_renderer()
+
+    def test_draw_objects_in_place(self):
+        """描画が渡した配列に直接行われることを確認"""
+        image = np.zeros((100, 120, 3), dtype=np.uint8)
+        result = AnnotationRenderer().draw_objects(image, OBJECTS)
+
+        assert result is image
+        assert image.any()
+
+    def test_explicit_colors(self):
+        """色を指定した場合はその色で枠が描画されることを確認"""
+        image = np.zeros((100, 120, 3), dtype=np.uint8)
+        AnnotationRenderer().draw_objects(image, OBJECTS[:1], colors={"button": (0, 0, 255)})
+
+        # 枠の下辺
+        assert tuple(image[50, 30]) == (0, 0, 255)
+
+    def test_text_size_cached(self):
+        """テキストの大きさがキャッシュされることを確認"""
+        cv2_text_size.cache_clear()
+        cv2_text_size("button 0.90", 0.6, 2)
+        cv2_text_size("button 0.90", 0.6, 2)
+
+        info = cv2_text_size.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_visualize_annotations_no_copy(self):
+        """visualize_annotations が画像を複製せずに描画することを確認"""
+        image = np.zeros((100, 120, 3), dtype=np.uint8)
+        result = visualize_annotations(image, OBJECTS, colors=[(255, 0, 0)])
+
+        assert result is image
+        assert tuple(image[50, 30]) == (255, 0, 0)
@@ -0,0 +1,60 @@
+"""
+一括解析のテスト
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.batch import BatchAnalyzer, main
+
+
+class TestBatchAnalyzer:
+    """一括解析のテストクラス"""
+
+    @pytest.fixture
+    def image_dir(self, tmp_path):
+        """壊れた画像を含むテスト用ディレクトリを作成する"""
+        images = tmp_path / "images"
+        (images / "nested").mkdir(parents=True)
+        for i in range(4):
+            Image.new("RGB", (40, 30), color=(i * 50, 0, 0)).save(images / f"img{i}.png")
+        Image.new("RGB", (40, 30)).save(images / "nested" / "deep.png")
+        (images / "broken.png").write_bytes(b"not an image")
+        return images
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_run(self, image_dir, tmp_path, workers):
+        """全ての画像が解析され、失敗した画像が要約に含まれることを確認"""
+        progress = []
+        with BatchAnalyzer(output_dir=str(tmp_path / "out"), workers=workers,
+                           generate_visual=False, max_in_flight=2) as analyzer:
+            summary = analyzer.run(image_dir, progress_callback=progress.append)
+
+        assert summary["total"] == 6
+        assert summary["succeeded"] == 5
+        assert summary["failed"] == 1
+        assert os.path.basename(summary["failures"][0]["image_path"]) == "broken.png"
+        assert [p["done"] for p in progress] == list(range(1, 7))
+        assert progress[-1]["eta_seconds"] == 0
+        assert len(list((tmp_path / "out").glob("analysis_*.json"))) == 5
+
+    def test_pool_is_reused(self, image_dir, tmp_path):
+        """複数回の実行でワーカープールが使い回されることを確認"""
+        with BatchAnalyzer(output_dir=str(tmp_path / "out"), workers=2, generate_visual=False) as analyzer:
+            analyzer.run(image_dir, recursive=False)
+            executor = analyzer._executor
+            summary = analyzer.run([str(image_dir / "nested" / "deep.png")])
+
+            assert analyzer._executor is executor
+            assert summary["succeeded"] == 1
+        assert analyzer._executor is None
+
+    def test_main(self, image_dir, tmp_path, capsys):
+        """コマンドラインから一括解析できることを確認"""
+        exit_code = main([str(image_dir), "--no-recursive", "--no-visual", "-j", "1",
+                          "-o", str(tmp_path / "out")])
+
+        assert exit_code == 1
+        assert "4/5件成功" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+"""
+列指向形式の出力のテスト
+"""
+
+import time
+
+import pytest
+
+from pdfexpy.tests.test_result_store import make_record
+from pdfexpy.utils.result_sink import NDJSONSink
+from pdfexpy.utils import columnar_export
+from pdfexpy.utils.columnar_export import (
+    ColumnarSink,
+    ColumnarExportError,
+    export_results,
+    read_table,
+    to_rows
+)
+
+
+class TestColumnarExport:
+    """列指向形式の出力のテストクラス"""
+
+    def test_to_rows(self):
+        """解析結果が画像IDと日付の付いた各テーブルの行に展開されることを確認"""
+        rows = to_rows(make_record("2026-10-17T09:00:00", 25, [("dialog", 0.8), ("button", 0.7)], ["OK"]))
+
+        assert len(rows["images"]) == 1 and len(rows["detections"]) == 2 and len(rows["ocr_regions"]) == 1
+        image_id = rows["images"][0]["image_id"]
+        assert all(row["image_id"] == image_id and row["date"] == "2026-10-17"
+                   for table in rows.values() for row in table)
+        assert rows["detections"][1]["label"] == "button"
+        assert rows["ocr_regions"][0]["width"] == 5
+
+    def test_requires_pyarrow(self, tmp_path, monkeypatch):
+        """pyarrow がない場合はエラーになることを確認"""
+        monkeypatch.setattr(columnar_export, "PYARROW_AVAILABLE", False)
+
+        with pytest.raises(ColumnarExportError):
+            ColumnarSink(tmp_path)
+        assert export_results(tmp_path, tmp_path / "out")["success"] is False
+
+    def test_sink_flushes_when_idle(self, tmp_path):
+        """次の書き込みがなくても flush_seconds を過ぎると、返したパーティションのファイルに書き出されることを確認"""
+        pytest.importorskip("pyarrow")
+
+        sink = ColumnarSink(tmp_path, flush_seconds=0.05)
+        path = sink.write(make_record("2026-10-17T09:00:00", 25, [("dialog", 0.8)]), "a")
+        assert path.startswith(str(tmp_path / "images" / "date=2026-10-17" / "part-"))
+
+        deadline = time.monotonic() + 5
+        while not (tmp_path / path).exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert (tmp_path / path).exists()
+        with sink._lock:
+            # タイマーによる書き出しの完了を待つ
+            pass
+        assert read_table(tmp_path, "images").num_rows == 1
+        assert read_table(tmp_path, "detections").column("label").to_pylist() == ["dialog"]
+
+        second = sink.write(make_record("2026-10-17T10:00:00", 25, []), "b")
+        sink.close()
+        assert second != path and read_table(tmp_path, "images").num_rows == 2
+
+    @pytest.mark.parametrize("format", ["parquet", "arrow"])
+    def test_export_and_read(self, tmp_path, format):
+        """日付でパーティション分割して出力し、列と日付を絞って読み込めることを確認"""
+        pytest.importorskip("pyarrow")
+        import pyarrow.dataset as ds
+
+        with NDJSONSink(tmp_path / "results") as sink:
+            sink.write(make_record("2026-10-16T10:00:00", 20, [("dialog", 0.9)]), "a")
+            sink.write(make_record("2026-10-17T09:00:00", 25, [("dialog", 0.8), ("button", 0.7)], ["OK"]), "b")
+
+        result = export_results(tmp_path / "results", tmp_path / "out", format=format)
+        assert result["count"] == 2
+        assert (tmp_path / "out" / "detections" / "date=2026-10-17").is_dir()
+
+        table = read_table(tmp_path / "out", "detections", columns=["label", "confidence"],
+                           filter=ds.field("date") == "2026-10-17", format=format)
+        assert table.column_names == ["label", "confidence"]
+        assert sorted(table.column("label").to_pylist()) == ["button", "dialog"]
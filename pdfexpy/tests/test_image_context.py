@@ -0,0 +1,80 @@
+"""
+画像コンテキストのテスト
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.image_context import ImageContext
+from pdfexpy.utils.image_analysis import analyze_image, get_image_details
+
+
+class TestImageContext:
+    """画像コンテキストのテストクラス"""
+
+    @pytest.fixture
+    def image_path(self, tmp_path):
+        """テスト用のRGBA画像ファイルを作成する"""
+        img_path = tmp_path / "context.png"
+        Image.new("RGBA", (320, 200), color=(10, 20, 30, 255)).save(img_path)
+        return str(img_path)
+
+    def test_lazy_views(self, image_path):
+        """各表現が正しい形状と色で生成されることを確認"""
+        context = ImageContext(image_path)
+
+        assert context.rgb.shape == (200, 320, 3)
+        assert tuple(context.rgb[0, 0]) == (10, 20, 30)
+        assert tuple(context.bgr[0, 0]) == (30, 20, 10)
+        assert context.gray.shape == (200, 320)
+        assert context.downscaled(160).shape == (100, 160, 3)
+        assert context.downscaled(1000) is context.rgb
+        assert context.mode == "RGBA"
+        assert context.format == "PNG"
+
+    def test_decodes_once(self, image_path):
+        """複数のステージで使っても画像のデコードが一度だけであることを確認"""
+        with patch("pdfexpy.utils.image_context.Image.open", wraps=Image.open) as mock_open:
+            context = ImageContext(image_path)
+            details = get_image_details(context)
+            _ = context.bgr, context.gray, context.downscaled(64)
+
+        assert mock_open.call_count == 1
+        assert details["image_info"]["color_info"]["avg_color_rgb"] == [10, 20, 30]
+
+    def test_analyze_image_decodes_once(self, image_path, tmp_path):
+        """analyze_imageの全ステージで画像のデコードが一度だけであることを確認"""
+        with patch("pdfexpy.utils.image_context.Image.open", wraps=Image.open) as mock_open:
+            result = analyze_image(image_path, str(tmp_path / "out"), generate_visual=True, mock=True)
+
+        assert result["success"] is True
+        assert mock_open.call_count == 1
+
+    def test_from_array(self):
+        """配列から作成したコンテキストが配列をそのまま使うことを確認"""
+        rgb = np.zeros((4, 6, 3), dtype=np.uint8)
+        context = ImageContext.from_array(rgb)
+
+        assert context.rgb is rgb
+        assert (context.width, context.height) == (6, 4)
+
+    def test_detect_reports_decode_error(self, tmp_path):
+        """画像のデコードに失敗した場合、検出が例外ではなくエラー結果を返すことを確認"""
+        from unittest.mock import MagicMock
+        from pdfexpy.models.yolo_model import YOLOModel
+
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+
+        yolo = YOLOModel()
+        yolo.model = MagicMock()
+        yolo.is_loaded = True
+        result = yolo.detect(ImageContext(str(broken)))
+
+        assert "error" in result
+        assert result["objects"] == []
+        assert result["image_path"] == str(broken)
+        yolo.model.assert_not_called()
@@ -0,0 +1,65 @@
+"""
+画像処理ユーティリティのテスト
+"""
+
+import numpy as np
+import pytest
+
+from pdfexpy.utils.image_processing import (
+    compute_region_stats,
+    plan_ocr_preprocessing,
+    preprocess_regions
+)
+
+
+class TestOCRPreprocessing:
+    """OCR前処理のテストクラス"""
+
+    @pytest.fixture
+    def gray_image(self):
+        """明るい領域・暗い領域・一様な領域を含むグレースケール画像を作成する"""
+        img = np.full((100, 200), 240, dtype=np.uint8)
+        img[10:20, 10:60:4] = 0        # 白地に黒文字（小さい文字）
+        img[50:90, 100:190] = 30       # ダークテーマの背景
+        img[60:70, 110:180:3] = 220    # 暗い背景に明るい文字
+        return img
+
+    def test_compute_region_stats(self, gray_image):
+        """積分画像による統計がNumPyの計算と一致することを確認"""
+        boxes = [
+            {"x": 5, "y": 5, "width": 60, "height": 20},
+            {"x": 100, "y": 50, "width": 90, "height": 40},
+        ]
+        stats = compute_region_stats(gray_image, boxes)
+        for i, b in enumerate(boxes):
+            crop = gray_image[b["y"]:b["y"] + b["height"], b["x"]:b["x"] + b["width"]].astype(np.float64)
+            assert stats["mean"][i] == pytest.approx(crop.mean())
+            assert stats["std"][i] == pytest.approx(crop.std())
+
+    def test_plan_ocr_preprocessing(self, gray_image):
+        """統計量から領域ごとのパラメータが選ばれることを確認"""
+        boxes = [
+            {"x": 5, "y": 5, "width": 60, "height": 20},    # 小さい黒文字
+            {"x": 100, "y": 50, "width": 90, "height": 40},  # ダークテーマ
+            {"x": 0, "y": 30, "width": 80, "height": 15},   # 一様な背景
+        ]
+        plans = plan_ocr_preprocessing(gray_image, boxes)
+
+        assert plans[0]["invert"] is False
+        assert plans[0]["scale"] > 1.0
+        assert plans[1]["invert"] is True
+        assert plans[1]["scale"] == 1.0
+        assert plans[2]["skip"] is True
+
+    def test_preprocess_regions(self, gray_image):
+        """前処理結果が二値画像になり、拡大されることを確認"""
+        rgb = np.stack([gray_image] * 3, axis=2)
+        boxes = [
+            {"x": 5, "y": 5, "width": 60, "height": 20},
+            {"x": 0, "y": 30, "width": 80, "height": 15},
+        ]
+        processed = preprocess_regions(rgb, boxes)
+
+        assert processed[1] is None
+        assert processed[0].shape[0] > 20
+        assert set(np.unique(processed[0])) <= {0, 255}
@@ -0,0 +1,82 @@
+"""
+色統計計算のテスト
+"""
+
+import pytest
+import numpy as np
+
+from pdfexpy.utils.image_stats import (
+    compute_color_stats,
+    sample_stride,
+    extract_dominant_colors,
+    compute_channel_histograms,
+    classify_theme
+)
+
+
+class TestImageStats:
+    """色統計計算のテストクラス"""
+
+    @pytest.fixture
+    def random_image(self):
+        """ランダムなテスト用画像を作成する"""
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 256, (300, 400, 3), dtype=np.uint8)
+
+    def test_exact_without_sampling(self, random_image):
+        """間引きなしの場合は全画素での計算と一致することを確認"""
+        stats = compute_color_stats(random_image, chunk_pixels=1000)
+
+        assert stats["sample_stride"] == 1
+        assert stats["sampled_pixels"] == 300 * 400
+        assert stats["avg_color_rgb"] == np.mean(random_image, axis=(0, 1)).astype(int).tolist()
+        assert stats["brightness"] == pytest.approx(np.mean(random_image))
+        assert stats["color_variance"] == pytest.approx(np.std(random_image))
+        assert stats["brightness_percent"] == pytest.approx(np.mean(random_image) / 255 * 100)
+
+    def test_sampling_error_is_small(self, random_image):
+        """間引いた場合も誤差が小さいことを確認"""
+        stats = compute_color_stats(random_image, max_samples=10000)
+
+        assert stats["sample_stride"] == 4
+        assert stats["sampled_pixels"] <= 10000
+        assert stats["brightness"] == pytest.approx(np.mean(random_image), abs=2.0)
+        assert stats["color_variance"] == pytest.approx(np.std(random_image), abs=2.0)
+
+    def test_alpha_channel_is_ignored(self):
+        """RGBA画像のアルファチャンネルが無視されることを確認"""
+        image = np.zeros((10, 10, 4), dtype=np.uint8)
+        image[:, :, 0] = 255
+        image[:, :, 3] = 128
+        stats = compute_color_stats(image)
+
+        assert stats["avg_color_rgb"] == [255, 0, 0]
+        assert stats["avg_color_hex"] == "#ff0000"
+
+    def test_sample_stride(self):
+        """サンプル数が上限以下になる間引き間隔が計算されることを確認"""
+        assert sample_stride(100, 100, 20000) == 1
+        stride = sample_stride(4320, 7680, 1_000_000)
+        assert (4320 // stride) * (7680 // stride) <= 1_000_000
+
+    def test_extract_dominant_colors(self):
+        """画素数の多い順に代表色が抽出されることを確認"""
+        image = np.zeros((100, 100, 3), dtype=np.uint8)
+        image[:, :, :] = (30, 30, 30)
+        image[:20, :, :] = (250, 250, 250)
+        colors = extract_dominant_colors(image, top_k=3)
+
+        assert [c["hex"] for c in colors] == ["#1e1e1e", "#fafafa"]
+        assert colors[0]["ratio"] == pytest.approx(0.8)
+        assert classify_theme(colors) == "dark"
+        assert classify_theme(list(reversed(colors))) == "light"
+        assert classify_theme([]) == "unknown"
+
+    def test_compute_channel_histograms(self, random_image):
+        """チャンネルごとのヒストグラムが全画素を数えることを確認"""
+        histograms = compute_channel_histograms(random_image, bins=16)
+
+        assert set(histograms) == {"r", "g", "b"}
+        assert len(histograms["r"]) == 16
+        assert sum(histograms["g"]) == 300 * 400
+        assert histograms["b"] == np.histogram(random_image[:, :, 2], bins=16, range=(0, 256))[0].tolist()
@@ -0,0 +1,65 @@
+"""
+インベントリ作成のテスト
+"""
+
+import os
+import json
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.image_analysis import get_image_details
+from pdfexpy.utils.inventory import iter_image_files, iter_image_metadata, write_inventory
+
+
+class TestInventory:
+    """インベントリ作成のテストクラス"""
+
+    @pytest.fixture
+    def archive_dir(self, tmp_path):
+        """サブディレクトリを含むテスト用の画像アーカイブを作成する"""
+        (tmp_path / "sub").mkdir()
+        Image.new("RGB", (64, 32), color="white").save(tmp_path / "a.png")
+        Image.new("RGB", (16, 48), color="black").save(tmp_path / "sub" / "b.JPG", format="JPEG")
+        (tmp_path / "broken.png").write_bytes(b"not an image")
+        (tmp_path / "notes.txt").write_text("ignored")
+        return tmp_path
+
+    def test_metadata_only_skips_decode(self, archive_dir):
+        """メタデータモードでは画素がデコードされないことを確認"""
+        with patch("PIL.ImageFile.ImageFile.load") as mock_load:
+            details = get_image_details(str(archive_dir / "a.png"), metadata_only=True)
+
+        mock_load.assert_not_called()
+        assert details["image_info"]["resolution"] == "64x32"
+        assert details["image_info"]["format"] == "PNG"
+        assert "brightness" not in details["image_info"]["color_info"]
+        assert details["file_info"]["filename"] == "a.png"
+
+    def test_iter_image_files(self, archive_dir):
+        """画像の拡張子のファイルのみが再帰的に列挙されることを確認"""
+        names = sorted(os.path.basename(p) for p in iter_image_files(archive_dir))
+        assert names == ["a.png", "b.JPG", "broken.png"]
+        assert sorted(os.path.basename(p) for p in iter_image_files(archive_dir, recursive=False)) == ["a.png", "broken.png"]
+
+    def test_iter_image_metadata(self, archive_dir):
+        """壊れたファイルを含めて全ての画像のレコードが返されることを確認"""
+        records = {r["file_info"]["filename"]: r for r in iter_image_metadata(archive_dir, max_workers=2)}
+
+        assert set(records) == {"a.png", "b.JPG", "broken.png"}
+        assert records["b.JPG"]["image_info"]["format"] == "JPEG"
+        assert records["b.JPG"]["image_info"]["is_portrait"] is True
+        assert "error" in records["broken.png"]
+
+    def test_write_inventory(self, archive_dir, tmp_path):
+        """NDJSONとして1行1レコードで書き出されることを確認"""
+        output_file = tmp_path / "out" / "inventory.ndjson"
+        result = write_inventory(archive_dir, output_file)
+
+        assert result["success"] is True
+        assert result["count"] == 3
+        assert result["errors"] == 1
+        lines = output_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 3
+        assert all("file_info" in json.loads(line) for line in lines)
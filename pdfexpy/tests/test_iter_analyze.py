@@ -0,0 +1,127 @@
+"""
+ストリーミング解析APIのテスト
+"""
+
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.image_analysis import iter_analyze, iter_new_files, analyze_image, load_font, watch_directory
+
+# 視覚的フィードバックを画像として描画する設定
+PNG_FEEDBACK_CONFIG = {"analysis": {"visual_format": "png"}}
+
+
+class TestIterAnalyze:
+    """ストリーミング解析APIのテストクラス"""
+
+    @pytest.fixture
+    def image_dir(self, tmp_path):
+        """複数の画像を含むテスト用ディレクトリを作成する"""
+        images = tmp_path / "images"
+        (images / "nested").mkdir(parents=True)
+        for i in range(3):
+            Image.new("RGB", (40, 30), color=(i * 50, 0, 0)).save(images / f"img{i}.png")
+        Image.new("RGB", (40, 30)).save(images / "nested" / "deep.png")
+        return images
+
+    def test_analyzes_directory(self, image_dir, tmp_path):
+        """ディレクトリ内の全ての画像が解析されることを確認"""
+        results = list(iter_analyze(image_dir, str(tmp_path / "out"), generate_visual=False))
+
+        assert len(results) == 4
+        assert all(r["success"] for r in results)
+        assert {os.path.basename(r["image_path"]) for r in results} == {"img0.png", "img1.png", "img2.png", "deep.png"}
+
+    def test_early_stop(self, image_dir, tmp_path):
+        """途中で停止した場合に残りの画像が解析されないことを確認"""
+        with patch("pdfexpy.utils.image_analysis.analyze_image", wraps=analyze_image) as mock_analyze:
+            for result in iter_analyze(image_dir, str(tmp_path / "out"), generate_visual=False, prefetch=1):
+                break
+
+        assert result["success"] is True
+        assert mock_analyze.call_count == 1
+
+    def test_unreadable_file(self, tmp_path):
+        """読み込めない画像はエラーとして返され、処理が継続されることを確認"""
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+        good = tmp_path / "good.png"
+        Image.new("RGB", (10, 10)).save(good)
+
+        results = list(iter_analyze([str(broken), str(good)], str(tmp_path / "out"), generate_visual=False))
+
+        assert results[0]["success"] is False
+        assert results[0]["image_path"] == str(broken)
+        assert results[1]["success"] is True
+
+    def test_iter_new_files(self, tmp_path):
+        """監視開始後に追加された画像のみが返されることを確認"""
+        Image.new("RGB", (10, 10)).save(tmp_path / "old.png")
+        stop_event = threading.Event()
+        new_files = iter_new_files(tmp_path, poll_interval=0.01, stop_event=stop_event)
+
+        # 検出されない場合もテストが終了するよう、一定時間で監視を止める
+        timer = threading.Timer(5.0, stop_event.set)
+        timer.start()
+        try:
+            Image.new("RGB", (10, 10)).save(tmp_path / "new.png")
+            path = next(new_files, None)
+            stop_event.set()
+        finally:
+            timer.cancel()
+
+        assert path is not None and os.path.basename(path) == "new.png"
+        assert list(new_files) == []
+
+    def test_deferred_visual_feedback(self, image_dir, tmp_path):
+        """視覚的フィードバックがバックグラウンドで描画され、後からパスが設定されることを確認"""
+        result = analyze_image(str(image_dir / "img0.png"), str(tmp_path / "out"),
+                               config=PNG_FEEDBACK_CONFIG, defer_visual=True)
+
+        path = result["visual_feedback_future"].result(timeout=30)
+        assert result["visual_feedback"] == str(path)
+        assert os.path.exists(path)
+        assert load_font(14) is load_font(14)
+
+    def test_iter_analyze_waits_for_rendering(self, image_dir, tmp_path):
+        """画像コンテキストを閉じた後も描画され、終了時に全て完了していることを確認"""
+        results = list(iter_analyze(image_dir, str(tmp_path / "out"), config=PNG_FEEDBACK_CONFIG, defer_visual=True))
+
+        assert all(os.path.exists(r["visual_feedback"]) for r in results)
+        assert len(list((tmp_path / "out").glob("*_feedback_*.png"))) == 4
+
+    def test_watch_directory_analyzes_promptly(self, tmp_path):
+        """監視中に追加された1枚の画像が、次の画像を待たずに監視中のまま解析されることを確認"""
+        watched = tmp_path / "watched"
+        watched.mkdir()
+        stop_event = threading.Event()
+        results = []
+        watcher = watch_directory(watched, str(tmp_path / "out"), generate_visual=False,
+                                  poll_interval=0.01, stop_event=stop_event)
+
+        def watch():
+            for result in watcher:
+                results.append(result)
+
+        thread = threading.Thread(target=watch)
+        thread.start()
+        try:
+            Image.new("RGB", (10, 10)).save(watched / "new.png")
+            for _ in range(500):
+                if results:
+                    break
+                threading.Event().wait(0.01)
+            # 監視を止める前の時点の結果
+            analyzed_while_running = list(results)
+            running = thread.is_alive()
+        finally:
+            stop_event.set()
+            thread.join(10)
+
+        assert running
+        assert len(analyzed_while_running) == 1 and analyzed_while_running[0]["success"]
+        assert not thread.is_alive()
@@ -0,0 +1,137 @@
+"""
+解析済みマニフェストのテスト
+"""
+
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.batch import BatchAnalyzer, main
+from pdfexpy.utils.config import DEFAULT_CONFIG
+from pdfexpy.utils.image_analysis import watch_directory
+from pdfexpy.utils.manifest import AnalysisManifest, hash_config, model_identity
+
+
+class TestAnalysisManifest:
+    """解析済みマニフェストのテストクラス"""
+
+    @pytest.fixture
+    def image_dir(self, tmp_path):
+        """テスト用の画像ディレクトリを作成する"""
+        images = tmp_path / "images"
+        images.mkdir()
+        for i in range(3):
+            Image.new("RGB", (40, 30), color=(i * 50, 0, 0)).save(images / f"img{i}.png")
+        return images
+
+    def test_needs_analysis(self, tmp_path, image_dir):
+        """未記録・内容の変更・更新日時のみの変更が正しく判定されることを確認"""
+        path = image_dir / "img0.png"
+        manifest = AnalysisManifest(tmp_path / "manifest.sqlite3")
+
+        assert manifest.needs_analysis(path)
+        manifest.record(path)
+        assert not manifest.needs_analysis(path)
+
+        # 内容が同じで更新日時のみ変わった場合は解析不要
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        assert not manifest.needs_analysis(path)
+
+        # 同じサイズで内容が変わった場合は解析が必要
+        data = bytearray(path.read_bytes())
+        data[-20] ^= 0xFF
+        path.write_bytes(bytes(data))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+        assert manifest.needs_analysis(path)
+        manifest.close()
+
+    def test_fingerprint_change(self, tmp_path, image_dir):
+        """モデルまたは解析の設定が変わった場合のみ再解析が必要になることを確認"""
+        database = tmp_path / "manifest.sqlite3"
+        with AnalysisManifest(database, config_hash=hash_config(None)) as manifest:
+            manifest.record(image_dir / "img0.png")
+
+        unrelated = {**DEFAULT_CONFIG, "result_sink": {"type": "ndjson"}}
+        with AnalysisManifest(database, config_hash=hash_config(unrelated)) as manifest:
+            assert not manifest.needs_analysis(image_dir / "img0.png")
+
+        changed = {**DEFAULT_CONFIG, "ocr": {**DEFAULT_CONFIG["ocr"], "min_confidence": 0.5}}
+        with AnalysisManifest(database, config_hash=hash_config(changed)) as manifest:
+            assert manifest.needs_analysis(image_dir / "img0.png")
+            assert manifest.stale_count() == 1
+
+        with AnalysisManifest(database, model_version=model_identity(False, "custom.pt")) as manifest:
+            assert manifest.needs_analysis(image_dir / "img0.png")
+
+    def test_tuning_change(self, tmp_path, image_dir):
+        """ワーカー数・キャッシュの大きさなど結果に影響しない設定の変更では再解析しないことを確認"""
+        database = tmp_path / "manifest.sqlite3"
+        with AnalysisManifest(database, config_hash=hash_config(None)) as manifest:
+            manifest.record(image_dir / "img0.png")
+
+        tuned = {
+            **DEFAULT_CONFIG,
+            "ocr": {**DEFAULT_CONFIG["ocr"], "max_workers": 8, "thread_limit": 4,
+                    "cache": {**DEFAULT_CONFIG["ocr"]["cache"], "max_entries": 10}},
+            "model_cache": {"memory_budget_mb": 512},
+            "pipeline": {"workers": {"decode": 4}}
+        }
+        with AnalysisManifest(database, config_hash=hash_config(tuned)) as manifest:
+            assert not manifest.needs_analysis(image_dir / "img0.png")
+            assert manifest.stale_count() == 0
+
+        # 省略した設定はデフォルト値と同じ扱いになる
+        assert hash_config({"ocr": {"min_confidence": 0.3}}) == hash_config(None)
+
+    def test_batch_incremental(self, tmp_path, image_dir):
+        """2回目の一括解析では新しい画像のみが解析されることを確認"""
+        output_dir = str(tmp_path / "out")
+        with AnalysisManifest(tmp_path / "manifest.sqlite3") as manifest:
+            with BatchAnalyzer(output_dir=output_dir, workers=1, generate_visual=False,
+                               manifest=manifest) as analyzer:
+                first = analyzer.run(image_dir)
+                Image.new("RGB", (40, 30), color="blue").save(image_dir / "new.png")
+                second = analyzer.run(image_dir)
+                third = analyzer.run(image_dir)
+
+        assert (first["total"], first["skipped"]) == (3, 0)
+        assert (second["total"], second["skipped"]) == (1, 3)
+        assert (third["total"], third["skipped"], third["success"]) == (0, 4, True)
+
+    def test_main_incremental(self, tmp_path, image_dir, capsys):
+        """コマンドラインの --incremental で解析済みの画像がスキップされることを確認"""
+        args = [str(image_dir), "--no-visual", "-j", "1", "-o", str(tmp_path / "out"), "--incremental"]
+        assert main(args) == 0
+        assert main(args) == 0
+
+        assert "0/0件成功, 0件失敗, 3件スキップ" in capsys.readouterr().out
+        assert (tmp_path / "out" / "manifest.sqlite3").exists()
+
+    def test_watch_incremental(self, tmp_path, image_dir):
+        """監視中に追加された画像が、次の画像を待たずに解析・記録されることを確認"""
+        stop_event = threading.Event()
+        results = []
+
+        with AnalysisManifest(tmp_path / "manifest.sqlite3") as manifest:
+            for i in range(3):
+                manifest.record(image_dir / f"img{i}.png")
+            watcher = watch_directory(image_dir, str(tmp_path / "out"), generate_visual=False,
+                                      poll_interval=0.01, stop_event=stop_event, manifest=manifest)
+            thread = threading.Thread(target=lambda: results.extend(watcher))
+            thread.start()
+            try:
+                Image.new("RGB", (40, 30), color="blue").save(image_dir / "new.png")
+                for _ in range(500):
+                    if not manifest.needs_analysis(image_dir / "new.png"):
+                        break
+                    threading.Event().wait(0.01)
+                recorded_while_running = not manifest.needs_analysis(image_dir / "new.png")
+            finally:
+                stop_event.set()
+                thread.join(10)
+
+        assert recorded_while_running
+        assert [os.path.basename(r["image_path"]) for r in results] == ["new.png"]
@@ -0,0 +1,76 @@
+"""
+メトリクスのテスト
+"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.batch import BatchAnalyzer
+from pdfexpy.utils.manifest import AnalysisManifest
+from pdfexpy.utils.metrics import CONTENT_TYPE, MetricsError, MetricsRegistry, MetricsServer, get_metrics
+from pdfexpy.utils.perf import get_perf_stats
+
+
+class TestMetrics:
+    """メトリクスのテストクラス"""
+
+    def test_render(self):
+        """カウンタ・ゲージ・ステージのヒストグラムが Prometheus のテキスト形式になることを確認"""
+        registry = MetricsRegistry()
+        registry.inc("pdfexpy_frames_captured_total", method="mss")
+        registry.inc("pdfexpy_frames_captured_total", 2, method="mss")
+        registry.set("pdfexpy_model_loaded", 1, model='a"b')
+        get_perf_stats().reset()
+        get_perf_stats().add_stage("decode", 3.0)
+        get_perf_stats().add_stage("decode", 30.0)
+
+        text = registry.render()
+
+        assert "# TYPE pdfexpy_frames_captured_total counter" in text
+        assert 'pdfexpy_frames_captured_total{method="mss"} 3' in text
+        assert 'pdfexpy_model_loaded{model="a\\"b"} 1' in text
+        assert "# TYPE pdfexpy_stage_duration_seconds histogram" in text
+        assert 'pdfexpy_stage_duration_seconds_bucket{stage="decode",le="0.005"} 1' in text
+        assert 'pdfexpy_stage_duration_seconds_bucket{stage="decode",le="+Inf"} 2' in text
+        assert 'pdfexpy_stage_duration_seconds_sum{stage="decode"} 0.033' in text
+
+        with pytest.raises(MetricsError):
+            registry.inc("pdfexpy_model_loaded")
+
+    def test_batch_counters(self, tmp_path):
+        """一括解析で解析・スキップした画像の数が加算されることを確認"""
+        images = tmp_path / "images"
+        images.mkdir()
+        for i in range(2):
+            Image.new("RGB", (40, 30), color=(i * 100, 0, 0)).save(images / f"img{i}.png")
+        metrics = get_metrics()
+        analyzed = metrics.get("pdfexpy_frames_analyzed_total", result="success")
+        skipped = metrics.get("pdfexpy_frames_skipped_total", reason="analyzed")
+
+        with AnalysisManifest(tmp_path / "manifest.sqlite3") as manifest:
+            with BatchAnalyzer(output_dir=str(tmp_path / "out"), workers=1, generate_visual=False,
+                               manifest=manifest) as analyzer:
+                analyzer.run(images)
+                analyzer.run(images)
+
+        assert metrics.get("pdfexpy_frames_analyzed_total", result="success") == analyzed + 2
+        assert metrics.get("pdfexpy_frames_skipped_total", reason="analyzed") == skipped + 2
+
+    def test_server(self):
+        """/metrics で現在の値が返り、それ以外のパスは404になることを確認"""
+        registry = MetricsRegistry()
+        registry.inc("pdfexpy_frames_analyzed_total", result="success")
+
+        with MetricsServer(port=0, registry=registry) as server:
+            url = f"http://127.0.0.1:{server.port}"
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                assert response.headers["Content-Type"] == CONTENT_TYPE
+                body = response.read().decode("utf-8")
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+
+        assert 'pdfexpy_frames_analyzed_total{result="success"} 1' in body
+        assert "pdfexpy_process_resident_memory_bytes" in body
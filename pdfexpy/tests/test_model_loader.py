@@ -0,0 +1,109 @@
+"""
+モデルローダーのメモリ管理のテスト
+"""
+
+import time
+import asyncio
+from unittest.mock import patch
+
+from pdfexpy.models.model_loader import ModelLoader
+
+
+MB = 1024 * 1024
+
+
+def make_loader(budget_mb=None):
+    """メモリ予算を指定したモデルローダーを作成する"""
+    return ModelLoader({"model_cache": {"memory_budget_mb": budget_mb}})
+
+
+class TestModelLoaderMemory:
+    """モデルローダーのメモリ管理のテストクラス"""
+
+    @patch("pdfexpy.models.model_loader.get_process_memory", return_value=0)
+    @patch("pdfexpy.models.model_loader.estimate_model_memory", return_value=100 * MB)
+    def test_memory_is_reported_in_status(self, mock_estimate, mock_rss):
+        """ロードしたモデルのメモリ使用量がmodel_statusに記録されることを確認"""
+        loader = make_loader()
+        loader._register_model("mobilenet", object(), 1.0, 0)
+
+        assert loader.model_status["mobilenet"]["loaded"] is True
+        assert loader.model_status["mobilenet"]["memory_mb"] == 100
+        assert loader.get_memory_report()["total_mb"] == 100
+
+    @patch("pdfexpy.models.model_loader.get_process_memory", return_value=0)
+    @patch("pdfexpy.models.model_loader.estimate_model_memory", return_value=100 * MB)
+    def test_lru_unload_over_budget(self, mock_estimate, mock_rss):
+        """予算を超えると最も長く使われていないモデルがアンロードされることを確認"""
+        loader = make_loader(budget_mb=250)
+        loader._register_model("mobilenet", object(), 1.0, 0)
+        loader._register_model("cocossd", object(), 1.0, 0)
+
+        # mobilenetを使用して、cocossdを最も古いモデルにする
+        asyncio.run(loader.get_model("mobilenet"))
+        loader._register_model("tesseract", {}, 1.0, 0)
+
+        assert set(loader.models) == {"mobilenet", "tesseract"}
+        assert loader.model_status["cocossd"]["loaded"] is False
+        assert loader.model_status["cocossd"]["memory_mb"] == 0.0
+        assert loader.get_total_memory_mb() == 200
+
+    @patch("pdfexpy.models.model_loader.get_process_memory", return_value=0)
+    @patch("pdfexpy.models.model_loader.estimate_model_memory", return_value=10 * MB)
+    def test_get_model_reloads_unloaded_model(self, mock_estimate, mock_rss):
+        """アンロードされたモデルがget_modelで再ロードされることを確認"""
+        loader = make_loader()
+        model = object()
+
+        async def fake_load():
+            loader._register_model("mobilenet", model, 0.1, 0)
+            return {"success": True}
+
+        loader._loaders["mobilenet"] = fake_load
+        loader._register_model("mobilenet", model, 0.1, 0)
+        assert loader.unload_model("mobilenet") is True
+        assert "mobilenet" not in loader.models
+
+        assert asyncio.run(loader.get_model("mobilenet")) is model
+        assert loader.model_status["mobilenet"]["loaded"] is True
+
+    @patch("pdfexpy.models.model_loader.get_process_memory", return_value=0)
+    @patch("pdfexpy.models.model_loader.estimate_model_memory", return_value=10 * MB)
+    def test_unload_idle_models(self, mock_estimate, mock_rss):
+        """アイドル時間を超えたモデルがアンロードされることを確認"""
+        loader = make_loader()
+        loader._register_model("mobilenet", object(), 0.1, 0)
+        loader._lru["mobilenet"] -= 120
+
+        assert loader.unload_idle_models(60) == ["mobilenet"]
+        assert loader.models == {}
+
+    @patch("pdfexpy.models.model_loader.get_process_memory", return_value=0)
+    @patch("pdfexpy.models.model_loader.estimate_model_memory", return_value=10 * MB)
+    def test_idle_models_unloaded_in_background(self, mock_estimate, mock_rss):
+        """アイドル時間を超えたモデルが監視スレッドによりアンロードされることを確認"""
+        loader = ModelLoader({"model_cache": {"idle_timeout_seconds": 0.05}})
+        try:
+            loader._register_model("mobilenet", object(), 0.1, 0)
+            deadline = time.time() + 5
+            while "mobilenet" in loader.models and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            loader.close()
+
+        assert "mobilenet" not in loader.models
+
+    @patch("pdfexpy.models.model_loader.shutdown_engine_pools")
+    @patch("pdfexpy.models.model_loader.get_engine_pool_usage")
+    def test_ocr_worker_pools_are_accounted(self, mock_usage, mock_shutdown):
+        """常駐OCRワーカーのメモリがtesseractに計上され、アンロードで終了されることを確認"""
+        mock_usage.return_value = {"pools": 1, "memory_bytes": 300 * MB, "last_used": time.time()}
+        loader = make_loader()
+
+        report = loader.get_memory_report()
+        assert report["total_mb"] == 300
+        assert report["models"]["tesseract"]["memory_mb"] == 300
+
+        assert loader.unload_model("tesseract") is True
+        mock_shutdown.assert_called_once()
+        assert loader.get_total_memory_mb() == 0
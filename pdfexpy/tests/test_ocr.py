@@ -0,0 +1,197 @@
+"""
+OCR機能のテスト
+"""
+
+import pytest
+from concurrent.futures import Future
+from unittest.mock import patch, MagicMock
+import numpy as np
+
+from pdfexpy.utils.ocr import (
+    extract_text,
+    find_text_bands,
+    select_text_regions,
+    OCRError
+)
+from pdfexpy.models.ocr_engine import TesseractEngine, parse_tesseract_config
+
+
+def make_tesseract_mock(words):
+    """image_to_dataの戻り値を返すpytesseractのモックを作成する"""
+    mock_tesseract = MagicMock()
+    mock_tesseract.image_to_data.return_value = {
+        "text": [w for w, _ in words],
+        "conf": [c for _, c in words],
+        "block_num": [1] * len(words),
+        "par_num": [1] * len(words),
+        "line_num": [1] * len(words),
+    }
+    return mock_tesseract
+
+
+class InlineEnginePool:
+    """ワーカープロセスを起動せずに同一プロセスで認識するテスト用プール"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def submit(self, crop):
+        future = Future()
+        future.set_result(self.engine.recognize(crop))
+        return future
+
+
+class TestOCR:
+    """OCR機能のテストクラス"""
+
+    @pytest.fixture
+    def text_image(self):
+        """2行の「文字」を含むテスト用画像を作成する"""
+        img = np.full((120, 200, 3), 255, dtype=np.uint8)
+        img[20:35, 10:150] = 0
+        img[70:85, 30:180] = 0
+        return img
+
+    def test_select_text_regions(self):
+        """テキストらしいラベルのみが選択されることを確認"""
+        objects = [
+            {"label": "text", "bbox": {"x": 1, "y": 2, "width": 3, "height": 4}},
+            {"label": "person", "bbox": {"x": 5, "y": 6, "width": 7, "height": 8}},
+        ]
+        assert select_text_regions(objects) == [{"x": 1, "y": 2, "width": 3, "height": 4}]
+        assert select_text_regions(objects, ["person"]) == [{"x": 5, "y": 6, "width": 7, "height": 8}]
+
+    def test_find_text_bands(self, text_image):
+        """空白行で区切られた横帯が検出されることを確認"""
+        bands = find_text_bands(text_image)
+        assert len(bands) == 2
+        assert bands[0]["y"] <= 20 and bands[0]["y"] + bands[0]["height"] >= 35
+        assert bands[1]["y"] <= 70 and bands[1]["y"] + bands[1]["height"] >= 85
+
+    def test_find_text_bands_blank_image(self):
+        """空白の画像では領域が検出されないことを確認"""
+        assert find_text_bands(np.full((50, 50, 3), 255, dtype=np.uint8)) == []
+
+    def test_extract_text(self, text_image):
+        """領域ごとのOCR結果が集約されることを確認"""
+        mock_tesseract = make_tesseract_mock([("Hello", 90), ("", -1), ("World", 70)])
+        with patch("pdfexpy.models.ocr_engine.PYTESSERACT_AVAILABLE", True), \
+             patch("pdfexpy.models.ocr_engine.TESSEROCR_AVAILABLE", False), \
+             patch("pdfexpy.models.ocr_engine.pytesseract", mock_tesseract, create=True):
+            pool = InlineEnginePool(TesseractEngine("eng", "--psm 6"))
+            with patch("pdfexpy.utils.ocr.TESSERACT_AVAILABLE", True), \
+                 patch("pdfexpy.utils.ocr.get_engine_pool", return_value=pool):
+                result = extract_text(text_image, language="eng")
+
+        assert result["detected"] is True
+        assert len(result["regions"]) == 2
+        assert result["regions"][0]["text"] == "Hello World"
+        assert result["regions"][0]["confidence"] == pytest.approx(0.8)
+        assert result["text"] == "Hello World\nHello World"
+        assert mock_tesseract.image_to_data.call_count == 2
+
+    def test_extract_text_unavailable(self, text_image):
+        """pytesseractがない場合にOCRErrorが発生することを確認"""
+        with patch("pdfexpy.utils.ocr.TESSERACT_AVAILABLE", False):
+            with pytest.raises(OCRError):
+                extract_text(text_image)
+
+    def test_parse_tesseract_config(self):
+        """Tesseractの設定文字列が解析されることを確認"""
+        options = parse_tesseract_config("--psm 6 --oem 1 -c preserve_interword_spaces=1")
+        assert options["psm"] == 6
+        assert options["oem"] == 1
+        assert options["variables"] == {"preserve_interword_spaces": "1"}
+
+    def test_engine_reuses_tesserocr_api(self):
+        """tesserocrの場合はAPIが一度だけ初期化され、使い回されることを確認"""
+        mock_tesserocr = MagicMock()
+        api = mock_tesserocr.PyTessBaseAPI.return_value
+        api.GetUTF8Text.return_value = "Hello\n\nWorld\n"
+        api.AllWordConfidences.return_value = [80, 60]
+
+        with patch("pdfexpy.models.ocr_engine.TESSEROCR_AVAILABLE", True), \
+             patch("pdfexpy.models.ocr_engine.tesserocr", mock_tesserocr, create=True):
+            engine = TesseractEngine("jpn+eng", "--psm 7")
+            crop = np.zeros((10, 10, 3), dtype=np.uint8)
+            first = engine.recognize(crop)
+            engine.recognize(crop)
+            engine.close()
+
+        mock_tesserocr.PyTessBaseAPI.assert_called_once_with(lang="jpn+eng", psm=7)
+        assert api.SetImage.call_count == 2
+        assert first == {"text": "Hello\nWorld", "confidence": pytest.approx(0.7)}
+        api.End.assert_called_once()
+
+    def test_extract_text_uses_cache(self, text_image):
+        """同じ領域の2回目以降はキャッシュから返されることを確認"""
+        from pdfexpy.utils.ocr_cache import OCRCache
+
+        cache = OCRCache()
+        pool = MagicMock()
+        future = Future()
+        future.set_result({"text": "Hello", "confidence": 0.9})
+        pool.submit.return_value = future
+
+        with patch("pdfexpy.utils.ocr.TESSERACT_AVAILABLE", True), \
+             patch("pdfexpy.utils.ocr.get_engine_pool", return_value=pool):
+            first = extract_text(text_image, cache=cache)
+            second = extract_text(text_image, cache=cache)
+
+        assert pool.submit.call_count == 2
+        assert first == second
+        assert cache.get_stats()["hits"] == 2
+
+    def test_thread_limit_set_only_in_workers(self):
+        """OMP_THREAD_LIMITがワーカーの初期化処理でのみ設定され、親プロセスに残らないことを確認"""
+        import os
+        from pdfexpy.models import ocr_engine
+
+        with patch.dict(os.environ, {"OMP_THREAD_LIMIT": "8"}), \
+             patch("pdfexpy.models.ocr_engine.resolve_backend", return_value="pytesseract"), \
+             patch("pdfexpy.models.ocr_engine.ProcessPoolExecutor") as executor:
+            ocr_engine.TesseractEnginePool("eng", "--psm 6", max_workers=1, thread_limit=3)
+            assert os.environ["OMP_THREAD_LIMIT"] == "8"
+
+            kwargs = executor.call_args.kwargs
+            assert kwargs["initializer"] is ocr_engine._init_worker
+            with patch("pdfexpy.models.ocr_engine.TesseractEngine"):
+                kwargs["initializer"](*kwargs["initargs"])
+            assert os.environ["OMP_THREAD_LIMIT"] == "3"
+
+    def test_broken_pool_is_replaced(self):
+        """ワーカーが異常終了したプールは再利用されず作り直されることを確認"""
+        from concurrent.futures.process import BrokenProcessPool
+        from pdfexpy.models import ocr_engine
+
+        executor = MagicMock()
+        broken_future = Future()
+        executor.submit.return_value = broken_future
+
+        with patch("pdfexpy.models.ocr_engine.resolve_backend", return_value="pytesseract"), \
+             patch("pdfexpy.models.ocr_engine.ProcessPoolExecutor", return_value=executor):
+            try:
+                first = ocr_engine.get_engine_pool("test-broken", max_workers=1)
+                assert ocr_engine.get_engine_pool("test-broken", max_workers=1) is first
+
+                first.submit(np.zeros((4, 4), dtype=np.uint8))
+                broken_future.set_exception(BrokenProcessPool("initializer failed"))
+                assert first.broken is True
+
+                second = ocr_engine.get_engine_pool("test-broken", max_workers=1)
+                assert second is not first
+                executor.shutdown.assert_called_once_with(wait=False)
+            finally:
+                ocr_engine._pools.clear()
+
+    def test_run_ocr_stage_uses_region_psm(self, text_image):
+        """解析パイプラインのOCRがページ用ではなく領域用のPSMを使うことを確認"""
+        from pdfexpy.utils.image_context import ImageContext
+        from pdfexpy.utils.image_analysis import run_ocr_stage
+
+        context = ImageContext.from_array(text_image)
+        with patch("pdfexpy.utils.image_analysis.OCR_AVAILABLE", True), \
+             patch("pdfexpy.utils.image_analysis.extract_text", return_value={"detected": False}) as mock_extract:
+            run_ocr_stage(context, [])
+
+        assert mock_extract.call_args.kwargs["config"] == "--psm 6"
@@ -0,0 +1,59 @@
+"""
+OCRキャッシュのテスト
+"""
+
+import numpy as np
+
+from pdfexpy.utils.ocr_cache import OCRCache
+
+
+class TestOCRCache:
+    """OCRキャッシュのテストクラス"""
+
+    def test_key_depends_on_pixels_and_config(self):
+        """キーがピクセルと言語・PSM設定に依存することを確認"""
+        crop = np.zeros((10, 20, 3), dtype=np.uint8)
+        other = crop.copy()
+        other[0, 0, 0] = 1
+
+        key = OCRCache.make_key(crop, "jpn+eng", "--psm 3")
+        assert key == OCRCache.make_key(crop.copy(), "jpn+eng", "--psm 3")
+        assert key != OCRCache.make_key(other, "jpn+eng", "--psm 3")
+        assert key != OCRCache.make_key(crop, "eng", "--psm 3")
+        assert key != OCRCache.make_key(crop, "jpn+eng", "--psm 6")
+
+    def test_lru_eviction(self):
+        """上限を超えると最も古く使われたエントリが追い出されることを確認"""
+        cache = OCRCache(max_entries=2)
+        cache.put("a", {"text": "A"})
+        cache.put("b", {"text": "B"})
+        assert cache.get("a") == {"text": "A"}
+        cache.put("c", {"text": "C"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_disk_spill(self, tmp_path):
+        """追い出したエントリがディスクから復元されることを確認"""
+        cache = OCRCache(max_entries=1, disk_dir=str(tmp_path / "cache"))
+        cache.put("a" * 32, {"text": "メニュー", "confidence": 0.9})
+        cache.put("b" * 32, {"text": "ファイル", "confidence": 0.8})
+
+        assert len(cache) == 1
+        assert cache.get("a" * 32) == {"text": "メニュー", "confidence": 0.9}
+        assert cache.get_stats()["disk_hits"] == 1
+
+    def test_promotion_spills_evicted_entry(self, tmp_path):
+        """ディスクから復元した際に追い出されたエントリもディスクへ退避されることを確認"""
+        cache = OCRCache(max_entries=1, disk_dir=str(tmp_path / "cache"))
+        cache.put("a" * 32, {"text": "A"})
+        cache.put("b" * 32, {"text": "B"})
+
+        # aの復元でbが追い出されるが、bもディスクから取得できる
+        assert cache.get("a" * 32) == {"text": "A"}
+        assert cache.get("b" * 32) == {"text": "B"}
+        assert cache.get_stats()["disk_hits"] == 2
@@ -0,0 +1,138 @@
+"""
+注釈オーバーレイのテスト
+"""
+
+import json
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.image_analysis import analyze_image, generate_visual_feedback
+from pdfexpy.utils.overlay import (
+    build_overlay,
+    read_overlay,
+    write_overlay,
+    rasterize_overlay,
+    render_overlay_file,
+    preview_max_dimension,
+    save_raster,
+    OverlayError
+)
+
+
+ANALYSIS_RESULTS = {
+    "image_details": {"image_info": {"orientation": "landscape", "aspect_ratio_name": "4:3"}},
+    "analysis": {
+        "objects": [{"label": "dialog", "confidence": 0.9, "bbox": {"x": 100, "y": 100, "width": 200, "height": 100}}],
+        "ocr": {"detected": True, "regions": [
+            {"text": "OK & <Cancel>", "confidence": 0.8, "bbox": {"x": 120, "y": 150, "width": 40, "height": 20}}
+        ]},
+        "description": "テスト"
+    }
+}
+
+
+class TestOverlay:
+    """注釈オーバーレイのテストクラス"""
+
+    @pytest.fixture
+    def image_path(self, tmp_path):
+        """テスト用の画像を作成する"""
+        path = tmp_path / "screen.png"
+        Image.new("RGB", (800, 600), color="white").save(path)
+        return path
+
+    def test_build_overlay(self):
+        """検出物体・テキスト領域・情報パネルがレイヤーに含まれることを確認"""
+        overlay = build_overlay(ANALYSIS_RESULTS, 800, 600, "/shots/screen.png")
+
+        assert [s["category"] for s in overlay["shapes"]] == ["object", "text"]
+        assert overlay["shapes"][0]["label"] == "dialog (0.90)"
+        assert len(overlay["panels"]) == 2
+        assert overlay["panels"][1]["y"] == 600 - 4 * 25 - 15
+
+    @pytest.mark.parametrize("suffix", [".svg", ".json"])
+    def test_write_and_read(self, tmp_path, image_path, suffix):
+        """SVG・JSONに保存したオーバーレイを読み戻せることを確認"""
+        overlay = build_overlay(ANALYSIS_RESULTS, 800, 600, str(image_path))
+        path = write_overlay(overlay, tmp_path / f"overlay{suffix}")
+
+        assert read_overlay(path) == json.loads(json.dumps(overlay))
+        if suffix == ".svg":
+            assert 'xlink:href="screen.png"' in path.read_text(encoding="utf-8")
+        with pytest.raises(OverlayError):
+            write_overlay(overlay, tmp_path / "overlay.png")
+
+    def test_rasterize_preview(self, tmp_path, image_path):
+        """縮小したプレビューに枠が拡大縮小されて描画されることを確認"""
+        overlay = build_overlay(ANALYSIS_RESULTS, 800, 600, str(image_path))
+        write_overlay(overlay, tmp_path / "overlay.svg")
+
+        preview = Image.open(render_overlay_file(tmp_path / "overlay.svg", tmp_path / "preview.png", max_dimension=400))
+        assert preview.size == (400, 300)
+        # 物体の枠 (100, 100)-(300, 200) は縮小後 (50, 50)-(150, 100) に描画される
+        assert preview.getpixel((50, 90))[:3] == (0, 255, 0)
+        assert preview.getpixel((140, 95))[:3] == (255, 255, 255)
+
+        full = rasterize_overlay(overlay, Image.open(image_path))
+        assert full.size == (800, 600)
+        assert full.getpixel((100, 180))[:3] == (0, 255, 0)
+
+    def test_rasterize_drafted_jpeg(self, tmp_path):
+        """draft で縮小して読み込んだ大きなJPEGでも枠が元画像の座標系から拡大縮小されることを確認"""
+        path = tmp_path / "large.jpg"
+        Image.new("RGB", (4000, 3000), color="white").save(path, quality=95)
+        results = {"analysis": {"objects": [
+            {"label": "dialog", "confidence": 0.9, "bbox": {"x": 2000, "y": 1500, "width": 1600, "height": 1200}}
+        ]}}
+        overlay = build_overlay(results, 4000, 3000, str(path))
+
+        with Image.open(path) as img:
+            img.draft("RGB", (1000, 1000))
+            # draft 後もまだ max_dimension より大きい
+            assert 1000 < img.size[0] < 4000
+
+        preview = rasterize_overlay(overlay, max_dimension=1000)
+        assert preview.size == (1000, 750)
+        # 物体の枠 (2000, 1500)-(3600, 2700) は縮小後 (500, 375)-(900, 675) に描画される
+        assert preview.getpixel((500, 500))[:3] == (0, 255, 0)
+        assert preview.getpixel((700, 675))[:3] == (0, 255, 0)
+        assert preview.getpixel((700, 500))[:3] == (255, 255, 255)
+
+    def test_analyze_image_writes_overlay(self, tmp_path, image_path):
+        """analyze_image の既定の視覚的フィードバックがオーバーレイであることを確認"""
+        result = analyze_image(str(image_path), str(tmp_path / "out"), defer_visual=True)
+
+        assert result["visual_feedback"].endswith(".svg")
+        assert "visual_feedback_future" not in result
+        assert read_overlay(result["visual_feedback"])["image"]["width"] == 800
+
+    def test_preview_max_dimension(self):
+        """サムネイルのみの設定ではサムネイルの大きさが使われることを確認"""
+        assert preview_max_dimension(None) is None
+        assert preview_max_dimension({"max_dimension": 1280}) == 1280
+        assert preview_max_dimension({"max_dimension": 1280, "thumbnail_only": True, "thumbnail_dimension": 200}) == 200
+
+    def test_save_raster_quality(self, tmp_path):
+        """非可逆形式では品質の指定がファイルサイズに反映されることを確認"""
+        image = Image.effect_noise((256, 256), 64).convert("RGBA")
+        low = save_raster(image, tmp_path / "low.jpg", quality=20)
+        high = save_raster(image, tmp_path / "high.jpg", quality=95)
+        webp = save_raster(image, tmp_path / "preview.webp", quality=50)
+
+        assert Image.open(low).format == "JPEG"
+        assert Image.open(webp).format == "WEBP"
+        assert low.stat().st_size < high.stat().st_size
+
+    def test_generate_visual_feedback_preview(self, tmp_path, image_path):
+        """プレビュー設定で縮小したJPEGに枠が縮尺に合わせて描画されることを確認"""
+        preview = {"max_dimension": 400, "quality": 90}
+        path = generate_visual_feedback(str(image_path), ANALYSIS_RESULTS, tmp_path / "feedback.jpg", preview)
+
+        image = Image.open(path)
+        assert image.format == "JPEG"
+        assert image.size == (400, 300)
+        # 物体の枠 (100, 100)-(300, 200) の左辺は縮小後 x=50 に描画される（非可逆圧縮のため色は近似で判定）
+        r, g, b = image.getpixel((50, 90))
+        assert g - r > 60 and g - b > 60
+        assert min(image.getpixel((100, 90))) > 200
@@ -0,0 +1,76 @@
+"""
+ステージごとの処理時間の計測・集計のテスト
+"""
+
+import time
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.image_analysis import analyze_image
+from pdfexpy.utils.perf import PerfStats, StageTimer, get_perf_stats, main, percentile, summarize_results
+
+
+class TestPerf:
+    """処理時間の計測・集計のテストクラス"""
+
+    def test_stage_timer(self):
+        """ステージの時間が計測順に加算されることを確認"""
+        timer = StageTimer()
+        with timer.stage("decode"):
+            time.sleep(0.01)
+        with timer.stage("stats"):
+            pass
+        timer.add("decode", 5_000_000)
+
+        stages = timer.stages_ms()
+        assert list(stages) == ["decode", "stats"]
+        assert stages["decode"] >= 15
+        assert timer.elapsed_seconds() >= 0.01
+
+    def test_percentiles(self):
+        """パーセンタイルが線形補間で計算され、直近の計測値のみが使われることを確認"""
+        assert percentile([], 50) is None
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == pytest.approx(2.5)
+
+        stats = PerfStats(window=100)
+        for value in range(200):
+            stats.add({"stages_ms": {"inference": float(value)}, "analysis_time_ms": 1.0})
+        summary = stats.summary()
+
+        assert summary["inference"]["count"] == 200
+        assert summary["inference"]["p50"] == pytest.approx(149.5)
+        assert summary["inference"]["max"] == 199
+        assert summary["analysis"]["p99"] == 1.0
+
+    def test_analyze_image_performance(self, tmp_path):
+        """解析結果にステージごとの処理時間・画像サイズ・モデルが記録されることを確認"""
+        image_path = tmp_path / "screen.png"
+        Image.new("RGB", (64, 48)).save(image_path)
+        get_perf_stats().reset()
+
+        result = analyze_image(str(image_path), str(tmp_path / "out"))
+        performance = result["results"]["performance"]
+
+        assert set(performance["stages_ms"]) == {"decode", "stats", "inference", "render", "write"}
+        assert performance["image"] == {"width": 64, "height": 48, "megapixels": 0.003}
+        assert performance["model"] == {"name": "mock", "id": "mock"}
+        assert get_perf_stats().summary()["write"]["count"] == 1
+
+    def test_cli(self, tmp_path, capsys):
+        """保存した解析結果からステージごとのパーセンタイルを表示できることを確認"""
+        for i in range(3):
+            image_path = tmp_path / f"screen{i}.png"
+            Image.new("RGB", (64, 48)).save(image_path)
+            analyze_image(str(image_path), str(tmp_path / "out"), generate_visual=False)
+
+        summary = summarize_results(tmp_path / "out", model="mock")
+        # 書き込みの時間は保存した結果には含まれない
+        assert set(summary) == {"decode", "stats", "inference", "analysis"}
+        assert summary["decode"]["count"] == 3
+        assert summarize_results(tmp_path / "out", model="yolov8") == {}
+
+        assert main([str(tmp_path / "out"), "--limit", "2"]) == 0
+        out = capsys.readouterr().out
+        assert "p99" in out and "inference" in out
+        assert main([str(tmp_path / "empty")]) == 1
@@ -0,0 +1,101 @@
+"""
+ステージ別パイプラインのテスト
+"""
+
+import threading
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.batch import main
+from pdfexpy.utils.pipeline import AnalysisPipeline, Pipeline, PipelineError, Stage, StageFailure
+
+
+class TestPipeline:
+    """ステージ別パイプラインのテストクラス"""
+
+    def test_run(self):
+        """全ての項目が全ステージを通過し、失敗した項目は StageFailure になることを確認"""
+        def check(x):
+            if x == 3:
+                raise ValueError("bad")
+            return x
+
+        pipeline = Pipeline([
+            Stage("double", lambda x: x * 2, workers=2),
+            Stage("check", lambda x: check(x // 2)),
+            Stage("add", lambda x: x + 100, workers=3)
+        ])
+        outputs = list(pipeline.run(range(10)))
+
+        failures = [o for o in outputs if isinstance(o, StageFailure)]
+        assert sorted(o for o in outputs if not isinstance(o, StageFailure)) == [x + 100 for x in range(10) if x != 3]
+        assert len(failures) == 1 and failures[0].stage == "check"
+
+        stats = pipeline.stats()["stages"]
+        assert stats["double"]["processed"] == 10
+        assert stats["check"]["failed"] == 1
+        assert stats["add"]["processed"] == 9
+
+    def test_backpressure(self):
+        """下流が詰まっている間は入力を読み進めないことを確認"""
+        release = threading.Event()
+        consumed = []
+
+        def source():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        pipeline = Pipeline([Stage("slow", lambda x: release.wait() and x, queue_size=2)], output_queue_size=1)
+        outputs = pipeline.run(source())
+        thread = threading.Thread(target=lambda: next(outputs))
+        thread.start()
+        thread.join(0.5)
+
+        # 処理中1件 + キュー2件 + 投入待ち1件 を超えて読み進めない
+        assert len(consumed) <= 4
+        release.set()
+        thread.join()
+        assert len(list(outputs)) == 99
+
+    def test_early_stop(self):
+        """途中でループを抜けると全てのステージが停止することを確認"""
+        pipeline = Pipeline([Stage("identity", lambda x: x, workers=2)])
+        for output in pipeline.run(iter(range(1000))):
+            break
+
+        assert not [t for t in threading.enumerate() if t.name.startswith("pdfexpy-pipeline-identity")]
+        with pytest.raises(PipelineError):
+            Pipeline([Stage("a", str), Stage("a", str)])
+
+    def test_analysis_pipeline(self, tmp_path):
+        """画像の解析結果が保存され、壊れた画像はデコードステージの失敗になることを確認"""
+        images = tmp_path / "images"
+        images.mkdir()
+        for i in range(4):
+            Image.new("RGB", (40, 30), color=(i * 50, 0, 0)).save(images / f"img{i}.png")
+        (images / "broken.png").write_bytes(b"not an image")
+
+        with AnalysisPipeline(str(tmp_path / "out"), generate_visual=True, workers={"decode": 2}) as analysis:
+            results = list(analysis.run(images))
+            stats = analysis.stats()
+
+        succeeded = [r for r in results if r["success"]]
+        failed = [r for r in results if not r["success"]]
+        assert len(succeeded) == 4
+        assert all(r["visual_feedback"].endswith(".svg") for r in succeeded)
+        assert failed[0]["stage"] == "decode"
+        assert stats["stages"]["persist"]["processed"] == 4
+        assert len(list((tmp_path / "out").glob("analysis_*.json"))) == 4
+
+    def test_main_pipeline(self, tmp_path, capsys):
+        """コマンドラインの --pipeline でステージごとの統計が表示されることを確認"""
+        images = tmp_path / "images"
+        images.mkdir()
+        Image.new("RGB", (40, 30)).save(images / "img.png")
+
+        assert main([str(images), "--no-visual", "--pipeline", "-o", str(tmp_path / "out")]) == 0
+        out = capsys.readouterr().out
+        assert "1/1件成功" in out
+        assert "detect: ワーカー 1, 1件" in out
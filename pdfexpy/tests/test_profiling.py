@@ -0,0 +1,60 @@
+"""
+プロファイルのテスト
+"""
+
+import time
+
+import pytest
+from PIL import Image
+
+from pdfexpy.utils.image_analysis import analyze_image
+from pdfexpy.utils.perf import StageTimer, active_stages
+from pdfexpy.utils.profiling import Profiler, ProfilingError
+
+
+def busy(seconds):
+    """指定した時間だけCPUを使う"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfiler:
+    """プロファイラのテストクラス"""
+
+    def test_cprofile_stages(self, tmp_path):
+        """cProfile の結果がステージごとに集計されることを確認"""
+        image_path = tmp_path / "screen.png"
+        Image.new("RGB", (64, 48)).save(image_path)
+
+        with Profiler(tmp_path / "profiles", profiler="cprofile", top=5) as profiler:
+            analyze_image(str(image_path), str(tmp_path / "out"))
+
+        summary = open(profiler.outputs["summary"], encoding="utf-8").read()
+        assert "[decode]" in summary and "[render]" in summary and "[(other)]" in summary
+        assert profiler.outputs["stats"].endswith(".prof")
+
+    def test_sampling(self, tmp_path):
+        """サンプリングの結果が collapsed stacks 形式でステージ名を先頭に保存されることを確認"""
+        timer = StageTimer()
+        with Profiler(tmp_path, profiler="sample", interval=0.001) as profiler:
+            with timer.stage("inference"):
+                assert "inference" in active_stages().values()
+                busy(0.1)
+        assert not active_stages()
+
+        lines = open(profiler.outputs["stacks"], encoding="utf-8").read().splitlines()
+        assert any(line.startswith("inference;") and "busy (test_profiling.py" in line for line in lines)
+        assert int(lines[0].rsplit(" ", 1)[1]) > 0
+        assert "[inference]" in open(profiler.outputs["summary"], encoding="utf-8").read()
+
+    def test_errors(self, tmp_path):
+        """未対応のプロファイラと二重の開始がエラーになることを確認"""
+        with pytest.raises(ProfilingError):
+            Profiler(tmp_path, profiler="unknown")
+
+        profiler = Profiler(tmp_path)
+        profiler.start()
+        with pytest.raises(ProfilingError):
+            profiler.start()
+        profiler.stop()
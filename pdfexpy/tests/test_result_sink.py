@@ -0,0 +1,119 @@
+"""
+結果の出力先（シンク）のテスト
+"""
+
+import os
+import json
+import time
+
+import pytest
+from unittest.mock import patch
+from PIL import Image
+
+from pdfexpy.utils.result_sink import (
+    JsonFileSink,
+    NDJSONSink,
+    ResultSinkError,
+    create_result_sink,
+    dumps_compact,
+    iter_records,
+    iter_recent_records
+)
+from pdfexpy.utils.image_analysis import analyze_image
+
+
+class TestResultSink:
+    """結果の出力先のテストクラス"""
+
+    def test_dumps_compact(self):
+        """改行を含まないコンパクトなJSONになることを確認"""
+        data = dumps_compact({"name": "テスト", "values": [1, 2], "nested": {"a": None}})
+
+        assert b"\n" not in data and b" " not in data
+        assert json.loads(data) == {"name": "テスト", "values": [1, 2], "nested": {"a": None}}
+        assert json.loads(dumps_compact({1: "x"})) == {"1": "x"}
+
+    def test_ndjson_buffers_until_flush(self, tmp_path):
+        """バッファが書き出されるまでファイルに書き込まれないことを確認"""
+        sink = NDJSONSink(tmp_path, buffer_bytes=1024 * 1024, flush_seconds=None)
+        path = sink.write({"i": 0}, "a")
+        sink.write({"i": 1}, "b")
+
+        assert open(path, "rb").read() == b""
+        sink.flush()
+        assert [json.loads(line) for line in open(path, encoding="utf-8")] == [{"i": 0}, {"i": 1}]
+        sink.close()
+
+    def test_ndjson_flushes_when_idle(self, tmp_path):
+        """次の書き込みがなくても flush_seconds を過ぎるとバッファが書き出されることを確認"""
+        sink = NDJSONSink(tmp_path, buffer_bytes=1024 * 1024, flush_seconds=0.05)
+        path = sink.write({"i": 0}, "a")
+
+        deadline = time.monotonic() + 5
+        while open(path, "rb").read() == b"" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with sink._lock:
+            # タイマーによる書き出しの完了を待つ
+            pass
+        assert [json.loads(line) for line in open(path, encoding="utf-8")] == [{"i": 0}]
+        sink.close()
+
+    def test_iter_recent_records(self, tmp_path):
+        """新しいファイルの末尾から順に読み込み、古いファイルは必要になるまで開かないことを確認"""
+        old = tmp_path / "old.ndjson"
+        old.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(3)), encoding="utf-8")
+        middle = tmp_path / "middle.json"
+        middle.write_text(json.dumps({"i": 3}), encoding="utf-8")
+        new = tmp_path / "new.ndjson"
+        new.write_text("".join(json.dumps({"i": i, "pad": "x" * 50}) + "\n" for i in range(4, 3000)),
+                       encoding="utf-8")
+        for offset, path in enumerate([old, middle, new]):
+            os.utime(path, (1000 + offset, 1000 + offset))
+
+        with patch("builtins.open", wraps=open) as opened:
+            records = iter_recent_records(tmp_path)
+            assert [next(records)["i"] for _ in range(3)] == [2999, 2998, 2997]
+            records.close()
+        assert [call.args[0] for call in opened.call_args_list] == [new]
+
+        assert [r["i"] for r in iter_recent_records(tmp_path)] == list(range(2999, -1, -1))
+
+    def test_ndjson_rotates_by_size(self, tmp_path):
+        """最大サイズを超えると新しいファイルに切り替わることを確認"""
+        with NDJSONSink(tmp_path, max_bytes=110, buffer_bytes=0) as sink:
+            paths = [sink.write({"payload": "x" * 30, "i": i}, "img") for i in range(6)]
+
+        files = sorted(tmp_path.glob("*.ndjson"))
+        assert len(set(paths)) == len(files) == 3
+        assert all(f.stat().st_size <= 110 for f in files)
+        assert sorted(r["i"] for r in iter_records(tmp_path)) == list(range(6))
+
+    def test_ndjson_rotates_by_time(self, tmp_path):
+        """ローテーション間隔を過ぎると新しいファイルに切り替わることを確認"""
+        with NDJSONSink(tmp_path, rotate_seconds=0) as sink:
+            first = sink.write({"i": 0}, "img")
+            second = sink.write({"i": 1}, "img")
+
+        assert first != second
+
+    def test_create_result_sink(self, tmp_path):
+        """設定に応じたシンクが作成されることを確認"""
+        assert isinstance(create_result_sink(None, tmp_path), JsonFileSink)
+        sink = create_result_sink({"result_sink": {"type": "ndjson", "max_mb": 1}}, tmp_path)
+        assert isinstance(sink, NDJSONSink) and sink.max_bytes == 1024 * 1024
+        sink.close()
+        with pytest.raises(ResultSinkError):
+            create_result_sink({"result_sink": {"type": "xml"}}, tmp_path)
+
+    def test_analyze_image_with_sink(self, tmp_path):
+        """analyze_image の結果がシンクに書き込まれることを確認"""
+        image_path = tmp_path / "screen.png"
+        Image.new("RGB", (40, 30)).save(image_path)
+
+        with NDJSONSink(tmp_path / "out") as sink:
+            result = analyze_image(str(image_path), str(tmp_path / "out"), generate_visual=False, sink=sink)
+
+        assert result["result_file"].endswith(".ndjson")
+        assert not list((tmp_path / "out").glob("*.json"))
+        records = list(iter_records(tmp_path / "out"))
+        assert records[0]["metadata"]["image_path"] == str(image_path)
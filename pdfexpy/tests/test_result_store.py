@@ -0,0 +1,87 @@
+"""
+SQLite結果ストアのテスト
+"""
+
+import datetime
+
+import pytest
+
+from pdfexpy.utils.result_sink import NDJSONSink, create_result_sink
+from pdfexpy.utils.result_store import SQLiteResultStore
+
+
+def make_record(timestamp, brightness, objects, regions=()):
+    """テスト用の解析結果を作成する"""
+    return {
+        "metadata": {"image_path": f"/shots/{timestamp}.png", "mode": "mock_analysis"},
+        "image_details": {
+            "file_info": {"filename": f"{timestamp}.png"},
+            "image_info": {"width": 800, "height": 600,
+                           "color_info": {"brightness_percent": brightness, "theme": "dark" if brightness < 40 else "light"}}
+        },
+        "analysis": {
+            "objects": [{"label": label, "confidence": conf, "bbox": {"x": 1, "y": 2, "width": 3, "height": 4}}
+                        for label, conf in objects],
+            "ocr": {"regions": [{"text": text, "confidence": 0.9, "bbox": {"x": 0, "y": 0, "width": 5, "height": 5}}
+                                for text in regions]}
+        },
+        "timestamp": timestamp
+    }
+
+
+class TestSQLiteResultStore:
+    """SQLite結果ストアのテストクラス"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """テスト用の結果を保存したストアを作成する"""
+        store = SQLiteResultStore(tmp_path / "results.sqlite3", batch_size=10)
+        store.add_results([
+            make_record("2026-10-16T10:00:00", 20, [("dialog", 0.9)], ["保存しますか？"]),
+            make_record("2026-10-17T09:00:00", 25, [("dialog", 0.8), ("button", 0.7)], ["OK", "キャンセル"]),
+            make_record("2026-10-17T12:00:00", 90, [("dialog", 0.95)]),
+            make_record("2026-10-17T18:00:00", 15, [("window", 0.6)]),
+        ])
+        yield store
+        store.close()
+
+    def test_query_images(self, store):
+        """昨日のダイアログを含む暗い画像が検索できることを確認"""
+        rows = store.query_images(since=datetime.date(2026, 10, 17), until=datetime.date(2026, 10, 18),
+                                  label="dialog", max_brightness=30)
+
+        assert [row["timestamp"] for row in rows] == ["2026-10-17T09:00:00"]
+        assert store.query_images(label="dialog", min_confidence=0.92)[0]["brightness_percent"] == 90
+        assert len(store.query_images(text="キャンセル")) == 1
+        assert len(store.query_images(theme="dark", limit=2)) == 2
+
+    def test_detections_and_regions(self, store):
+        """検出物体とOCR領域が正規化されて保存されることを確認"""
+        image_id = store.query_images(text="OK")[0]["id"]
+
+        assert [d["label"] for d in store.get_detections(image_id)] == ["dialog", "button"]
+        assert [r["text"] for r in store.get_ocr_regions(image_id)] == ["OK", "キャンセル"]
+        assert store.label_counts(since="2026-10-17") == {"dialog": 2, "button": 1, "window": 1}
+
+    def test_batched_writes(self, tmp_path):
+        """バッチサイズに達するまで挿入が保留され、検索時に書き出されることを確認"""
+        store = SQLiteResultStore(tmp_path / "results.sqlite3", batch_size=3, flush_seconds=None)
+        for hour in range(2):
+            store.write(make_record(f"2026-10-17T0{hour}:00:00", 50, [("icon", 0.5)]), "shot")
+
+        assert len(store._pending) == 2
+        assert len(store.query_images()) == 2
+        assert store._pending == []
+        store.close()
+
+    def test_import_results(self, tmp_path):
+        """NDJSONの解析結果を取り込めることを確認"""
+        with NDJSONSink(tmp_path / "out") as sink:
+            sink.write(make_record("2026-10-17T00:00:00", 50, [("icon", 0.5)]), "shot")
+            sink.write({"timestamp": "2026-10-17", "context_name": "not an analysis"}, "other")
+
+        store = create_result_sink({"result_sink": {"type": "sqlite"}}, tmp_path / "out")
+        assert isinstance(store, SQLiteResultStore)
+        assert store.import_results(tmp_path / "out") == 1
+        assert store.label_counts() == {"icon": 1}
+        store.close()
@@ -0,0 +1,53 @@
+"""
+テキスト領域検出のテスト
+"""
+
+import numpy as np
+import cv2
+import pytest
+
+from pdfexpy.utils.text_detection import propose_text_regions, merge_line_boxes
+
+
+class TestTextDetection:
+    """テキスト領域検出のテストクラス"""
+
+    @pytest.fixture
+    def screenshot(self):
+        """3行のテキストと塗りつぶし領域を含む画像を作成する"""
+        img = np.full((400, 800, 3), 245, dtype=np.uint8)
+        for i, text in enumerate(["File Edit View Help", "Open recent project", "Save all changes"]):
+            cv2.putText(img, text, (40, 60 + i * 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (20, 20, 20), 2)
+        cv2.rectangle(img, (500, 50), (750, 350), (180, 180, 180), -1)
+        return img
+
+    def test_proposes_one_region_per_line(self, screenshot):
+        """テキスト行ごとに1つの領域が提案され、背景は含まれないことを確認"""
+        regions = propose_text_regions(screenshot)
+
+        assert len(regions) == 3
+        for i, region in enumerate(regions):
+            assert region["x"] < 50
+            assert region["y"] < 60 + i * 50 < region["y"] + region["height"] + 5
+            assert region["x"] + region["width"] < 500
+
+    def test_downscaled_coordinates(self, screenshot):
+        """縮小処理時も元画像の座標で返されることを確認"""
+        large = cv2.resize(screenshot, None, fx=4, fy=4, interpolation=cv2.INTER_NEAREST)
+        regions = propose_text_regions(large, max_height=480, max_dimension=1600)
+
+        assert len(regions) == 3
+        assert regions[0]["y"] < 240 < regions[0]["y"] + regions[0]["height"] + 20
+
+    def test_blank_image(self):
+        """一様な画像では領域が提案されないことを確認"""
+        assert propose_text_regions(np.full((200, 300), 128, dtype=np.uint8)) == []
+
+    def test_merge_line_boxes(self):
+        """同じ行の近接したボックスのみがまとめられることを確認"""
+        boxes = [(0, 0, 10, 10), (12, 5, 10, 20), (25, 20, 10, 10), (200, 0, 10, 10), (0, 100, 10, 10)]
+        lines = merge_line_boxes(boxes)
+
+        # 縦に広がった行は、新たにかかる帯のボックスともまとめられる
+        assert sorted(lines) == [(0, 0, 35, 30), (0, 100, 10, 10), (200, 0, 10, 10)]
+        assert merge_line_boxes([]) == []
@@ -4,4 +4,4 @@
 
 from .logger import setup_logger, get_logger
 from .config import load_config, save_config
-from .image_analysis import analyze_image, generate_visual_feedback, get_image_details, ImageAnalysisError 
\ No newline at end of file
+from .image_analysis import analyze_image, iter_analyze, generate_visual_feedback, get_image_details, ImageAnalysisError 
\ No newline at end of file
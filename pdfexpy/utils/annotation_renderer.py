@@ -0,0 +1,250 @@
+"""
+検出結果の注釈を描画するモジュール
+
+OpenCV（BGR配列）とPIL（RGBA画像）の両方の描画を1つのレンダラーにまとめます。
+ラベルごとの色は一度決めたものを使い回し、フォントとテキストの大きさはキャッシュします。
+描画は呼び出し元のバッファに直接行うため、画像全体の複製は作成しません。
+"""
+
+import os
+import colorsys
+import functools
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# OpenCV
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# 画像処理
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# 注釈に使うフォントの候補（Windows）
+FONT_CANDIDATES = ("C:\\Windows\\Fonts\\meiryo.ttc", "C:\\Windows\\Fonts\\msgothic.ttc")
+
+# 情報パネルの配色 (R, G, B) と行の高さ
+PANEL_COLOR = (0, 0, 0)
+TITLE_COLOR = (255, 255, 0)
+LINE_HEIGHT = 25
+
+# 黄金比で色相をずらし、ラベルの数が事前に分からなくても隣り合う色を区別しやすくする
+GOLDEN_RATIO_CONJUGATE = 0.618033988749895
+
+# 共有レンダラー
+_shared_renderer = None
+_shared_renderer_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(size: int):
+    """
+    注釈用のフォントを読み込みます（サイズごとに一度だけ読み込みます）
+
+    Args:
+        size (int): フォントサイズ
+
+    Returns:
+        ImageFont: フォント（候補が見つからない場合はデフォルトフォント）
+    """
+    for font_path in FONT_CANDIDATES:
+        if os.path.exists(font_path):
+            try:
+                return ImageFont.truetype(font_path, size)
+            except Exception:
+                continue
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=4096)
+def pil_text_width(text: str, size: int) -> int:
+    """
+    PILで描画するテキストの幅を取得します（テキストとサイズごとにキャッシュします）
+
+    Args:
+        text (str): テキスト
+        size (int): フォントサイズ
+
+    Returns:
+        int: 幅（ピクセル）
+    """
+    left, _, right, _ = load_font(size).getbbox(text)
+    return right - left
+
+
+@functools.lru_cache(maxsize=4096)
+def cv2_text_size(text: str, font_scale: float, thickness: int) -> Tuple[int, int]:
+    """
+    OpenCVで描画するテキストの大きさを取得します（テキストと設定ごとにキャッシュします）
+
+    Args:
+        text (str): テキスト
+        font_scale (float): フォントの倍率
+        thickness (int): 線の太さ
+
+    Returns:
+        Tuple[int, int]: (幅, 高さ)
+    """
+    (width, height), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    return width, height
+
+
+def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    """
+    16進数のカラーコードを (R, G, B) に変換します
+
+    Args:
+        color (str): #rrggbb 形式のカラーコード
+
+    Returns:
+        Tuple[int, int, int]: (R, G, B)
+    """
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+class AnnotationRenderer:
+    """ラベルの色とテキストの大きさを保持し、注釈を描画するクラス"""
+
+    def __init__(self, saturation: float = 0.9, value: float = 0.9):
+        """
+        レンダラーを初期化します
+
+        Args:
+            saturation (float): ラベルの色の彩度 (0-1)
+            value (float): ラベルの色の明度 (0-1)
+        """
+        self.saturation = saturation
+        self.value = value
+        self._colors: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def color_for(self, label: str) -> Tuple[int, int, int]:
+        """
+        ラベルの色を取得します（初めてのラベルには新しい色を割り当て、以降は同じ色を返します）
+
+        Args:
+            label (str): ラベル
+
+        Returns:
+            Tuple[int, int, int]: (R, G, B)
+        """
+        color = self._colors.get(label)
+        if color is None:
+            with self._lock:
+                color = self._colors.get(label)
+                if color is None:
+                    hue = (len(self._colors) * GOLDEN_RATIO_CONJUGATE) % 1.0
+                    r, g, b = colorsys.hsv_to_rgb(hue, self.saturation, self.value)
+                    color = (int(r * 255), int(g * 255), int(b * 255))
+                    self._colors[label] = color
+        return color
+
+    def draw_objects(self, image: "np.ndarray", objects: List[Dict[str, Any]],
+                     colors: Optional[Dict[str, Tuple[int, int, int]]] = None,
+                     thickness: int = 2, font_scale: float = 0.6,
+                     show_confidence: bool = True, scale: float = 1.0) -> "np.ndarray":
+        """
+        検出オブジェクトの枠とラベルをBGR配列に直接描画します
+
+        Args:
+            image (np.ndarray): 描画先のBGR配列（変更されます）
+            objects (List[Dict[str, Any]]): 検出オブジェクトのリスト
+            colors (Optional[Dict[str, Tuple[int, int, int]]]): ラベルごとのBGRの色（Noneの場合は共有の色）
+            thickness (int): 線の太さ
+            font_scale (float): フォントの倍率
+            show_confidence (bool): 信頼度スコアを表示するかどうか
+            scale (float): 座標の倍率（縮小したプレビューに描画する場合）
+
+        Returns:
+            np.ndarray: 描画した配列（image と同じもの）
+        """
+        for obj in objects:
+            bbox = obj["bbox"]
+            x, y = round(bbox["x"] * scale), round(bbox["y"] * scale)
+            w, h = round(bbox["width"] * scale), round(bbox["height"] * scale)
+            label = obj["label"]
+
+            if colors is not None and label in colors:
+                color = colors[label]
+            else:
+                r, g, b = self.color_for(label)
+                color = (b, g, r)
+
+            # バウンディングボックス
+            cv2.rectangle(image, (x, y), (x + w, y + h), color, thickness)
+
+            # ラベルの背景とテキスト
+            label_text = f"{label} {obj.get('confidence', 0.0):.2f}" if show_confidence else label
+            text_width, text_height = cv2_text_size(label_text, font_scale, thickness)
+            cv2.rectangle(image, (x, y - text_height - 5), (x + text_width, y), color, -1)
+            cv2.putText(image, label_text, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                        (255, 255, 255), thickness)
+
+        return image
+
+    def draw_overlay(self, canvas: "Image.Image", overlay: Dict[str, Any], scale: float = 1.0):
+        """
+        オーバーレイの枠・ラベル・情報パネルをRGBA画像に直接描画します
+
+        Args:
+            canvas (Image.Image): 描画先のRGBA画像（変更されます）
+            overlay (Dict[str, Any]): オーバーレイ
+            scale (float): 座標の倍率（縮小したプレビューに描画する場合）
+        """
+        draw = ImageDraw.Draw(canvas)
+        normal_size = max(8, round(14 * scale))
+        normal_font = load_font(normal_size)
+        title_font = load_font(max(8, round(20 * scale)))
+
+        def s(value):
+            return round(value * scale)
+
+        for shape in overlay["shapes"]:
+            x, y = s(shape["x"]), s(shape["y"])
+            w, h = s(shape["width"]), s(shape["height"])
+            color = _hex_to_rgb(shape["color"]) if shape.get("color") else self.color_for(shape["label"])
+
+            # バウンディングボックスとラベル
+            label_width = pil_text_width(shape["label"], normal_size) + s(10)
+            draw.rectangle([(x, y), (x + w, y + h)], outline=color + (220,), width=max(1, s(2)))
+            draw.rectangle([(x, y - s(25)), (x + label_width, y)], fill=color + (180,))
+            draw.text((x + s(5), y - s(20)), shape["label"],
+                      fill=_hex_to_rgb(shape.get("text_color", "#ffffff")) + (255,), font=normal_font)
+
+        for panel in overlay["panels"]:
+            x, y = s(panel["x"]), s(panel["y"])
+            panel_height = s(len(panel["lines"]) * LINE_HEIGHT + 10)
+            draw.rectangle([(x - s(5), y - s(5)), (x + s(panel["width"]), y + panel_height)],
+                           fill=PANEL_COLOR + (180,))
+
+            for i, line in enumerate(panel["lines"]):
+                if line.get("title"):
+                    draw.text((x, y + s(i * LINE_HEIGHT)), line["text"], fill=TITLE_COLOR + (255,), font=title_font)
+                else:
+                    draw.text((x, y + s(i * LINE_HEIGHT)), line["text"], fill=(255, 255, 255, 255), font=normal_font)
+
+
+def get_renderer() -> AnnotationRenderer:
+    """
+    プロセス内で共有するレンダラーを取得します（ラベルの色は全ての画像で共通になります）
+
+    Returns:
+        AnnotationRenderer: 共有レンダラー
+    """
+    global _shared_renderer
+
+    with _shared_renderer_lock:
+        if _shared_renderer is None:
+            _shared_renderer = AnnotationRenderer()
+        return _shared_renderer
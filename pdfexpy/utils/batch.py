@@ -0,0 +1,451 @@
+"""
+画像の一括解析を行うモジュール
+
+ワーカープロセスを一度だけ起動し、各ワーカーでモデルを常駐させたまま多数の画像を
+並列に解析します。画像ごとにインタプリタの起動・インポート・設定とモデルの読み込みを
+繰り返さないため、大量の画像でも処理時間は解析そのものに律速されます。
+"""
+
+import os
+import sys
+import time
+import argparse
+from multiprocessing.util import Finalize
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Union
+
+from .logger import get_logger, setup_logger
+from .config import load_config, DEFAULT_CONFIG
+from .image_analysis import analyze_image, iter_analyze, iter_input_paths, wait_for_visual_feedback, YOLO_AVAILABLE
+from .result_sink import create_result_sink
+from .manifest import AnalysisManifest, open_manifest
+from .pipeline import AnalysisPipeline, format_stats
+from .perf import get_perf_stats
+from .metrics import get_metrics, start_metrics_server
+
+# YOLOモデル
+try:
+    from ..models import YOLOModel
+except ImportError:
+    YOLOModel = None
+
+logger = get_logger(__name__)
+
+
+# ワーカープロセス内で常駐する解析設定とモデル
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_batch_worker(output_dir: str, generate_visual: bool, mock: bool,
+                       model_path: Optional[str], config: Optional[Dict[str, Any]]):
+    """
+    ワーカープロセスの初期化処理（モデルを一度だけロードします）
+
+    Args:
+        output_dir (str): 結果を出力するディレクトリ
+        generate_visual (bool): 視覚的フィードバックを生成するかどうか
+        mock (bool): モックデータを使用するかどうか
+        model_path (Optional[str]): 使用するモデルのパス
+        config (Optional[Dict[str, Any]]): アプリケーション設定
+    """
+    model = None
+    if not mock and YOLO_AVAILABLE:
+        model = YOLOModel(model_path=model_path)
+        model.load()
+
+    # NDJSONの場合はワーカーごとに別のファイルへ追記し、プロセス終了時に書き出す
+    sink = create_result_sink(config, output_dir, basename=f"results_{os.getpid()}")
+    Finalize(sink, sink.close, exitpriority=10)
+    # バックグラウンドで描画中の視覚的フィードバックは、シンクを閉じる前に完了させる
+    Finalize(None, wait_for_visual_feedback, exitpriority=20)
+
+    _worker_state.update({
+        "output_dir": output_dir,
+        "generate_visual": generate_visual,
+        "mock": mock,
+        "model_path": model_path,
+        "config": config,
+        "model": model,
+        "sink": sink
+    })
+
+
+def _analyze_in_worker(image_path: str) -> Dict[str, Any]:
+    """
+    ワーカープロセス内の常駐モデルで画像を解析します
+
+    Args:
+        image_path (str): 画像ファイルのパス
+
+    Returns:
+        Dict[str, Any]: 解析結果の要約
+    """
+    state = _worker_state
+    start = time.perf_counter()
+    result = analyze_image(
+        image_path,
+        state["output_dir"],
+        state["generate_visual"],
+        state["mock"],
+        model_path=state["model_path"],
+        config=state["config"],
+        model=state["model"],
+        sink=state["sink"],
+        defer_visual=(state["config"] or DEFAULT_CONFIG).get("analysis", {}).get("defer_visual", True)
+    )
+    return summarize_result(image_path, result, time.perf_counter() - start)
+
+
+def summarize_result(image_path: str, result: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+    """
+    プロセス間で受け渡す解析結果の要約を作成します（解析結果の本体はファイルに保存済み）
+
+    Args:
+        image_path (str): 画像ファイルのパス
+        result (Dict[str, Any]): analyze_image の結果
+        elapsed (float): 処理時間（秒）
+
+    Returns:
+        Dict[str, Any]: 成否・出力ファイル・処理時間などの要約
+    """
+    return {
+        "image_path": image_path,
+        "success": result.get("success", False),
+        "result_file": result.get("result_file"),
+        "visual_feedback": result.get("visual_feedback"),
+        "error": result.get("error"),
+        "elapsed_seconds": elapsed,
+        "performance": result.get("results", {}).get("performance")
+    }
+
+
+class BatchAnalyzer:
+    """常駐ワーカープールで画像を一括解析するクラス"""
+
+    def __init__(self, output_dir: str = "analysis_results", workers: Optional[int] = None,
+                 generate_visual: bool = True, mock: bool = True,
+                 model_path: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+                 max_in_flight: Optional[int] = None, manifest: Optional[AnalysisManifest] = None,
+                 pipeline: bool = False):
+        """
+        一括解析を初期化します（ワーカーは最初の解析時に起動し、以降は使い回します）
+
+        Args:
+            output_dir (str): 結果を出力するディレクトリ
+            workers (Optional[int]): ワーカープロセス数。Noneの場合はCPUコア数、1の場合はプロセス内で解析
+            generate_visual (bool): 視覚的フィードバックを生成するかどうか
+            mock (bool): モックデータを使用するかどうか
+            model_path (Optional[str]): 使用するモデルのパス
+            config (Optional[Dict[str, Any]]): アプリケーション設定
+            max_in_flight (Optional[int]): 同時に投入する画像数の上限。Noneの場合はワーカー数の2倍
+            manifest (Optional[AnalysisManifest]): 解析済みの画像を記録するマニフェスト。
+                指定した場合は新しい画像・変更された画像のみを解析します
+            pipeline (bool): プロセス内のステージ別パイプライン（デコード・統計・検出・描画・保存を
+                並行に実行）で解析するかどうか。ステージのワーカー数は設定の pipeline セクションに従います
+        """
+        self.output_dir = output_dir
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.generate_visual = generate_visual
+        self.mock = mock
+        self.model_path = model_path
+        self.config = config
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.manifest = manifest
+        self.pipeline = pipeline
+        self.stage_stats: Optional[Dict[str, Any]] = None
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        常駐ワーカープールを取得します（なければ起動します）
+
+        Returns:
+            ProcessPoolExecutor: ワーカープール
+        """
+        if self._executor is None:
+            logger.info(f"一括解析のワーカープールを起動します (ワーカー数: {self.workers})")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_batch_worker,
+                initargs=(self.output_dir, self.generate_visual, self.mock, self.model_path, self.config)
+            )
+        return self._executor
+
+    def iter_results(self, paths_or_dir: Union[str, Path, Iterable[str]],
+                     recursive: bool = True, skip_analyzed: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        画像を解析し、完了した順に結果の要約を返します
+
+        マニフェストを指定している場合は、解析に成功した画像をマニフェストに記録します。
+
+        Args:
+            paths_or_dir (Union[str, Path, Iterable[str]]): ディレクトリ、画像ファイル、またはパスのイテラブル
+            recursive (bool): ディレクトリを指定した場合にサブディレクトリも探索するかどうか
+            skip_analyzed (bool): マニフェストで解析済みと判定された画像をスキップするかどうか
+
+        Yields:
+            Dict[str, Any]: 解析結果の要約
+        """
+        paths = iter_input_paths(paths_or_dir, recursive)
+        if self.manifest is None:
+            yield from self._iter_analyzed(paths)
+            return
+
+        if skip_analyzed:
+            paths = self.manifest.filter_paths(paths)
+        for result in self._iter_analyzed(paths):
+            self.manifest.record_result(result)
+            yield result
+
+    def _iter_analyzed(self, paths: Iterator[str]) -> Iterator[Dict[str, Any]]:
+        """
+        画像を解析し、完了した順に結果の要約を返します
+
+        Args:
+            paths (Iterator[str]): 画像ファイルのパス
+
+        Yields:
+            Dict[str, Any]: 解析結果の要約
+        """
+        if self.pipeline:
+            with AnalysisPipeline(self.output_dir, self.generate_visual, self.mock, self.model_path,
+                                  self.config) as analysis:
+                try:
+                    for result in analysis.run(paths):
+                        yield summarize_result(result["image_path"], result,
+                                               result.get("results", {}).get("performance", {})
+                                               .get("analysis_time_seconds", 0.0))
+                finally:
+                    self.stage_stats = analysis.stats()
+            return
+
+        # ワーカーが1つの場合はプロセスを起動せず、先読み付きのストリーミング解析を使う
+        if self.workers == 1:
+            start = time.perf_counter()
+            for result in iter_analyze(paths, self.output_dir, self.generate_visual, self.mock,
+                                       model_path=self.model_path, config=self.config):
+                now = time.perf_counter()
+                yield summarize_result(result["image_path"], result, now - start)
+                start = now
+            return
+
+        executor = self._get_executor()
+        pending = {}
+        try:
+            for image_path in paths:
+                future = executor.submit(_analyze_in_worker, image_path)
+                pending[future] = image_path
+                if len(pending) >= self.max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._collect(future, pending.pop(future))
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._collect(future, pending.pop(future))
+        finally:
+            # 途中で停止された場合は未着手の画像を取り消す
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _collect(future, image_path: str) -> Dict[str, Any]:
+        """
+        完了したFutureから結果を取り出します（ワーカーの異常終了もエラーとして返します）
+
+        ワーカープロセスでの処理時間と件数は、このプロセスの集計とメトリクスに加えます。
+
+        Args:
+            future (Future): 完了したFuture
+            image_path (str): 画像ファイルのパス
+
+        Returns:
+            Dict[str, Any]: 解析結果の要約
+        """
+        try:
+            summary = future.result()
+        except Exception as e:
+            logger.error(f"画像の解析中にワーカーでエラーが発生しました: {image_path}: {e}")
+            summary = {"image_path": image_path, "success": False, "error": str(e), "elapsed_seconds": 0.0}
+
+        if summary.get("performance"):
+            get_perf_stats().add(summary["performance"])
+        get_metrics().inc("pdfexpy_frames_analyzed_total", result="success" if summary["success"] else "error")
+        return summary
+
+    def run(self, paths_or_dir: Union[str, Path, Iterable[str]], recursive: bool = True,
+            progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        画像を一括解析し、進捗とスループットを報告します
+
+        Args:
+            paths_or_dir (Union[str, Path, Iterable[str]]): ディレクトリ、画像ファイル、またはパスのイテラブル
+            recursive (bool): ディレクトリを指定した場合にサブディレクトリも探索するかどうか
+            progress_callback (Optional[Callable]): 1枚ごとに進捗情報を受け取るコールバック
+
+        Returns:
+            Dict[str, Any]: 処理結果（件数・成功数・失敗数・解析済みでスキップした数・処理時間・
+                スループット・失敗した画像）
+        """
+        # 進捗を表示するため、パスの一覧を先に取得する（デコードは行わない）
+        paths = list(iter_input_paths(paths_or_dir, recursive))
+        skipped = 0
+        if self.manifest is not None and paths:
+            found = len(paths)
+            paths = list(self.manifest.filter_paths(paths))
+            skipped = found - len(paths)
+            logger.info(f"解析済みの{skipped}件をスキップします（解析対象: {len(paths)}件）")
+
+        total = len(paths)
+        if total == 0:
+            if skipped:
+                return {"success": True, "total": 0, "succeeded": 0, "failed": 0, "skipped": skipped,
+                        "elapsed_seconds": 0.0, "images_per_second": 0.0, "failures": []}
+            return {"success": False, "error": "解析する画像が見つかりません", "total": 0}
+
+        start = time.perf_counter()
+        done = succeeded = 0
+        failures = []
+        for result in self.iter_results(paths, skip_analyzed=False):
+            done += 1
+            if result["success"]:
+                succeeded += 1
+            else:
+                failures.append({"image_path": result["image_path"], "error": result.get("error")})
+
+            if progress_callback is not None:
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                progress_callback({
+                    "done": done,
+                    "total": total,
+                    "succeeded": succeeded,
+                    "failed": len(failures),
+                    "images_per_second": rate,
+                    "eta_seconds": (total - done) / rate if rate > 0 else None,
+                    "result": result
+                })
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "success": not failures,
+            "total": total,
+            "succeeded": succeeded,
+            "failed": len(failures),
+            "skipped": skipped,
+            "elapsed_seconds": elapsed,
+            "stages": self.stage_stats if self.pipeline else None,
+            "images_per_second": total / elapsed if elapsed > 0 else 0.0,
+            "failures": failures
+        }
+        logger.info(f"一括解析が完了しました: {succeeded}/{total}件成功 "
+                    f"({elapsed:.2f}秒, {summary['images_per_second']:.1f}枚/秒)")
+        return summary
+
+    def close(self):
+        """
+        ワーカープールを終了します
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def print_progress(progress: Dict[str, Any]):
+    """
+    進捗情報をコンソールに表示します
+
+    Args:
+        progress (Dict[str, Any]): BatchAnalyzer.run の進捗情報
+    """
+    result = progress["result"]
+    status = "成功" if result["success"] else "失敗"
+    eta = f", 残り約{progress['eta_seconds']:.0f}秒" if progress["eta_seconds"] is not None else ""
+    print(f"[{status}] {progress['done']}/{progress['total']}: {result['image_path']} "
+          f"({result['elapsed_seconds']:.2f}秒, {progress['images_per_second']:.1f}枚/秒{eta})")
+    if not result["success"]:
+        print(f"エラー: {result.get('error')}")
+
+
+def main(argv=None):
+    """
+    一括解析のコマンドラインエントリーポイント
+
+    Args:
+        argv (list, optional): コマンドライン引数（Noneの場合はsys.argv）
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="PDFExPy - 画像の一括解析")
+    parser.add_argument("paths", nargs="*", default=["test_images"], help="解析する画像ファイルまたはディレクトリ")
+    parser.add_argument("--output-dir", "-o", type=str, help="出力ディレクトリ")
+    parser.add_argument("--config", "-c", type=str, help="設定ファイルのパス")
+    parser.add_argument("--workers", "-j", type=int, help="ワーカープロセス数（デフォルト: CPUコア数）")
+    parser.add_argument("--no-recursive", action="store_true", help="サブディレクトリを探索しない")
+    parser.add_argument("--no-mock", action="store_true", help="モックデータを使用しない（YOLOモデルで解析）")
+    parser.add_argument("--no-visual", action="store_true", help="視覚的フィードバックを生成しない")
+    parser.add_argument("--model-path", type=str, help="使用するモデルのパス")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="ステージ別のパイプラインで解析し、ステージごとのスループットを表示する")
+    parser.add_argument("--incremental", action="store_true",
+                        help="解析済みの画像をスキップする（設定の manifest.enabled と同じ）")
+    parser.add_argument("--metrics-port", type=int,
+                        help="解析中のメトリクスを Prometheus 形式で公開するポート（設定の metrics.port より優先）")
+    parser.add_argument("--log-level", "-l", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        default="WARNING", help="ログレベル")
+    args = parser.parse_args(argv)
+
+    import logging
+    setup_logger("pdfexpy", console_level=getattr(logging, args.log_level))
+
+    config = load_config(args.config) if args.config else DEFAULT_CONFIG
+    output_dir = args.output_dir or config.get("output", {}).get("analysis_dir", "analysis_results")
+
+    paths = args.paths
+    if len(paths) == 1:
+        paths = paths[0]
+
+    manifest = open_manifest(config, output_dir, mock=not args.no_mock, model_path=args.model_path,
+                             force=args.incremental)
+    metrics_server = start_metrics_server(config, port=args.metrics_port)
+    try:
+        with BatchAnalyzer(
+            output_dir=output_dir,
+            workers=args.workers,
+            generate_visual=not args.no_visual,
+            mock=not args.no_mock,
+            model_path=args.model_path,
+            config=config,
+            manifest=manifest,
+            pipeline=args.pipeline
+        ) as analyzer:
+            summary = analyzer.run(paths, recursive=not args.no_recursive, progress_callback=print_progress)
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+
+    if "error" in summary:
+        print(f"[エラー] {summary['error']}")
+        return 1
+
+    print(f"[完了] {summary['succeeded']}/{summary['total']}件成功, {summary['failed']}件失敗, "
+          f"{summary['skipped']}件スキップ "
+          f"({summary['elapsed_seconds']:.2f}秒, {summary['images_per_second']:.1f}枚/秒)")
+    if summary.get("stages"):
+        print(format_stats(summary["stages"]))
+    return 0 if summary["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,295 @@
+"""
+解析結果を列指向形式（Parquet / Arrow IPC）で出力するモジュール
+
+入れ子になった解析結果を画像・検出物体・OCR領域の3つのテーブルに展開し、
+固定のスキーマで日付ごとにパーティション分割したファイルへ書き出します。
+pyarrow.dataset で読み込むと、必要な列とパーティションだけを読み取れます。
+Arrow IPC 形式はメモリマップによるゼロコピー読み込みに対応します。
+"""
+
+import os
+import time
+import hashlib
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+# Apache Arrow（任意）
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.dataset as ds
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from .logger import get_logger
+from .result_sink import FlushTimer, ResultSink, ResultSinkError, flatten_result, iter_records
+
+logger = get_logger(__name__)
+
+
+TABLES = ("images", "detections", "ocr_regions")
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+class ColumnarExportError(ResultSinkError):
+    """列指向形式の出力に関するエラー"""
+    pass
+
+
+def get_schemas() -> Dict[str, "pa.Schema"]:
+    """
+    各テーブルの固定スキーマを取得します
+
+    Returns:
+        Dict[str, pa.Schema]: テーブル名とスキーマ
+
+    Raises:
+        ColumnarExportError: pyarrow がインストールされていない場合
+    """
+    if not PYARROW_AVAILABLE:
+        raise ColumnarExportError("pyarrow がインストールされていません。pip install pyarrow を実行してください。")
+
+    key = [
+        ("image_id", pa.string()),
+        ("timestamp", pa.timestamp("us")),
+        ("date", pa.string())
+    ]
+    bbox = [
+        ("x", pa.int32()),
+        ("y", pa.int32()),
+        ("width", pa.int32()),
+        ("height", pa.int32())
+    ]
+    return {
+        "images": pa.schema(key + [
+            ("image_path", pa.string()),
+            ("filename", pa.string()),
+            ("width", pa.int32()),
+            ("height", pa.int32()),
+            ("brightness_percent", pa.float64()),
+            ("color_variance", pa.float64()),
+            ("avg_color_hex", pa.string()),
+            ("theme", pa.string()),
+            ("mode", pa.string()),
+            ("model", pa.string()),
+            ("description", pa.string()),
+            ("analysis_time_ms", pa.float64())
+        ]),
+        "detections": pa.schema(key + [
+            ("label", pa.string()),
+            ("confidence", pa.float64())
+        ] + bbox),
+        "ocr_regions": pa.schema(key + [
+            ("text", pa.string()),
+            ("confidence", pa.float64())
+        ] + bbox)
+    }
+
+
+def to_rows(record: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    解析結果1件を各テーブルの行に変換します（画像ID・日時・日付の列を付加します）
+
+    Args:
+        record (Dict[str, Any]): analyze_image の結果（results）
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: テーブル名と行のリスト
+    """
+    image, detections, ocr_regions = flatten_result(record)
+
+    try:
+        timestamp = datetime.datetime.fromisoformat(image["timestamp"])
+    except (TypeError, ValueError):
+        timestamp = datetime.datetime.now()
+
+    image_id = hashlib.sha1(f"{image['image_path']}|{image['timestamp']}".encode("utf-8")).hexdigest()[:16]
+    key = {"image_id": image_id, "timestamp": timestamp, "date": timestamp.date().isoformat()}
+
+    return {
+        "images": [{**key, **image, "timestamp": timestamp}],
+        "detections": [{**key, **row} for row in detections],
+        "ocr_regions": [{**key, **row} for row in ocr_regions]
+    }
+
+
+class ColumnarSink(ResultSink):
+    """解析結果を日付でパーティション分割したParquet / Arrow IPCファイルに書き出すシンク"""
+
+    def __init__(self, output_dir: Union[str, Path], format: str = "parquet",
+                 rows_per_file: int = 10000, compression: str = "zstd",
+                 flush_seconds: Optional[float] = 5.0):
+        """
+        シンクを初期化します
+
+        出力先は {output_dir}/{テーブル名}/date={YYYY-MM-DD}/part-{プロセスID}-{連番}.{拡張子} です。
+
+        Args:
+            output_dir (Union[str, Path]): 出力ディレクトリ
+            format (str): 'parquet' または 'arrow'（Arrow IPC）
+            rows_per_file (int): 画像の行がこの数に達するとファイルに書き出す
+            compression (str): 圧縮方式（Parquetのみ）
+            flush_seconds (Optional[float]): バッファの最初の行からこの秒数を過ぎると書き出す
+                （次の書き込みがなくてもタイマーで書き出します。Noneの場合は行数と終了時のみ）
+
+        Raises:
+            ColumnarExportError: pyarrow がない場合、または未対応の形式の場合
+        """
+        if format not in FORMATS:
+            raise ColumnarExportError(f"未対応の形式です: {format}")
+
+        self.schemas = get_schemas()
+        self.output_dir = Path(output_dir)
+        self.format = format
+        self.rows_per_file = max(1, rows_per_file)
+        self.compression = compression
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._rows = {table: [] for table in TABLES}
+        self._sequence = 0
+        self._buffer_started = None
+        self._flush_timer = FlushTimer(flush_seconds, self.flush)
+
+    def _partition_path(self, table: str, date: str, sequence: int) -> Path:
+        """
+        テーブル・日付・連番に対応する出力ファイルのパスを作成します
+
+        Args:
+            table (str): テーブル名
+            date (str): パーティションの日付（YYYY-MM-DD）
+            sequence (int): 書き出しの連番
+
+        Returns:
+            Path: 出力ファイルのパス
+        """
+        return (self.output_dir / table / f"date={date}" /
+                f"part-{os.getpid()}-{sequence:06d}{FORMATS[self.format]}")
+
+    def write(self, record: Dict[str, Any], name: str) -> str:
+        rows = to_rows(record)
+        with self._lock:
+            for table, table_rows in rows.items():
+                self._rows[table].extend(table_rows)
+            # バッファの行は次の書き出しでまとめて同じ連番のファイルになる
+            path = self._partition_path("images", rows["images"][0]["date"], self._sequence + 1)
+
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+                self._flush_timer.start()
+
+            if (len(self._rows["images"]) >= self.rows_per_file or
+                    (self.flush_seconds is not None and
+                     time.monotonic() - self._buffer_started >= self.flush_seconds)):
+                self._flush_locked()
+        return str(path)
+
+    def _flush_locked(self):
+        """
+        バッファの行をテーブル・日付ごとのファイルに書き出します（ロックを保持した状態で呼び出します）
+        """
+        self._flush_timer.cancel()
+        self._buffer_started = None
+        if not self._rows["images"]:
+            return
+
+        self._sequence += 1
+        for table in TABLES:
+            by_date = {}
+            for row in self._rows[table]:
+                by_date.setdefault(row["date"], []).append(row)
+
+            for date, rows in by_date.items():
+                path = self._partition_path(table, date, self._sequence)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._write_table(pa.Table.from_pylist(rows, schema=self.schemas[table]), path)
+
+            self._rows[table] = []
+
+    def _write_table(self, table: "pa.Table", path: Path):
+        """
+        テーブルをファイルに書き出します
+
+        Args:
+            table (pa.Table): 書き出すテーブル
+            path (Path): 出力ファイルのパス
+        """
+        try:
+            if self.format == "parquet":
+                pq.write_table(table, path, compression=self.compression)
+            else:
+                with pa.OSFile(str(path), "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+        except (OSError, pa.ArrowException) as e:
+            raise ColumnarExportError(f"ファイルの書き出しに失敗しました: {path}: {e}")
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+
+def export_results(input_dir: Union[str, Path], output_dir: Union[str, Path], format: str = "parquet",
+                   rows_per_file: int = 10000) -> Dict[str, Any]:
+    """
+    既存のJSON・NDJSONの解析結果を列指向形式に変換します
+
+    Args:
+        input_dir (Union[str, Path]): 解析結果のディレクトリ
+        output_dir (Union[str, Path]): 出力ディレクトリ
+        format (str): 'parquet' または 'arrow'
+        rows_per_file (int): 1ファイルあたりの画像の行数
+
+    Returns:
+        Dict[str, Any]: 処理結果（件数・出力ディレクトリ）
+    """
+    try:
+        count = 0
+        # 一括変換では行数のみで区切る（時間で小さなファイルに分割しない）
+        with ColumnarSink(output_dir, format=format, rows_per_file=rows_per_file, flush_seconds=None) as sink:
+            for record in iter_records(input_dir):
+                if "analysis" not in record:
+                    continue
+                sink.write(record, "")
+                count += 1
+    except ColumnarExportError as e:
+        logger.error(str(e))
+        return {"success": False, "error": str(e)}
+
+    logger.info(f"{count}件の解析結果を{format}形式で出力しました: {output_dir}")
+    return {"success": True, "count": count, "output_dir": str(output_dir)}
+
+
+def read_table(output_dir: Union[str, Path], table: str, columns: Optional[Sequence[str]] = None,
+               filter=None, format: str = "parquet") -> "pa.Table":
+    """
+    出力したテーブルを読み込みます（指定した列とパーティションのみを読み取ります）
+
+    Args:
+        output_dir (Union[str, Path]): 出力ディレクトリ
+        table (str): テーブル名（images / detections / ocr_regions）
+        columns (Optional[Sequence[str]]): 読み込む列（Noneの場合は全列）
+        filter (Optional[pyarrow.dataset.Expression]): 行の条件（例: ds.field("date") >= "2026-10-01"）
+        format (str): 'parquet' または 'arrow'
+
+    Returns:
+        pa.Table: 読み込んだテーブル
+
+    Raises:
+        ColumnarExportError: pyarrow がない場合、または未対応のテーブル名の場合
+    """
+    schemas = get_schemas()
+    if table not in schemas:
+        raise ColumnarExportError(f"未対応のテーブルです: {table}")
+
+    # date=YYYY-MM-DD のディレクトリ名から、条件に合わないパーティションを読まずに除外する
+    dataset = ds.dataset(
+        str(Path(output_dir) / table),
+        schema=schemas[table],
+        format="ipc" if format == "arrow" else "parquet",
+        partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    )
+    return dataset.to_table(columns=list(columns) if columns else None, filter=filter)
@@ -37,6 +37,28 @@ DEFAULT_CONFIG = {
             "config": "--psm 3"
         }
     },
+    "model_cache": {
+        "memory_budget_mb": None,  # Noneの場合は無制限
+        "idle_timeout_seconds": None  # 指定した秒数使われていないモデルをアンロード
+    },
+    "ocr": {
+        "enabled": True,
+        "backend": "auto",  # auto, tesserocr または pytesseract
+        "max_workers": None,  # Noneの場合はCPUコア数÷thread_limit
+        "thread_limit": 1,  # ワーカーごとのTesseractスレッド数の上限
+        "config": "--psm 6",  # 領域単位のOCR用（ページ全体向けの --psm 3 は小さな行領域では認識できない）
+        "min_confidence": 0.3,
+        "padding": 2,
+        "preprocess": True,  # 反転・拡大・二値化の前処理
+        "region_proposal": "opencv",  # opencv（テキスト行検出）または bands（横帯分割）
+        "text_labels": ["text", "title", "label", "button", "menu", "tab"],
+        "cache": {
+            "enabled": True,
+            "max_entries": 4096,
+            "max_memory_mb": 16,
+            "disk_dir": None  # 指定した場合は追い出したエントリをディスクへ退避
+        }
+    },
     "screenshot": {
         "method": "mss",  # mss または pyautogui
         "delay": 1.0,
@@ -46,7 +68,53 @@ DEFAULT_CONFIG = {
     "analysis": {
         "save_format": "json",
         "save_images": True,
-        "mock_in_headless": True
+        "mock_in_headless": True,
+        "defer_visual": True,  # 連続解析・一括解析で視覚的フィードバックをバックグラウンドで描画する
+        "visual_format": "svg"  # svg / json（元画像に重ねるオーバーレイ）、png / jpg / webp（描き込んだ画像）
+    },
+    "preview": {
+        "max_dimension": 1280,  # 画像形式の視覚的フィードバックの長辺の最大ピクセル数（Noneの場合は元の解像度）
+        "quality": 80,  # jpg / webp の品質 (1-100)
+        "thumbnail_only": False,  # Trueの場合はサムネイルの大きさでのみ出力
+        "thumbnail_dimension": 320
+    },
+    "result_sink": {
+        "type": "json",  # json（画像ごとのファイル）、ndjson（追記型）、sqlite、parquet または arrow
+        "indent": 2,  # json の場合のインデント幅
+        "max_mb": 64,  # ndjson の1ファイルの最大サイズ
+        "rotate_seconds": 3600,  # ndjson のファイルを切り替える間隔
+        "buffer_kb": 256,
+        "flush_seconds": 5.0,  # バッファの最初の結果から書き出すまでの秒数（ndjson・sqlite・parquet・arrow）
+        "database": None,  # sqlite のデータベースファイル（Noneの場合は出力ディレクトリ/results.sqlite3）
+        "batch_size": 100,  # sqlite にまとめて挿入する件数
+        "store_json": False,  # sqlite に結果全体のJSONも保存するかどうか
+        "rows_per_file": 10000  # parquet / arrow の1ファイルあたりの画像数（要 pyarrow）
+    },
+    "pipeline": {
+        "workers": {  # ステージごとのワーカースレッド数
+            "decode": 2,
+            "stats": 1,
+            "detect": 1,
+            "render": 1,
+            "persist": 1
+        },
+        "queue_size": 4  # 各ステージの入力キューの上限（Noneの場合はワーカー数の2倍）
+    },
+    "manifest": {
+        "enabled": False,  # 一括解析・ディレクトリ監視で解析済みの画像をスキップする
+        "database": None,  # Noneの場合は出力ディレクトリ/manifest.sqlite3
+        "config_keys": None  # 変更されると再解析する設定のキー（ドット区切り、Noneの場合は manifest.CONFIG_KEYS）
+    },
+    "profiling": {
+        "output_dir": "profiles",
+        "profiler": "cprofile",  # cprofile、sample（組み込みのサンプリング）または py-spy
+        "top": 25,  # ステージごとに出力する関数の数
+        "interval_ms": 5  # サンプリング間隔（ミリ秒）
+    },
+    "metrics": {
+        "enabled": False,  # Trueの場合はディレクトリ監視・一括解析の実行中にメトリクスを公開する
+        "host": "127.0.0.1",
+        "port": 9464  # http://host:port/metrics で Prometheus のテキスト形式を返す
     }
 }
 
@@ -4,10 +4,12 @@
 
 import os
 import time
-import json
 import datetime
+import threading
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional, Union
+from typing import Dict, List, Tuple, Any, Iterable, Iterator, Optional, Union
 
 # 画像処理
 try:
@@ -36,12 +38,49 @@ try:
 except ImportError:
     YOLO_AVAILABLE = False
 
+# テキスト領域検出（OpenCVが必要）
+try:
+    from .text_detection import propose_text_regions
+    TEXT_DETECTION_AVAILABLE = True
+except ImportError:
+    TEXT_DETECTION_AVAILABLE = False
+
 # ロガー
 from .logger import get_logger
+from .image_context import ImageContext, as_image_context
+from .image_stats import (
+    compute_color_stats,
+    extract_dominant_colors,
+    compute_channel_histograms,
+    classify_theme,
+    PALETTE_MAX_DIMENSION
+)
+from .config import DEFAULT_CONFIG
+from .result_sink import ResultSink, JsonFileSink, create_result_sink
+from .manifest import AnalysisManifest, model_identity
+from .perf import StageTimer, build_performance, get_perf_stats
+from .metrics import get_metrics
+from .overlay import (build_overlay, write_overlay, rasterize_overlay, save_raster, preview_max_dimension,
+                      load_font, VECTOR_FORMATS)
+from .ocr import extract_text, select_text_regions, OCRError, TESSERACT_AVAILABLE as OCR_AVAILABLE
+from .ocr_cache import get_ocr_cache
 
 logger = get_logger(__name__)
 
 
+# ディレクトリ解析の対象とする拡張子
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff")
+
+# バックグラウンドで描画待ちにできる視覚的フィードバックの最大数（超えると解析側が待機する）
+MAX_PENDING_RENDERS = 4
+
+# 視覚的フィードバックのバックグラウンド描画
+_render_executor = None
+_render_lock = threading.Lock()
+_render_slots = threading.BoundedSemaphore(MAX_PENDING_RENDERS)
+_pending_renders = set()
+
+
 class ImageAnalysisError(Exception):
     """画像解析時のエラーを表すカスタム例外"""
     pass
@@ -64,12 +103,13 @@ def ensure_output_dir(directory):
     return dir_path
 
 
-def get_image_details(image_path: str) -> Dict[str, Any]:
+def get_image_details(image_path: Union[str, ImageContext], metadata_only: bool = False) -> Dict[str, Any]:
     """
     画像の詳細情報を取得します
     
     Args:
-        image_path (str): 画像ファイルのパス
+        image_path (Union[str, ImageContext]): 画像ファイルのパス、またはデコード済みの画像コンテキスト
+        metadata_only (bool): Trueの場合はヘッダーとstat情報のみを読み、画素のデコードと色情報の計算を省略する
         
     Returns:
         Dict[str, Any]: 画像の詳細情報
@@ -81,48 +121,43 @@ def get_image_details(image_path: str) -> Dict[str, Any]:
         raise ImageAnalysisError("PIL (Pillow) ライブラリがインストールされていません。'pip install pillow' を実行してください。")
     
     try:
+        context = as_image_context(image_path)
+        
         # ファイル情報
-        file_path = Path(image_path)
-        file_stat = file_path.stat()
+        file_path = Path(context.path)
+        file_stat = context.stat
         
         # 画像情報
-        with Image.open(image_path) as img:
-            width, height = img.size
-            format_name = img.format
-            mode = img.mode
-            
-            # 色情報（シンプルなバージョン）
-            color_info = {
-                "mode": mode,
-                "has_alpha": "A" in mode,
-                "is_grayscale": mode in ("L", "LA"),
-                "is_rgb": mode in ("RGB", "RGBA")
-            }
-            
-            # 高度な色情報（NumPyが利用可能な場合）
-            if NUMPY_AVAILABLE:
-                try:
-                    img_array = np.array(img)
-                    if mode in ("RGB", "RGBA"):
-                        # RGB平均値
-                        rgb_channels = img_array[:, :, :3]  # アルファチャンネルを除外
-                        avg_color = rgb_channels.mean(axis=(0, 1)).astype(int)
-                        
-                        # 明るさ
-                        brightness = np.mean(rgb_channels)
-                        
-                        # カラーバリエーション（標準偏差）
-                        color_variance = np.std(rgb_channels)
-                        
-                        color_info.update({
-                            "avg_color_rgb": avg_color.tolist(),
-                            "avg_color_hex": f"#{int(avg_color[0]):02x}{int(avg_color[1]):02x}{int(avg_color[2]):02x}",
-                            "brightness": float(brightness),
-                            "brightness_percent": float(brightness / 255 * 100),
-                            "color_variance": float(color_variance)
-                        })
-                except Exception as e:
-                    logger.warning(f"高度な色情報の取得に失敗しました: {e}")
+        if metadata_only:
+            width, height, format_name, mode = context.read_header()
+        else:
+            width, height = context.width, context.height
+            format_name = context.format
+            mode = context.mode
+        
+        # 色情報（シンプルなバージョン）
+        color_info = {
+            "mode": mode,
+            "has_alpha": "A" in mode,
+            "is_grayscale": mode in ("L", "LA"),
+            "is_rgb": mode in ("RGB", "RGBA")
+        }
+        
+        # 高度な色情報（NumPyが利用可能な場合）
+        if NUMPY_AVAILABLE and not metadata_only:
+            try:
+                if mode in ("RGB", "RGBA"):
+                    # 間引き・チャンク集計で平均色・明るさ・ばらつきを計算
+                    color_info.update(compute_color_stats(context.rgb))
+
+                    # 代表色とヒストグラムは縮小画像から計算する
+                    small = context.downscaled(PALETTE_MAX_DIMENSION)
+                    dominant_colors = extract_dominant_colors(small)
+                    color_info["dominant_colors"] = dominant_colors
+                    color_info["histograms"] = compute_channel_histograms(small)
+                    color_info["theme"] = classify_theme(dominant_colors)
+            except Exception as e:
+                logger.warning(f"高度な色情報の取得に失敗しました: {e}")
         
         # 詳細情報を構築
         details = {
@@ -194,18 +229,28 @@ def get_aspect_ratio_name(ratio: float) -> str:
     return f"{rounded:.2f}:1"
 
 
-def analyze_image(image_path: str, output_dir: str = "analysis_results", 
+def analyze_image(image_path: Union[str, ImageContext], output_dir: str = "analysis_results", 
                  generate_visual: bool = True, mock: bool = True,
-                 model_path: Optional[str] = None) -> Dict[str, Any]:
+                 model_path: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None,
+                 model: Optional["YOLOModel"] = None,
+                 sink: Optional[ResultSink] = None,
+                 defer_visual: bool = False) -> Dict[str, Any]:
     """
     画像を解析し、結果を出力します
     
     Args:
-        image_path (str): 解析する画像のパス
+        image_path (Union[str, ImageContext]): 解析する画像のパス、またはデコード済みの画像コンテキスト
         output_dir (str): 結果を出力するディレクトリ
         generate_visual (bool): 視覚的フィードバックを生成するかどうか
         mock (bool): モックデータを使用するかどうか（実際のAIモデルを使用しない）
         model_path (Optional[str]): 使用するモデルのパス（Noneの場合はデフォルトモデルを使用）
+        config (Optional[Dict[str, Any]]): アプリケーション設定（Noneの場合はデフォルト設定を使用）
+        model (Optional[YOLOModel]): ロード済みのYOLOモデル（複数画像の解析で使い回す場合に指定）
+        sink (Optional[ResultSink]): 結果の出力先（Noneの場合は画像ごとにJSONファイルを作成）
+        defer_visual (bool): 画像形式の視覚的フィードバックをバックグラウンドで描画するかどうか。
+            Trueの場合は描画を待たずに結果を返し、描画の完了後に visual_feedback が設定されます
+            （形式は設定の analysis.visual_format。ベクター形式は描画が不要なため常にその場で保存します）
         
     Returns:
         Dict[str, Any]: 解析結果
@@ -214,112 +259,510 @@ def analyze_image(image_path: str, output_dir: str = "analysis_results",
         ImageAnalysisError: 解析に失敗した場合
     """
     try:
-        # 開始時間を記録
-        start_time = time.time()
+        # ステージごとの処理時間を計測する
+        timer = StageTimer()
+        
+        # 画像は一度だけデコードし、全ステージで共有する
+        with timer.stage("decode"):
+            context = as_image_context(image_path)
+            context.pil
+        image_path = context.path
         logger.info(f"画像解析を開始します: {image_path}")
         
         # 出力ディレクトリを確保
         output_path = ensure_output_dir(output_dir)
         
         # 画像の詳細情報を取得
-        image_details = get_image_details(image_path)
+        with timer.stage("stats"):
+            image_details = get_image_details(context)
         
         # 解析結果
-        if mock:
-            analysis_results = generate_mock_analysis_results(image_path, image_details)
-            model_used = "mock"
-        else:
-            # YOLOモデルを使用した実際の解析を実行
-            if YOLO_AVAILABLE:
-                yolo_model = YOLOModel(model_path=model_path)
-                detection_results = yolo_model.detect(image_path)
-                
-                # 詳細な解析結果を構築
-                analysis_results = build_analysis_results(image_path, image_details, detection_results)
-                model_used = "yolov8"
-            else:
-                logger.warning("YOLOモデルが利用できないため、モックデータを使用します。")
-                analysis_results = generate_mock_analysis_results(image_path, image_details)
-                model_used = "mock (YOLO unavailable)"
-        
-        # メタデータを追加
-        metadata = {
-            "version": "1.0.0",
-            "mode": "mock_analysis" if mock else "yolo_analysis",
-            "image_path": image_path
-        }
+        analysis_results, model_used = run_detection(context, image_details, mock, model, model_path, config, timer)
         
         # 完全な結果を構築
-        full_results = {
-            "metadata": metadata,
-            "image_details": image_details,
-            "analysis": analysis_results
-        }
+        model_id = model_identity(mock, model.model_path if model is not None else model_path)
+        full_results = assemble_results(image_path, image_details, analysis_results, mock, model_used,
+                                        timer.elapsed_seconds(), timer.stages_ms(), model_id)
         
-        # デバッグ情報
-        full_results["debug_info"] = {
-            "mock_data": mock,
-            "model_used": None if mock else model_used,
-            "color_analysis": {
-                "estimated_brightness": "bright" if image_details["image_info"]["color_info"].get("brightness_percent", 50) > 70 else "medium" if image_details["image_info"]["color_info"].get("brightness_percent", 50) > 30 else "dark",
-                "dominant_colors": [image_details["image_info"]["color_info"].get("avg_color_hex", "#ffffff")],
-                "color_variance": "high" if image_details["image_info"]["color_info"].get("color_variance", 50) > 80 else "medium" if image_details["image_info"]["color_info"].get("color_variance", 50) > 40 else "low"
-            }
-        }
-        
-        # 処理時間を記録
-        elapsed_time = time.time() - start_time
-        full_results["performance"] = {
-            "analysis_time_seconds": elapsed_time,
-            "analysis_time_ms": elapsed_time * 1000
+        filename = Path(image_path).stem
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        result = {
+            "results": full_results,
+            "result_file": None,
+            "visual_feedback": None,
+            "success": True
         }
         
-        # 現在の日時
-        full_results["timestamp"] = datetime.datetime.now().isoformat()
+        # 視覚的フィードバックを生成（オプション）
+        if generate_visual:
+            feedback_file, preview = feedback_settings(output_path, filename, timestamp, config)
+            if defer_visual and feedback_file.suffix not in VECTOR_FORMATS:
+                # 描画を待たずに結果を返し、描画の完了時に visual_feedback を設定する
+                result["visual_feedback_future"] = submit_visual_feedback(context, full_results, feedback_file,
+                                                                          result, preview)
+            else:
+                with timer.stage("render"):
+                    result["visual_feedback"] = str(generate_visual_feedback(context, full_results, feedback_file,
+                                                                             preview))
+                full_results["performance"]["stages_ms"] = timer.stages_ms()
         
-        # JSONファイルに保存
-        filename = Path(image_path).stem
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_file = output_path / f"analysis_{filename}_{timestamp}.json"
+        # 結果を保存
+        if sink is None:
+            sink = JsonFileSink(output_path)
+        with timer.stage("write"):
+            result_file = sink.write(full_results, filename)
+        result["result_file"] = str(result_file)
         
-        with open(result_file, "w", encoding="utf-8") as f:
-            json.dump(full_results, f, ensure_ascii=False, indent=2)
+        # 書き込みの時間は保存した結果には含まれないため、返す結果と集計にのみ加える
+        full_results["performance"]["stages_ms"] = timer.stages_ms()
+        get_perf_stats().add(full_results["performance"])
+        get_metrics().inc("pdfexpy_frames_analyzed_total", result="success")
         
-        logger.info(f"解析結果をJSONに保存しました: {result_file}")
+        logger.info(f"解析結果を保存しました: {result_file}")
         
-        # 視覚的フィードバックを生成（オプション）
-        visual_feedback_path = None
-        if generate_visual:
-            visual_feedback_path = generate_visual_feedback(
-                image_path, 
-                full_results, 
-                output_path / f"{filename}_feedback_{timestamp}.png"
-            )
-            
-        # 結果を返す
-        return {
-            "results": full_results,
-            "result_file": str(result_file),
-            "visual_feedback": str(visual_feedback_path) if visual_feedback_path else None,
-            "success": True
-        }
+        return result
             
     except Exception as e:
         logger.error(f"画像解析中にエラーが発生しました: {str(e)}")
+        get_metrics().inc("pdfexpy_frames_analyzed_total", result="error")
         return {
             "error": str(e),
             "success": False
         }
 
 
-def build_analysis_results(image_path: str, image_details: Dict, detection_results: Dict) -> Dict:
+def run_detection(context: ImageContext, image_details: Dict[str, Any], mock: bool = True,
+                  model: Optional["YOLOModel"] = None, model_path: Optional[str] = None,
+                  config: Optional[Dict[str, Any]] = None,
+                  timer: Optional[StageTimer] = None) -> Tuple[Dict[str, Any], str]:
+    """
+    物体検出とOCRを実行し、解析結果を構築します
+    
+    Args:
+        context (ImageContext): デコード済みの画像コンテキスト
+        image_details (Dict[str, Any]): 画像の詳細情報
+        mock (bool): モックデータを使用するかどうか
+        model (Optional[YOLOModel]): ロード済みのYOLOモデル
+        model_path (Optional[str]): 使用するモデルのパス（model を指定しない場合）
+        config (Optional[Dict[str, Any]]): アプリケーション設定
+        timer (Optional[StageTimer]): 推論（inference）と後処理（postprocess）の時間を記録するタイマー
+        
+    Returns:
+        Tuple[Dict[str, Any], str]: 解析結果と使用したモデルの名前
+    """
+    timer = timer or StageTimer()
+    
+    if mock:
+        with timer.stage("inference"):
+            return generate_mock_analysis_results(context.path, image_details), "mock"
+    
+    # YOLOモデルを使用した実際の解析を実行
+    if YOLO_AVAILABLE:
+        yolo_model = model or YOLOModel(model_path=model_path)
+        with timer.stage("inference"):
+            detection_results = yolo_model.detect(context)
+        
+        # 詳細な解析結果を構築（OCRを含む）
+        with timer.stage("postprocess"):
+            return build_analysis_results(context, image_details, detection_results, config), "yolov8"
+    
+    logger.warning("YOLOモデルが利用できないため、モックデータを使用します。")
+    with timer.stage("inference"):
+        return generate_mock_analysis_results(context.path, image_details), "mock (YOLO unavailable)"
+
+
+def assemble_results(image_path: str, image_details: Dict[str, Any], analysis_results: Dict[str, Any],
+                     mock: bool, model_used: str, elapsed_time: float,
+                     stages_ms: Optional[Dict[str, float]] = None,
+                     model_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    保存する解析結果（メタデータ・画像情報・解析結果・デバッグ情報・処理時間）を構築します
+    
+    Args:
+        image_path (str): 画像ファイルのパス
+        image_details (Dict[str, Any]): 画像の詳細情報
+        analysis_results (Dict[str, Any]): 解析結果
+        mock (bool): モックデータを使用したかどうか
+        model_used (str): 使用したモデルの名前
+        elapsed_time (float): 解析の処理時間（秒）
+        stages_ms (Optional[Dict[str, float]]): ステージごとの処理時間（ミリ秒）
+        model_id (Optional[str]): モデルの識別子
+        
+    Returns:
+        Dict[str, Any]: 保存する解析結果
+    """
+    # メタデータを追加
+    metadata = {
+        "version": "1.0.0",
+        "mode": "mock_analysis" if mock else "yolo_analysis",
+        "image_path": image_path
+    }
+    
+    # 完全な結果を構築
+    full_results = {
+        "metadata": metadata,
+        "image_details": image_details,
+        "analysis": analysis_results
+    }
+    
+    # デバッグ情報
+    color_info = image_details["image_info"]["color_info"]
+    full_results["debug_info"] = {
+        "mock_data": mock,
+        "model_used": None if mock else model_used,
+        "color_analysis": {
+            "estimated_brightness": "bright" if color_info.get("brightness_percent", 50) > 70 else "medium" if color_info.get("brightness_percent", 50) > 30 else "dark",
+            "dominant_colors": [c["hex"] for c in color_info.get("dominant_colors", [])]
+                               or [color_info.get("avg_color_hex", "#ffffff")],
+            "theme": color_info.get("theme", "unknown"),
+            "color_variance": "high" if color_info.get("color_variance", 50) > 80 else "medium" if color_info.get("color_variance", 50) > 40 else "low"
+        }
+    }
+    
+    # 処理時間（ステージごとの内訳・画像サイズ・モデルを含む）を記録
+    image_info = image_details.get("image_info", {})
+    full_results["performance"] = build_performance(elapsed_time, stages_ms, image_info.get("width"),
+                                                    image_info.get("height"), model_used, model_id)
+    
+    # 現在の日時
+    full_results["timestamp"] = datetime.datetime.now().isoformat()
+    
+    return full_results
+
+
+def feedback_settings(output_path: Path, filename: str, timestamp: str,
+                      config: Optional[Dict[str, Any]] = None) -> Tuple[Path, Dict[str, Any]]:
+    """
+    視覚的フィードバックの出力パスとプレビュー設定を取得します
+    
+    Args:
+        output_path (Path): 出力ディレクトリ
+        filename (str): 画像ファイル名（拡張子なし）
+        timestamp (str): ファイル名に付ける日時
+        config (Optional[Dict[str, Any]]): アプリケーション設定（analysis.visual_format と preview を参照）
+        
+    Returns:
+        Tuple[Path, Dict[str, Any]]: 出力ファイルのパスとプレビュー設定
+    """
+    config = config or DEFAULT_CONFIG
+    visual_format = config.get("analysis", {}).get("visual_format", "svg")
+    preview = config.get("preview", DEFAULT_CONFIG["preview"])
+    return Path(output_path) / f"{filename}_feedback_{timestamp}.{visual_format}", preview
+
+
+def iter_image_files(root: Union[str, Path], recursive: bool = True,
+                     extensions: Tuple[str, ...] = IMAGE_EXTENSIONS) -> Iterator[str]:
+    """
+    ディレクトリ内の画像ファイルを遅延的に列挙します
+    
+    Args:
+        root (Union[str, Path]): 探索するディレクトリ
+        recursive (bool): サブディレクトリも探索するかどうか
+        extensions (Tuple[str, ...]): 対象とする拡張子（小文字）
+        
+    Yields:
+        str: 画像ファイルのパス
+    """
+    pending = [str(root)]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.name.lower().endswith(extensions):
+                        yield entry.path
+        except OSError as e:
+            logger.warning(f"ディレクトリを読み込めません: {directory}: {e}")
+
+
+def iter_input_paths(paths_or_dir: Union[str, Path, Iterable[str]], recursive: bool = True) -> Iterator[str]:
+    """
+    ディレクトリ・画像ファイル・パスのイテラブルから解析対象のパスを遅延的に取得します
+    
+    Args:
+        paths_or_dir (Union[str, Path, Iterable[str]]): ディレクトリ、画像ファイル、またはパスのイテラブル
+        recursive (bool): ディレクトリを指定した場合にサブディレクトリも探索するかどうか
+        
+    Returns:
+        Iterator[str]: 画像ファイルのパスのイテレータ
+    """
+    if isinstance(paths_or_dir, (str, Path)):
+        if os.path.isdir(paths_or_dir):
+            return iter_image_files(paths_or_dir, recursive)
+        return iter([str(paths_or_dir)])
+    return (str(path) for path in paths_or_dir)
+
+
+def _decode_ahead(image_path: str) -> ImageContext:
+    """
+    先読み用に画像をデコードした画像コンテキストを作成します
+    
+    Args:
+        image_path (str): 画像ファイルのパス
+        
+    Returns:
+        ImageContext: デコード済みの画像コンテキスト
+    """
+    context = ImageContext(image_path)
+    if NUMPY_AVAILABLE:
+        context.rgb
+    else:
+        context.pil
+    return context
+
+
+def iter_analyze(paths_or_dir: Union[str, Path, Iterable[str]], output_dir: str = "analysis_results",
+                 generate_visual: bool = True, mock: bool = True,
+                 model_path: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None,
+                 recursive: bool = True,
+                 prefetch: int = 2,
+                 sink: Optional[ResultSink] = None,
+                 defer_visual: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+    """
+    複数の画像を順に解析し、1枚ごとに結果を返すジェネレータ
+    
+    ファイルの列挙と次の画像のデコードはバックグラウンドで行い、準備できた画像から順に解析します。
+    ディレクトリ監視のように次の入力がいつ届くか分からない場合も、届いた画像はすぐに解析されます。
+    同時に保持するデコード済み画像は prefetch + 1 枚までのため、ディレクトリの
+    大きさに関わらずメモリ使用量は一定です。途中でループを抜けると先読みも停止します。
+    
+    Args:
+        paths_or_dir (Union[str, Path, Iterable[str]]): ディレクトリ、画像ファイル、またはパスのイテラブル
+        output_dir (str): 結果を出力するディレクトリ
+        generate_visual (bool): 視覚的フィードバックを生成するかどうか
+        mock (bool): モックデータを使用するかどうか
+        model_path (Optional[str]): 使用するモデルのパス
+        config (Optional[Dict[str, Any]]): アプリケーション設定
+        recursive (bool): ディレクトリを指定した場合にサブディレクトリも探索するかどうか
+        prefetch (int): 先読みする画像の枚数
+        sink (Optional[ResultSink]): 結果の出力先（Noneの場合は設定の result_sink に従って作成）
+        defer_visual (Optional[bool]): 視覚的フィードバックをバックグラウンドで描画するかどうか
+            （Noneの場合は設定の analysis.defer_visual に従う）。終了時に描画の完了を待ちます
+        
+    Yields:
+        Dict[str, Any]: analyze_image の結果に image_path を加えたもの
+    """
+    paths = iter_input_paths(paths_or_dir, recursive)
+    
+    # モデルは一度だけ作成し、全ての画像で使い回す
+    model = None
+    if not mock and YOLO_AVAILABLE:
+        model = YOLOModel(model_path=model_path)
+    
+    if defer_visual is None:
+        defer_visual = (config or DEFAULT_CONFIG).get("analysis", {}).get("defer_visual", True)
+    
+    # シンクを指定されなかった場合は作成し、終了時に閉じる
+    owns_sink = sink is None
+    if owns_sink:
+        sink = create_result_sink(config, output_dir)
+    
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdfexpy-decode")
+    # 列挙済みの画像（パス, デコードのFuture）。入力の終わりは None、列挙中の例外は例外オブジェクト
+    ready = Queue()
+    # デコード済み画像の保持数の上限（解析が終わるたびに空きを返す）
+    slots = threading.Semaphore(max(prefetch, 0) + 1)
+    stop = threading.Event()
+    
+    def feed():
+        # 次の入力を待つ間も、列挙済みの画像の解析は止めない
+        try:
+            while True:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                path = next(paths, None)
+                if path is None or stop.is_set():
+                    return
+                ready.put((str(path), executor.submit(_decode_ahead, str(path))))
+        except Exception as e:
+            ready.put(e)
+        finally:
+            ready.put(None)
+    
+    threading.Thread(target=feed, name="pdfexpy-iter-feed", daemon=True).start()
+    
+    try:
+        while True:
+            item = ready.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            image_path, future = item
+            
+            try:
+                context = future.result()
+            except Exception as e:
+                slots.release()
+                logger.error(f"画像の読み込みに失敗しました: {image_path}: {e}")
+                yield {"image_path": image_path, "error": str(e), "success": False}
+                continue
+            
+            try:
+                result = analyze_image(context, output_dir, generate_visual, mock,
+                                       model_path=model_path, config=config, model=model, sink=sink,
+                                       defer_visual=defer_visual)
+            finally:
+                context.close()
+                slots.release()
+            
+            result["image_path"] = image_path
+            yield result
+    finally:
+        # 途中で停止された場合は列挙を止め、先読みを取り消す
+        stop.set()
+        slots.release()
+        pending = []
+        while True:
+            try:
+                item = ready.get_nowait()
+            except Empty:
+                break
+            if isinstance(item, tuple):
+                pending.append(item[1])
+                item[1].cancel()
+        executor.shutdown(wait=True)
+        for future in pending:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result().close()
+        if defer_visual:
+            wait_for_visual_feedback()
+        if owns_sink:
+            sink.close()
+
+
+def iter_new_files(directory: Union[str, Path], poll_interval: float = 1.0,
+                   stop_event: Optional[threading.Event] = None,
+                   include_existing: bool = False) -> Iterator[str]:
+    """
+    ディレクトリに追加された画像ファイルを監視して返します
+    
+    書き込み中のファイルを避けるため、前回のポーリングからサイズが変わっていない
+    ファイルのみを返します。
+    
+    Args:
+        directory (Union[str, Path]): 監視するディレクトリ
+        poll_interval (float): ポーリング間隔（秒）
+        stop_event (Optional[threading.Event]): セットされると監視を終了するイベント
+        include_existing (bool): 監視開始時に既に存在するファイルも返すかどうか
+        
+    Returns:
+        Iterator[str]: 追加された画像ファイルのパスを返すイテレータ
+    """
+    # 既存ファイルの一覧は呼び出し時点で取得する（最初のnext()まで遅延させない）
+    seen = set()
+    if not include_existing:
+        seen.update(iter_image_files(directory, recursive=False))
+    return _poll_new_files(directory, seen, poll_interval, stop_event)
+
+
+def _poll_new_files(directory: Union[str, Path], seen: set, poll_interval: float,
+                    stop_event: Optional[threading.Event]) -> Iterator[str]:
+    """
+    ディレクトリをポーリングし、未処理の画像ファイルを返します
+    
+    Args:
+        directory (Union[str, Path]): 監視するディレクトリ
+        seen (set): 返却済み（または対象外）のファイルパスの集合
+        poll_interval (float): ポーリング間隔（秒）
+        stop_event (Optional[threading.Event]): セットされると監視を終了するイベント
+        
+    Yields:
+        str: 追加された画像ファイルのパス
+    """
+    sizes = {}
+    
+    while stop_event is None or not stop_event.is_set():
+        for path in iter_image_files(directory, recursive=False):
+            if path in seen:
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            if sizes.get(path) == size and size > 0:
+                seen.add(path)
+                sizes.pop(path, None)
+                yield path
+            else:
+                sizes[path] = size
+        
+        if stop_event is not None:
+            stop_event.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+
+
+def watch_directory(directory: Union[str, Path], output_dir: Optional[str] = None,
+                    generate_visual: bool = True, mock: bool = True,
+                    config: Optional[Dict[str, Any]] = None,
+                    poll_interval: float = 1.0,
+                    stop_event: Optional[threading.Event] = None,
+                    manifest: Optional[AnalysisManifest] = None) -> Iterator[Dict[str, Any]]:
+    """
+    ディレクトリを監視し、追加された画像を解析します
+    
+    監視開始時（呼び出し時）に既に存在する画像は対象外です。マニフェストを指定した場合は、
+    既に存在する画像のうち未解析または変更されたものも解析し、解析に成功した画像を
+    マニフェストに記録します。
+    
+    Args:
+        directory (Union[str, Path]): 監視するディレクトリ
+        output_dir (Optional[str]): 結果を出力するディレクトリ（Noneの場合は設定値を使用）
+        generate_visual (bool): 視覚的フィードバックを生成するかどうか
+        mock (bool): モックデータを使用するかどうか
+        config (Optional[Dict[str, Any]]): アプリケーション設定
+        poll_interval (float): ポーリング間隔（秒）
+        stop_event (Optional[threading.Event]): セットされると監視を終了するイベント
+        manifest (Optional[AnalysisManifest]): 解析済みの画像を記録するマニフェスト
+        
+    Returns:
+        Iterator[Dict[str, Any]]: 解析結果を返すイテレータ
+    """
+    if output_dir is None:
+        output_dir = (config or DEFAULT_CONFIG).get("output", {}).get("analysis_dir", "analysis_results")
+    
+    logger.info(f"ディレクトリの監視を開始します: {directory}")
+    new_files = iter_new_files(directory, poll_interval, stop_event, include_existing=manifest is not None)
+    if manifest is None:
+        return iter_analyze(new_files, output_dir, generate_visual, mock, config=config)
+    return _record_in_manifest(
+        iter_analyze(manifest.filter_paths(new_files), output_dir, generate_visual, mock, config=config),
+        manifest
+    )
+
+
+def _record_in_manifest(results: Iterator[Dict[str, Any]], manifest: AnalysisManifest) -> Iterator[Dict[str, Any]]:
+    """
+    解析結果をマニフェストに記録しながら返します
+    
+    Args:
+        results (Iterator[Dict[str, Any]]): 解析結果
+        manifest (AnalysisManifest): 解析済みの画像を記録するマニフェスト
+        
+    Yields:
+        Dict[str, Any]: 解析結果
+    """
+    for result in results:
+        manifest.record_result(result)
+        yield result
+
+
+def build_analysis_results(image_path: Union[str, ImageContext], image_details: Dict, detection_results: Dict,
+                           config: Optional[Dict[str, Any]] = None) -> Dict:
     """
     YOLOv8検出結果から詳細な解析結果を構築します
     
     Args:
-        image_path (str): 画像パス
+        image_path (Union[str, ImageContext]): 画像パスまたは画像コンテキスト
         image_details (Dict): 画像の詳細情報
         detection_results (Dict): YOLOv8検出結果
+        config (Optional[Dict[str, Any]]): アプリケーション設定（Noneの場合はデフォルト設定を使用）
         
     Returns:
         Dict: 構造化された解析結果
@@ -355,12 +798,8 @@ def build_analysis_results(image_path: str, image_details: Dict, detection_resul
     else:
         avg_confidence = 0.0
     
-    # OCR結果（現在はダミー）
-    ocr_results = {
-        "detected": False,
-        "text": "",
-        "regions": []
-    }
+    # OCR結果
+    ocr_results = run_ocr_stage(image_path, objects, config)
     
     # 結果を構築
     return {
@@ -372,6 +811,58 @@ def build_analysis_results(image_path: str, image_details: Dict, detection_resul
     }
 
 
+def run_ocr_stage(image_path: Union[str, ImageContext], objects: List[Dict],
+                  config: Optional[Dict[str, Any]] = None) -> Dict:
+    """
+    テキストらしい領域に対してOCRを実行します
+    
+    テキストらしい検出オブジェクトがあればその領域のみを、なければOpenCVで
+    提案したテキスト行の領域をOCRの対象とし、背景部分はOCRしません。
+    
+    Args:
+        image_path (Union[str, ImageContext]): 画像パスまたは画像コンテキスト
+        objects (List[Dict]): 検出オブジェクトのリスト
+        config (Optional[Dict[str, Any]]): アプリケーション設定（Noneの場合はデフォルト設定を使用）
+        
+    Returns:
+        Dict: OCR結果（detected, text, confidence, regions）
+    """
+    config = config or DEFAULT_CONFIG
+    ocr_config = {**DEFAULT_CONFIG["ocr"], **config.get("ocr", {})}
+    tesseract_config = {**DEFAULT_CONFIG["models"]["tesseract"], **config.get("models", {}).get("tesseract", {})}
+    
+    if not (ocr_config.get("enabled", True) and tesseract_config.get("enabled", True)):
+        return {"detected": False, "text": "", "regions": []}
+    
+    if not OCR_AVAILABLE:
+        return {"detected": False, "text": "", "regions": [], "error": "OCRエンジンが利用できません"}
+    
+    try:
+        rgb = as_image_context(image_path).rgb
+        
+        # テキストらしい検出領域がなければテキスト行の候補を提案する
+        regions = select_text_regions(objects, ocr_config.get("text_labels")) or None
+        if regions is None and TEXT_DETECTION_AVAILABLE and ocr_config.get("region_proposal", "opencv") == "opencv":
+            regions = propose_text_regions(rgb)
+        
+        return extract_text(
+            rgb,
+            regions=regions,
+            language=tesseract_config["language"],
+            config=ocr_config.get("config", "--psm 6"),
+            max_workers=ocr_config.get("max_workers"),
+            min_confidence=ocr_config.get("min_confidence", 0.0),
+            padding=ocr_config.get("padding", 2),
+            thread_limit=ocr_config.get("thread_limit", 1),
+            backend=ocr_config.get("backend", "auto"),
+            cache=get_ocr_cache(ocr_config.get("cache")),
+            preprocess=ocr_config.get("preprocess", True)
+        )
+    except (OCRError, OSError) as e:
+        logger.warning(f"OCRを実行できませんでした: {e}")
+        return {"detected": False, "text": "", "regions": [], "error": str(e)}
+
+
 def generate_mock_analysis_results(image_path: str, image_details: Dict) -> Dict:
     """
     モック解析結果を生成します（開発およびテスト用）
@@ -459,18 +950,118 @@ def generate_mock_analysis_results(image_path: str, image_details: Dict) -> Dict
     }
 
 
-def generate_visual_feedback(image_path: str, analysis_results: Dict[str, Any], 
-                            output_file: Path) -> Path:
+def _render_detached(image: Union["np.ndarray", "Image.Image"], image_path: Optional[str],
+                     analysis_results: Dict[str, Any], output_file: Path,
+                     result: Optional[Dict[str, Any]], preview: Optional[Dict[str, Any]] = None) -> Path:
     """
-    解析結果の視覚的フィードバックを生成します
+    解析側から切り離した画素データから視覚的フィードバックを描画します
     
     Args:
-        image_path (str): 元の画像ファイルのパス
+        image (Union[np.ndarray, Image.Image]): RGB配列またはPIL画像
+        image_path (Optional[str]): 元画像のパス
         analysis_results (Dict[str, Any]): 解析結果
         output_file (Path): 出力ファイルのパス
+        result (Optional[Dict[str, Any]]): 完了時に visual_feedback を設定する analyze_image の結果
+        preview (Optional[Dict[str, Any]]): 設定の preview セクション
         
     Returns:
         Path: 生成された視覚的フィードバック画像のパス
+    """
+    try:
+        if isinstance(image, Image.Image):
+            context = ImageContext(image_path, image=image)
+        else:
+            context = ImageContext.from_array(image, image_path=image_path)
+        start = time.perf_counter_ns()
+        path = generate_visual_feedback(context, analysis_results, output_file, preview)
+        # バックグラウンドの描画時間は保存した結果に含められないため、集計にのみ加える
+        get_perf_stats().add_stage("render", (time.perf_counter_ns() - start) / 1e6)
+        if result is not None:
+            result["visual_feedback"] = str(path)
+        return path
+    except Exception as e:
+        if result is not None:
+            result["visual_feedback_error"] = str(e)
+        raise
+    finally:
+        _render_slots.release()
+
+
+def submit_visual_feedback(image_path: Union[str, ImageContext], analysis_results: Dict[str, Any],
+                           output_file: Path, result: Optional[Dict[str, Any]] = None,
+                           preview: Optional[Dict[str, Any]] = None) -> Future:
+    """
+    視覚的フィードバックの描画をバックグラウンドのスレッドに投入します
+    
+    描画待ちが MAX_PENDING_RENDERS 件に達している場合は、空きができるまで待機します。
+    画素データは参照を引き継ぐため、投入後に画像コンテキストを閉じても問題ありません。
+    
+    Args:
+        image_path (Union[str, ImageContext]): 元の画像ファイルのパス、またはデコード済みの画像コンテキスト
+        analysis_results (Dict[str, Any]): 解析結果
+        output_file (Path): 出力ファイルのパス
+        result (Optional[Dict[str, Any]]): 描画の完了時に visual_feedback を設定する analyze_image の結果
+        preview (Optional[Dict[str, Any]]): 設定の preview セクション（Noneの場合は元の解像度で保存）
+        
+    Returns:
+        Future: 生成された視覚的フィードバック画像のパスを返すFuture
+    """
+    global _render_executor
+    
+    context = as_image_context(image_path)
+    image = context.rgb if NUMPY_AVAILABLE else context.pil.copy()
+    
+    _render_slots.acquire()
+    try:
+        with _render_lock:
+            if _render_executor is None:
+                _render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdfexpy-render")
+            future = _render_executor.submit(_render_detached, image, context.path, analysis_results,
+                                             output_file, result, preview)
+            _pending_renders.add(future)
+    except Exception:
+        _render_slots.release()
+        raise
+    
+    future.add_done_callback(_pending_renders.discard)
+    return future
+
+
+def wait_for_visual_feedback(timeout: Optional[float] = None) -> bool:
+    """
+    バックグラウンドで描画中の視覚的フィードバックが全て完了するまで待機します
+    
+    Args:
+        timeout (Optional[float]): 最大待機時間（秒）
+        
+    Returns:
+        bool: 全て完了した場合はTrue
+    """
+    pending = list(_pending_renders)
+    if not pending:
+        return True
+    _, not_done = wait(pending, timeout=timeout)
+    return not not_done
+
+
+def generate_visual_feedback(image_path: Union[str, ImageContext], analysis_results: Dict[str, Any], 
+                            output_file: Path, preview: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    解析結果の視覚的フィードバックを生成します
+    
+    出力形式は拡張子で決まります。.svg / .json の場合は元画像に重ねて表示する
+    ベクター形式のオーバーレイを保存し（画素のデコードと再エンコードは行いません）、
+    それ以外の場合は注釈を描き込んだ画像を保存します。画像の場合は preview の設定に従って
+    先に縮小してから枠を縮尺に合わせて描画し、.jpg / .webp は指定した品質で保存します。
+    
+    Args:
+        image_path (Union[str, ImageContext]): 元の画像ファイルのパス、またはデコード済みの画像コンテキスト
+        analysis_results (Dict[str, Any]): 解析結果
+        output_file (Path): 出力ファイルのパス
+        preview (Optional[Dict[str, Any]]): 設定の preview セクション（Noneの場合は元の解像度で保存）
+        
+    Returns:
+        Path: 生成された視覚的フィードバックのパス
         
     Raises:
         ImageAnalysisError: 視覚的フィードバック生成に失敗した場合
@@ -479,117 +1070,29 @@ def generate_visual_feedback(image_path: str, analysis_results: Dict[str, Any],
         raise ImageAnalysisError("PIL (Pillow) ライブラリがインストールされていません。'pip install pillow' を実行してください。")
     
     try:
-        # 元画像の読み込み
-        with Image.open(image_path) as img:
-            # 画像をRGBAモードに変換（描画用）
-            if img.mode != "RGBA":
-                img = img.convert("RGBA")
-            
-            # 作業用の画像を複製
-            annotated_img = img.copy()
-            draw = ImageDraw.Draw(annotated_img)
-            
-            # フォントの設定（デフォルトフォント）
-            try:
-                # Windowsの場合
-                font_path = "C:\\Windows\\Fonts\\meiryo.ttc"
-                if not os.path.exists(font_path):
-                    font_path = "C:\\Windows\\Fonts\\msgothic.ttc"
-                
-                title_font = ImageFont.truetype(font_path, 20)
-                normal_font = ImageFont.truetype(font_path, 14)
-            except Exception:
-                # フォントが見つからない場合はデフォルトフォントを使用
-                title_font = ImageFont.load_default()
-                normal_font = ImageFont.load_default()
-            
-            # 検出されたオブジェクトの描画
-            if "objects" in analysis_results.get("analysis", {}):
-                for obj in analysis_results["analysis"]["objects"]:
-                    # バウンディングボックスの取得
-                    bbox = obj["bbox"]
-                    x, y = bbox["x"], bbox["y"]
-                    w, h = bbox["width"], bbox["height"]
-                    
-                    # バウンディングボックスの描画
-                    draw.rectangle([(x, y), (x + w, y + h)], outline=(0, 255, 0, 220), width=2)
-                    
-                    # ラベルの背景
-                    label_text = f"{obj['label']} ({obj['confidence']:.2f})"
-                    draw.rectangle([(x, y - 25), (x + len(label_text) * 7, y)], fill=(0, 255, 0, 180))
-                    
-                    # ラベルのテキスト
-                    draw.text((x + 5, y - 20), label_text, fill=(0, 0, 0, 255), font=normal_font)
-            
-            # OCRテキスト領域の描画
-            if "ocr" in analysis_results.get("analysis", {}) and analysis_results["analysis"]["ocr"].get("detected", False):
-                for region in analysis_results["analysis"]["ocr"].get("regions", []):
-                    # 領域の取得
-                    bbox = region["bbox"]
-                    x, y = bbox["x"], bbox["y"]
-                    w, h = bbox["width"], bbox["height"]
-                    
-                    # テキスト領域の描画
-                    draw.rectangle([(x, y), (x + w, y + h)], outline=(255, 0, 0, 220), width=2)
-                    
-                    # テキストの背景
-                    text_confidence = f" ({region['confidence']:.2f})"
-                    draw.rectangle([(x, y - 25), (x + len(region['text']) * 7, y)], fill=(255, 0, 0, 180))
-                    
-                    # テキスト内容
-                    draw.text((x + 5, y - 20), region['text'] + text_confidence, fill=(255, 255, 255, 255), font=normal_font)
-            
-            # 画像情報のオーバーレイ
-            info_text = [
-                f"解析タイムスタンプ: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                f"元画像: {Path(image_path).name}",
-                f"解像度: {img.width}x{img.height} ({analysis_results['image_details']['image_info']['orientation']})",
-                f"アスペクト比: {analysis_results['image_details']['image_info']['aspect_ratio_name']}"
-            ]
-            
-            # 情報テキストの位置
-            info_x, info_y = 10, 10
-            
-            # 情報の背景
-            text_height = len(info_text) * 25 + 10
-            draw.rectangle([(info_x - 5, info_y - 5), (info_x + 350, info_y + text_height)], 
-                          fill=(0, 0, 0, 180))
-            
-            # 情報テキストの描画
-            for i, text in enumerate(info_text):
-                draw.text((info_x, info_y + i * 25), text, fill=(255, 255, 255, 255), font=normal_font)
-            
-            # 解析情報のオーバーレイ
-            if "analysis" in analysis_results:
-                analysis_info = [
-                    "【解析結果サマリー】",
-                    f"検出オブジェクト: {len(analysis_results['analysis'].get('objects', []))}個",
-                    f"テキスト検出: {'あり' if analysis_results['analysis'].get('ocr', {}).get('detected', False) else 'なし'}",
-                    f"説明: {analysis_results['analysis'].get('description', 'なし')}",
-                ]
-                
-                # 解析情報の位置
-                analysis_x = 10
-                analysis_y = img.height - len(analysis_info) * 25 - 15
-                
-                # 解析情報の背景
-                analysis_height = len(analysis_info) * 25 + 10
-                draw.rectangle([(analysis_x - 5, analysis_y - 5), (analysis_x + 500, analysis_y + analysis_height)], 
-                              fill=(0, 0, 0, 180))
-                
-                # 解析情報テキストの描画
-                for i, text in enumerate(analysis_info):
-                    if i == 0:  # タイトル
-                        draw.text((analysis_x, analysis_y + i * 25), text, fill=(255, 255, 0, 255), font=title_font)
-                    else:
-                        draw.text((analysis_x, analysis_y + i * 25), text, fill=(255, 255, 255, 255), font=normal_font)
-            
-            # 結果を保存
-            annotated_img.save(output_file)
+        context = as_image_context(image_path)
+        output_file = Path(output_file)
+        
+        # ベクター形式のオーバーレイ（画像サイズのみを使用）
+        if output_file.suffix.lower() in VECTOR_FORMATS:
+            width, height = context.read_header()[:2]
+            overlay = build_overlay(analysis_results, width, height, context.path)
+            write_overlay(overlay, output_file)
             
-            logger.info(f"視覚的フィードバックをPNG画像として保存しました: {output_file}")
+            logger.info(f"視覚的フィードバックをオーバーレイとして保存しました: {output_file}")
             return output_file
-    
+        
+        # 注釈を描き込んだ画像（デコード済みの画像コンテキストを共有）
+        img = context.pil
+        overlay = build_overlay(analysis_results, img.width, img.height, context.path)
+        annotated_img = rasterize_overlay(overlay, img, max_dimension=preview_max_dimension(preview))
+        
+        # 結果を保存
+        save_raster(annotated_img, output_file, (preview or {}).get("quality"))
+        
+        logger.info(f"視覚的フィードバックを画像として保存しました: {output_file}")
+        return output_file
+
     except Exception as e:
         logger.error(f"視覚的フィードバックの生成中にエラーが発生しました: {e}")
-        raise ImageAnalysisError(f"視覚的フィードバックの生成に失敗しました: {str(e)}") 
\ No newline at end of file
+        raise ImageAnalysisError(f"視覚的フィードバックの生成に失敗しました: {str(e)}")
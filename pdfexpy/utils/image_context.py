@@ -0,0 +1,209 @@
+"""
+解析の全ステージで共有する画像コンテキストを提供するモジュール
+
+画像ファイルを一度だけデコードし、RGB・BGR・グレースケール・縮小版などの
+表現を必要になった時点で生成してキャッシュします。
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+# 画像処理
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# OpenCV
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+# 数値計算
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ImageContext:
+    """一度だけデコードした画像と、その各種表現を遅延生成して保持するクラス"""
+
+    def __init__(self, image_path: Optional[Union[str, Path]] = None, image: Optional["Image.Image"] = None):
+        """
+        画像コンテキストを初期化します（デコードは最初のアクセス時に行います）
+
+        Args:
+            image_path (Optional[Union[str, Path]]): 画像ファイルのパス
+            image (Optional[Image.Image]): デコード済みのPIL画像（パスの代わりに指定可能）
+        """
+        if image_path is None and image is None:
+            raise ValueError("image_path または image のいずれかを指定してください")
+
+        self.path = str(image_path) if image_path is not None else None
+        self._pil = image
+        self._stat = None
+        self._rgb = None
+        self._bgr = None
+        self._gray = None
+        self._downscaled: Dict[int, "np.ndarray"] = {}
+
+    @classmethod
+    def from_array(cls, rgb: "np.ndarray", image_path: Optional[str] = None) -> "ImageContext":
+        """
+        RGB配列から画像コンテキストを作成します
+
+        Args:
+            rgb (np.ndarray): RGB形式の画像配列
+            image_path (Optional[str]): 元画像のパス（ファイル情報の取得用）
+
+        Returns:
+            ImageContext: 画像コンテキスト
+        """
+        context = cls(image_path=image_path, image=Image.fromarray(rgb))
+        context._rgb = rgb
+        return context
+
+    @property
+    def pil(self) -> "Image.Image":
+        """デコード済みのPIL画像"""
+        if self._pil is None:
+            if not PIL_AVAILABLE:
+                raise ImportError("PIL (Pillow) ライブラリがインストールされていません")
+            with Image.open(self.path) as img:
+                img.load()
+                self._pil = img
+        return self._pil
+
+    def read_header(self) -> Tuple[int, int, Optional[str], str]:
+        """
+        画素をデコードせずにヘッダーから画像のサイズ・フォーマット・モードを取得します
+
+        Returns:
+            Tuple[int, int, Optional[str], str]: (幅, 高さ, フォーマット名, モード)
+        """
+        if self._pil is not None:
+            return self._pil.width, self._pil.height, self._pil.format, self._pil.mode
+        if not PIL_AVAILABLE:
+            raise ImportError("PIL (Pillow) ライブラリがインストールされていません")
+        # Image.openはヘッダーのみを読み込み、load()するまで画素をデコードしない
+        with Image.open(self.path) as img:
+            return img.width, img.height, img.format, img.mode
+
+    @property
+    def stat(self) -> os.stat_result:
+        """画像ファイルのstat情報"""
+        if self._stat is None:
+            self._stat = Path(self.path).stat()
+        return self._stat
+
+    @property
+    def format(self) -> Optional[str]:
+        """画像フォーマット名"""
+        return self.pil.format
+
+    @property
+    def mode(self) -> str:
+        """PILの画像モード"""
+        return self.pil.mode
+
+    @property
+    def width(self) -> int:
+        """画像の幅"""
+        return self.pil.width
+
+    @property
+    def height(self) -> int:
+        """画像の高さ"""
+        return self.pil.height
+
+    @property
+    def rgb(self) -> "np.ndarray":
+        """RGB形式の画像配列 (H, W, 3)"""
+        if self._rgb is None:
+            pil = self.pil
+            if pil.mode != "RGB":
+                pil = pil.convert("RGB")
+            self._rgb = np.asarray(pil)
+        return self._rgb
+
+    @property
+    def bgr(self) -> "np.ndarray":
+        """BGR形式の画像配列（OpenCV・ultralytics用）"""
+        if self._bgr is None:
+            if CV2_AVAILABLE:
+                self._bgr = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2BGR)
+            else:
+                self._bgr = np.ascontiguousarray(self.rgb[:, :, ::-1])
+        return self._bgr
+
+    @property
+    def gray(self) -> "np.ndarray":
+        """グレースケールの画像配列 (H, W)"""
+        if self._gray is None:
+            if CV2_AVAILABLE:
+                self._gray = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY)
+            else:
+                weights = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+                self._gray = (self.rgb @ weights).astype(np.uint8)
+        return self._gray
+
+    def downscaled(self, max_dimension: int) -> "np.ndarray":
+        """
+        長辺がmax_dimension以下になるよう縮小したRGB配列を取得します
+
+        Args:
+            max_dimension (int): 長辺の最大ピクセル数
+
+        Returns:
+            np.ndarray: 縮小したRGB配列（十分に小さい場合は元の配列）
+        """
+        if max(self.width, self.height) <= max_dimension:
+            return self.rgb
+
+        if max_dimension not in self._downscaled:
+            scale = max_dimension / max(self.width, self.height)
+            size = (max(1, int(self.width * scale)), max(1, int(self.height * scale)))
+            if CV2_AVAILABLE:
+                small = cv2.resize(self.rgb, size, interpolation=cv2.INTER_AREA)
+            else:
+                small = np.asarray(self.pil.convert("RGB").resize(size, Image.BILINEAR))
+            self._downscaled[max_dimension] = small
+
+        return self._downscaled[max_dimension]
+
+    def close(self):
+        """
+        保持している画像データを解放します
+        """
+        if self._pil is not None:
+            self._pil.close()
+        self._pil = None
+        self._rgb = None
+        self._bgr = None
+        self._gray = None
+        self._downscaled.clear()
+
+
+def as_image_context(image: Union[str, Path, "ImageContext"]) -> "ImageContext":
+    """
+    画像パスまたは画像コンテキストから画像コンテキストを取得します
+
+    Args:
+        image (Union[str, Path, ImageContext]): 画像パスまたは画像コンテキスト
+
+    Returns:
+        ImageContext: 画像コンテキスト
+    """
+    if isinstance(image, ImageContext):
+        return image
+    return ImageContext(image)
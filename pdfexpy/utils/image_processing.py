@@ -8,6 +8,8 @@ from typing import Dict, List, Tuple, Union, Optional
 import numpy as np
 import cv2
 
+from .annotation_renderer import get_renderer
+
 
 def generate_colors(n: int = 100) -> List[Tuple[int, int, int]]:
     """
@@ -83,83 +85,45 @@ def visualize_annotations(
     class_names: Optional[Dict[int, str]] = None,
     thickness: int = 2,
     font_scale: float = 0.6,
-    show_confidence: bool = True
+    show_confidence: bool = True,
+    scale: float = 1.0
 ) -> np.ndarray:
     """
     検出されたオブジェクトを描画します
     
+    描画は渡された画像に直接行います（元の画像を残す場合は呼び出し側で複製してください）。
+    色を指定しない場合は、ラベルごとに全ての画像で共通の色を使用します。
+    
     Args:
-        image: 描画対象のCV2画像 (BGR形式)
+        image: 描画対象のCV2画像 (BGR形式)。この配列に直接描画されます
         objects: 検出オブジェクトのリスト [{"label": "person", "confidence": 0.83, "bbox": {...}}]
-        colors: 各クラスの色。Noneの場合は自動生成。
-        class_names: クラスID->クラス名の辞書。Noneの場合はobjectsから取得
+        colors: 各クラスの色。Noneの場合はラベルごとの共通の色を使用
+        class_names: クラスID->クラス名の辞書。colors を指定した場合の色の割り当てに使用
         thickness: 線の太さ
         font_scale: フォントサイズ
         show_confidence: 信頼度スコアを表示するかどうか
+        scale: 座標の倍率（縮小した画像に元の解像度の座標で描画する場合）
         
     Returns:
-        np.ndarray: 注釈付きの画像
-    """
-    # 画像のコピーを作成（元の画像を変更しないため）
-    result_image = image.copy()
-    
-    # クラス名を抽出（重複なし）
-    if class_names is None:
-        unique_labels = set(obj["label"] for obj in objects)
-        class_names = {i: label for i, label in enumerate(unique_labels)}
-    
-    # 色を生成（指定されていない場合）
-    if colors is None:
-        colors = generate_colors(len(class_names))
-    
-    # 各オブジェクトを描画
-    for obj in objects:
-        # バウンディングボックスの座標を取得
-        bbox = obj["bbox"]
-        x, y = bbox["x"], bbox["y"]
-        w, h = bbox["width"], bbox["height"]
-        
-        # ラベルとスコアを取得
-        label = obj["label"]
-        score = obj.get("confidence", 0.0)
-        
-        # クラスIDを取得
-        class_id = next((i for i, name in class_names.items() if name == label), 0)
-        
-        # 色を取得
-        color = colors[class_id % len(colors)]
-        
-        # バウンディングボックスを描画
-        cv2.rectangle(result_image, (x, y), (x + w, y + h), color, thickness)
-        
-        # ラベルテキストを準備
-        if show_confidence:
-            label_text = f"{label} {score:.2f}"
-        else:
-            label_text = label
-        
-        # ラベルの背景を描画
-        text_size, _ = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
-        cv2.rectangle(
-            result_image,
-            (x, y - text_size[1] - 5),
-            (x + text_size[0], y),
-            color,
-            -1  # -1は塗りつぶし
-        )
-        
-        # ラベルテキストを描画
-        cv2.putText(
-            result_image,
-            label_text,
-            (x, y - 5),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            font_scale,
-            (255, 255, 255),  # 白色
-            thickness
-        )
+        np.ndarray: 注釈付きの画像（image と同じ配列）
+    """
+    # 色が指定された場合は、ラベル->色の辞書を一度だけ作成する
+    label_colors = None
+    if colors:
+        if class_names is None:
+            labels = list(dict.fromkeys(obj["label"] for obj in objects))
+            class_names = {i: label for i, label in enumerate(labels)}
+        label_colors = {name: colors[class_id % len(colors)] for class_id, name in class_names.items()}
     
-    return result_image
+    return get_renderer().draw_objects(
+        image,
+        objects,
+        colors=label_colors,
+        thickness=thickness,
+        font_scale=font_scale,
+        show_confidence=show_confidence,
+        scale=scale
+    )
 
 
 def save_detection_results(
@@ -208,4 +172,138 @@ def save_detection_results(
             cv2.imwrite(image_output_path, annotated_image)
             result_files["image"] = image_output_path
     
-    return result_files 
\ No newline at end of file
+    return result_files 
+
+def compute_region_stats(gray: np.ndarray, boxes: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    複数領域の輝度統計を積分画像でまとめて計算します
+    
+    領域の数や大きさに関わらず、各領域の平均と標準偏差はO(1)で求まります。
+    
+    Args:
+        gray: グレースケール画像 (uint8)
+        boxes: バウンディングボックスのリスト [{"x", "y", "width", "height"}]
+        
+    Returns:
+        Dict[str, np.ndarray]: 領域ごとの mean, std, width, height の配列
+    """
+    if not boxes:
+        empty = np.zeros(0, dtype=np.float64)
+        return {"mean": empty, "std": empty, "width": empty, "height": empty}
+    
+    # 積分画像（総和と二乗和）
+    integral, integral_sq = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    
+    coords = np.array([[b["x"], b["y"], b["x"] + b["width"], b["y"] + b["height"]] for b in boxes],
+                      dtype=np.int64)
+    x0, y0, x1, y1 = coords.T
+    area = ((x1 - x0) * (y1 - y0)).astype(np.float64)
+    
+    def box_sum(table):
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+    
+    mean = box_sum(integral) / area
+    variance = np.maximum(box_sum(integral_sq) / area - mean ** 2, 0.0)
+    
+    return {
+        "mean": mean,
+        "std": np.sqrt(variance),
+        "width": (x1 - x0).astype(np.float64),
+        "height": (y1 - y0).astype(np.float64)
+    }
+
+
+def plan_ocr_preprocessing(
+    gray: np.ndarray,
+    boxes: List[Dict],
+    min_text_height: int = 24,
+    max_scale: float = 4.0,
+    blank_std: float = 4.0,
+    otsu_std: float = 60.0
+) -> List[Dict]:
+    """
+    領域ごとのOCR前処理パラメータを統計量から決定します
+    
+    - 平均輝度が暗い領域（ダークテーマ）は反転して白地に黒文字にします
+    - 高さが小さい領域は拡大します
+    - コントラストが高い領域は大津の二値化、低い領域は適応的二値化を使います
+    - ほぼ一様な領域は文字がないものとしてOCRを省略します
+    
+    Args:
+        gray: グレースケール画像 (uint8)
+        boxes: バウンディングボックスのリスト
+        min_text_height: これより低い領域を拡大する高さ（ピクセル）
+        max_scale: 最大拡大率
+        blank_std: これ未満の標準偏差の領域を空白とみなす
+        otsu_std: これ以上の標準偏差の領域に大津の二値化を使う
+        
+    Returns:
+        List[Dict]: 領域ごとのパラメータ（skip, invert, scale, binarize）
+    """
+    stats = compute_region_stats(gray, boxes)
+    
+    skip = stats["std"] < blank_std
+    invert = stats["mean"] < 128
+    scale = np.clip(min_text_height / np.maximum(stats["height"], 1), 1.0, max_scale)
+    use_otsu = stats["std"] >= otsu_std
+    
+    return [
+        {
+            "skip": bool(skip[i]),
+            "invert": bool(invert[i]),
+            "scale": float(scale[i]),
+            "binarize": "otsu" if use_otsu[i] else "adaptive"
+        }
+        for i in range(len(boxes))
+    ]
+
+
+def apply_ocr_preprocessing(gray: np.ndarray, box: Dict, params: Dict) -> Optional[np.ndarray]:
+    """
+    1つの領域を切り出してOCR用の前処理を適用します
+    
+    Args:
+        gray: グレースケール画像 (uint8)
+        box: バウンディングボックス
+        params: plan_ocr_preprocessingで決定したパラメータ
+        
+    Returns:
+        Optional[np.ndarray]: 前処理済みの二値画像。空白領域の場合はNone
+    """
+    if params["skip"]:
+        return None
+    
+    crop = gray[box["y"]:box["y"] + box["height"], box["x"]:box["x"] + box["width"]]
+    
+    if params["invert"]:
+        crop = cv2.bitwise_not(crop)
+    
+    if params["scale"] > 1.0:
+        crop = cv2.resize(crop, None, fx=params["scale"], fy=params["scale"], interpolation=cv2.INTER_CUBIC)
+    
+    if params["binarize"] == "otsu":
+        _, binary = cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    else:
+        # ブロックサイズは奇数かつ領域の高さ程度にする
+        block = max(3, min(crop.shape[0], 31) | 1)
+        binary = cv2.adaptiveThreshold(crop, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                       cv2.THRESH_BINARY, block, 10)
+    
+    return binary
+
+
+def preprocess_regions(image: np.ndarray, boxes: List[Dict], **kwargs) -> List[Optional[np.ndarray]]:
+    """
+    複数領域にOCR用の前処理をまとめて適用します
+    
+    Args:
+        image: RGB画像またはグレースケール画像
+        boxes: バウンディングボックスのリスト
+        **kwargs: plan_ocr_preprocessingに渡す追加パラメータ
+        
+    Returns:
+        List[Optional[np.ndarray]]: 前処理済みの画像（空白領域はNone）
+    """
+    gray = cv2.cvtColor(np.ascontiguousarray(image[:, :, :3]), cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    plans = plan_ocr_preprocessing(gray, boxes, **kwargs)
+    return [apply_ocr_preprocessing(gray, box, params) for box, params in zip(boxes, plans)]
@@ -0,0 +1,187 @@
+"""
+画像の色統計・代表色・ヒストグラムを計算するモジュール
+
+画像全体をfloat64に変換せず、間引いたサンプルを行チャンク単位で整数の累積値に
+集計するため、ピークメモリは画像サイズに依存しません。
+
+誤差について:
+    - 画素数が max_samples 以下の場合は全画素を使い、結果は全画素での計算と
+      浮動小数点の丸め誤差の範囲で一致します（累積値は整数で厳密）。
+    - 画素数が max_samples を超える場合は縦横同じ間隔で間引きます。平均・明るさの
+      誤差は標準偏差をσ、サンプル数をnとしておおよそ σ/√n（既定の100万サンプルでは
+      最大でも約0.13階調）です。間引き間隔と同じ周期の模様を持つ画像では偏りが
+      生じる可能性があります。
+"""
+
+import math
+from typing import Dict, List, Any
+
+import numpy as np
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# 間引きを行う画素数のしきい値
+DEFAULT_MAX_SAMPLES = 1_000_000
+
+# 1チャンクあたりの画素数（一時配列のサイズの上限）
+DEFAULT_CHUNK_PIXELS = 256 * 1024
+
+
+def sample_stride(height: int, width: int, max_samples: int = DEFAULT_MAX_SAMPLES) -> int:
+    """
+    サンプル数がmax_samples以下になる間引き間隔を計算します
+
+    Args:
+        height (int): 画像の高さ
+        width (int): 画像の幅
+        max_samples (int): 最大サンプル数
+
+    Returns:
+        int: 縦横共通の間引き間隔（1の場合は間引きなし）
+    """
+    pixels = height * width
+    if not max_samples or pixels <= max_samples:
+        return 1
+    return int(math.ceil(math.sqrt(pixels / max_samples)))
+
+
+def compute_color_stats(rgb: np.ndarray, max_samples: int = DEFAULT_MAX_SAMPLES,
+                        chunk_pixels: int = DEFAULT_CHUNK_PIXELS) -> Dict[str, Any]:
+    """
+    平均色・明るさ・色のばらつきを計算します
+
+    Args:
+        rgb (np.ndarray): RGB（またはRGBA）形式のuint8画像配列
+        max_samples (int): 使用する最大サンプル数。超える場合は間引く
+        chunk_pixels (int): 1回に集計する画素数
+
+    Returns:
+        Dict[str, Any]: get_image_detailsのcolor_infoと同じフィールドと、サンプリング情報
+    """
+    height, width = rgb.shape[:2]
+    stride = sample_stride(height, width, max_samples)
+
+    # 間引きはビューで行い、コピーを作らない
+    view = rgb[::stride, ::stride, :3]
+    rows, cols = view.shape[:2]
+    chunk_rows = max(1, chunk_pixels // max(cols, 1))
+
+    sums = np.zeros(3, dtype=np.int64)
+    squares = np.zeros(3, dtype=np.int64)
+    for start in range(0, rows, chunk_rows):
+        chunk = view[start:start + chunk_rows].astype(np.uint32)
+        sums += chunk.sum(axis=(0, 1), dtype=np.int64)
+        squares += (chunk * chunk).sum(axis=(0, 1), dtype=np.int64)
+
+    count = rows * cols
+    if count == 0:
+        raise ValueError("空の画像の色統計は計算できません")
+
+    channel_mean = sums / count
+    brightness = float(sums.sum()) / (3 * count)
+    variance = max(float(squares.sum()) / (3 * count) - brightness ** 2, 0.0)
+    avg_color = channel_mean.astype(int)
+
+    return {
+        "avg_color_rgb": avg_color.tolist(),
+        "avg_color_hex": f"#{int(avg_color[0]):02x}{int(avg_color[1]):02x}{int(avg_color[2]):02x}",
+        "brightness": brightness,
+        "brightness_percent": brightness / 255 * 100,
+        "color_variance": math.sqrt(variance),
+        "sample_stride": stride,
+        "sampled_pixels": count
+    }
+
+
+# 代表色の抽出に使う縮小画像の長辺
+PALETTE_MAX_DIMENSION = 256
+
+
+def extract_dominant_colors(rgb: np.ndarray, top_k: int = 5, bits: int = 3) -> List[Dict[str, Any]]:
+    """
+    量子化した3次元ヒストグラムから代表色を抽出します
+
+    各チャンネルを上位bitsビットに量子化して色をビンに分け、画素数の多いビンから
+    順にビン内の平均色を代表色とします。縮小画像に対して使うことを想定しています。
+
+    Args:
+        rgb (np.ndarray): RGB（またはRGBA）形式のuint8画像配列
+        top_k (int): 抽出する代表色の数
+        bits (int): 1チャンネルあたりの量子化ビット数
+
+    Returns:
+        List[Dict[str, Any]]: 画素数の多い順の代表色（hex, rgb, ratio）のリスト
+    """
+    pixels = rgb[:, :, :3].reshape(-1, 3)
+    if len(pixels) == 0:
+        return []
+
+    shift = 8 - bits
+    quantized = (pixels >> shift).astype(np.int32)
+    index = (quantized[:, 0] << (2 * bits)) | (quantized[:, 1] << bits) | quantized[:, 2]
+
+    bin_count = 1 << (3 * bits)
+    counts = np.bincount(index, minlength=bin_count)
+    top = np.argsort(counts)[::-1][:top_k]
+    top = top[counts[top] > 0]
+
+    # ビン中心ではなく、ビンに含まれる画素の平均色を使う
+    channel_sums = np.stack([
+        np.bincount(index, weights=pixels[:, c], minlength=bin_count)[top]
+        for c in range(3)
+    ], axis=1)
+    colors = (channel_sums / counts[top][:, None]).astype(int)
+
+    total = float(len(pixels))
+    return [
+        {
+            "hex": f"#{r:02x}{g:02x}{b:02x}",
+            "rgb": [int(r), int(g), int(b)],
+            "ratio": float(counts[i]) / total
+        }
+        for (r, g, b), i in zip(colors, top)
+    ]
+
+
+def compute_channel_histograms(rgb: np.ndarray, bins: int = 32) -> Dict[str, List[int]]:
+    """
+    チャンネルごとのヒストグラムを計算します
+
+    Args:
+        rgb (np.ndarray): RGB（またはRGBA）形式のuint8画像配列
+        bins (int): ビンの数（256の約数）
+
+    Returns:
+        Dict[str, List[int]]: "r", "g", "b" ごとの画素数のリスト
+    """
+    width = 256 // bins
+    return {
+        name: np.bincount(rgb[:, :, c].ravel() // width, minlength=bins).tolist()
+        for c, name in enumerate(("r", "g", "b"))
+    }
+
+
+def classify_theme(dominant_colors: List[Dict[str, Any]]) -> str:
+    """
+    代表色の輝度から画面のテーマ（ダーク/ライト）を推定します
+
+    Args:
+        dominant_colors (List[Dict[str, Any]]): extract_dominant_colorsの結果
+
+    Returns:
+        str: "dark", "light", "mixed" のいずれか（代表色がない場合は "unknown"）
+    """
+    if not dominant_colors:
+        return "unknown"
+
+    # 画面の大部分を占める背景色の輝度で判定する
+    r, g, b = dominant_colors[0]["rgb"]
+    luminance = 0.299 * r + 0.587 * g + 0.114 * b
+    if luminance < 96:
+        return "dark"
+    if luminance > 160:
+        return "light"
+    return "mixed"
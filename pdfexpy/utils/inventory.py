@@ -0,0 +1,122 @@
+"""
+画像アーカイブの一覧（インベントリ）を作成するモジュール
+
+画像のヘッダーとstat情報のみを読み、画素をデコードせずに
+file_info・image_info を並列に取得してストリームとして返します。
+"""
+
+import os
+import json
+import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+from .logger import get_logger
+from .image_analysis import get_image_details, iter_image_files, IMAGE_EXTENSIONS
+
+logger = get_logger(__name__)
+
+
+def read_image_metadata(image_path: str) -> Dict[str, Any]:
+    """
+    画像1枚のメタデータをヘッダーのみから取得します
+
+    Args:
+        image_path (str): 画像ファイルのパス
+
+    Returns:
+        Dict[str, Any]: file_info と image_info。失敗した場合は file_info と error
+    """
+    try:
+        return get_image_details(image_path, metadata_only=True)
+    except Exception as e:
+        return {
+            "file_info": {
+                "filename": os.path.basename(image_path),
+                "filepath": os.path.abspath(image_path)
+            },
+            "error": str(e)
+        }
+
+
+def iter_image_metadata(paths: Union[str, Path, Iterable[str]], recursive: bool = True,
+                        extensions: Tuple[str, ...] = IMAGE_EXTENSIONS,
+                        max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    画像のメタデータを並列に読み込み、完了した順に返します
+
+    処理はI/O待ちが中心のため、スレッドで並列化します。未完了のタスク数は
+    max_workers の数倍に制限するため、大量のファイルでもメモリ使用量は一定です。
+
+    Args:
+        paths (Union[str, Path, Iterable[str]]): ディレクトリ、画像ファイル、またはパスのイテラブル
+        recursive (bool): サブディレクトリも探索するかどうか
+        extensions (Tuple[str, ...]): 対象とする拡張子（小文字）
+        max_workers (Optional[int]): スレッド数（Noneの場合はCPU数に応じて自動設定）
+
+    Yields:
+        Dict[str, Any]: read_image_metadata の結果
+    """
+    if isinstance(paths, (str, Path)):
+        paths = iter_image_files(paths, recursive, extensions) if os.path.isdir(paths) else [str(paths)]
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+    max_pending = max_workers * 4
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for path in paths:
+            pending.add(executor.submit(read_image_metadata, path))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def write_inventory(root: Union[str, Path], output_file: Union[str, Path], recursive: bool = True,
+                    max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    画像のメタデータを1行1レコードのJSON（NDJSON）として書き出します
+
+    Args:
+        root (Union[str, Path]): 探索するディレクトリ
+        output_file (Union[str, Path]): 出力ファイルのパス
+        recursive (bool): サブディレクトリも探索するかどうか
+        max_workers (Optional[int]): スレッド数
+
+    Returns:
+        Dict[str, Any]: 処理結果（件数・エラー数・出力ファイル）
+    """
+    if not os.path.isdir(root):
+        return {"success": False, "error": f"指定されたディレクトリが存在しません: {root}"}
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    start = datetime.datetime.now()
+    count = 0
+    errors = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        for record in iter_image_metadata(root, recursive=recursive, max_workers=max_workers):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+            if "error" in record:
+                errors += 1
+
+    elapsed = (datetime.datetime.now() - start).total_seconds()
+    logger.info(f"インベントリを作成しました: {count}件 (エラー {errors}件, {elapsed:.2f}秒): {output_file}")
+
+    return {
+        "success": True,
+        "count": count,
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "output_file": str(output_file)
+    }
@@ -0,0 +1,373 @@
+"""
+解析済みの入力を記録するマニフェストのモジュール
+
+入力画像ごとにパス・サイズ・更新日時・内容のハッシュと、解析に使ったモデルと
+設定のハッシュをSQLiteに記録します。一括解析やディレクトリ監視の前に照合すると、
+新しい画像・内容が変わった画像・モデルや設定が変わった後の画像のみを解析できます。
+サイズと更新日時が一致する場合はファイルを読まずに判定します。
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+from .logger import get_logger
+from .config import DEFAULT_CONFIG
+from .metrics import get_metrics
+
+logger = get_logger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    result_file TEXT,
+    analyzed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_fingerprint ON entries(model_version, config_hash);
+"""
+
+# 解析結果に影響する設定のキー（ドット区切り）。キャッシュの大きさ・ワーカー数・スレッド数の上限など
+# これ以外の変更では再解析しない（YOLOモデルの違いは model_identity で判定する）
+CONFIG_KEYS = (
+    "models.tesseract.enabled",
+    "models.tesseract.language",
+    "ocr.enabled",
+    "ocr.backend",
+    "ocr.config",
+    "ocr.min_confidence",
+    "ocr.padding",
+    "ocr.preprocess",
+    "ocr.region_proposal",
+    "ocr.text_labels",
+    "analysis.visual_format",
+)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ManifestError(Exception):
+    """マニフェストに関するエラー"""
+    pass
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """
+    ファイルの内容のハッシュを計算します
+
+    Args:
+        path (Union[str, Path]): ファイルのパス
+
+    Returns:
+        str: BLAKE2bのハッシュ（16進数）
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _config_value(config: Dict[str, Any], key: str) -> Any:
+    """
+    ドット区切りのキーの設定値を取得します
+
+    Args:
+        config (Dict[str, Any]): アプリケーション設定
+        key (str): ドット区切りのキー（例: ocr.min_confidence）
+
+    Returns:
+        Any: 設定値（見つからない場合はNone）
+    """
+    value = config
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def hash_config(config: Optional[Dict[str, Any]], keys: Iterable[str] = CONFIG_KEYS) -> str:
+    """
+    解析結果に影響する設定のハッシュを計算します
+
+    設定にないキーはデフォルト設定の値を使うため、省略した設定とデフォルト値を
+    明示した設定は同じハッシュになります。
+
+    Args:
+        config (Optional[Dict[str, Any]]): アプリケーション設定（Noneの場合はデフォルト設定）
+        keys (Iterable[str]): ハッシュに含める設定のキー（ドット区切り）
+
+    Returns:
+        str: 設定のハッシュ（16進数）
+    """
+    config = config or DEFAULT_CONFIG
+    relevant = {}
+    for key in keys:
+        value = _config_value(config, key)
+        relevant[key] = value if value is not None else _config_value(DEFAULT_CONFIG, key)
+    encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def model_identity(mock: bool, model_path: Optional[str] = None) -> str:
+    """
+    解析に使うモデルを識別する文字列を作成します
+
+    モデルファイルが存在する場合はサイズと更新日時を含めるため、同じ名前で
+    重みを差し替えた場合も別のモデルとして扱います。
+
+    Args:
+        mock (bool): モックデータを使用するかどうか
+        model_path (Optional[str]): モデルのパス（Noneの場合はデフォルトモデル）
+
+    Returns:
+        str: モデルの識別子
+    """
+    if mock:
+        return "mock"
+
+    model_path = model_path or "yolov8n.pt"
+    try:
+        stat = os.stat(model_path)
+    except OSError:
+        return os.path.basename(model_path)
+    return f"{os.path.basename(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class AnalysisManifest:
+    """解析済みの入力を記録し、再解析が必要かを判定するクラス"""
+
+    def __init__(self, database: Union[str, Path], model_version: str = "mock",
+                 config_hash: Optional[str] = None):
+        """
+        マニフェストを初期化します（データベースとテーブルがなければ作成します）
+
+        Args:
+            database (Union[str, Path]): データベースファイルのパス（":memory:" も可）
+            model_version (str): 現在のモデルの識別子（model_identity で作成）
+            config_hash (Optional[str]): 現在の設定のハッシュ（Noneの場合はデフォルト設定のハッシュ）
+        """
+        self.database = str(database)
+        self.model_version = model_version
+        self.config_hash = config_hash or hash_config(None)
+        self.skipped = 0
+        self._lock = threading.Lock()
+        # 照合時に計算したハッシュを記録時に再利用する（パス -> (サイズ, 更新日時, ハッシュ)）
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+
+        if self.database != ":memory:":
+            Path(self.database).parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            self._conn = sqlite3.connect(self.database, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            raise ManifestError(f"マニフェストを開けません: {self.database}: {e}")
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> str:
+        """
+        マニフェストのキーとする絶対パスを取得します
+
+        Args:
+            path (Union[str, Path]): ファイルのパス
+
+        Returns:
+            str: 絶対パス
+        """
+        return os.path.abspath(str(path))
+
+    def _hash_for(self, key: str, size: int, mtime_ns: int) -> str:
+        """
+        ファイルのハッシュを取得します（照合時に計算済みで、ファイルが変わっていなければ再利用します）
+
+        Args:
+            key (str): ファイルの絶対パス
+            size (int): ファイルサイズ
+            mtime_ns (int): 更新日時（ナノ秒）
+
+        Returns:
+            str: ファイルの内容のハッシュ
+        """
+        cached = self._hashes.pop(key, None)
+        if cached is not None and cached[:2] == (size, mtime_ns):
+            return cached[2]
+        return hash_file(key)
+
+    def needs_analysis(self, path: Union[str, Path]) -> bool:
+        """
+        画像の解析が必要かを判定します
+
+        記録がない場合、モデルまたは設定が変わった場合、内容が変わった場合に解析が必要です。
+        サイズと更新日時だけが変わり内容が同じ場合は、記録を更新して解析不要とします。
+
+        Args:
+            path (Union[str, Path]): 画像ファイルのパス
+
+        Returns:
+            bool: 解析が必要な場合はTrue
+        """
+        key = self._key(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return True
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, content_hash, model_version, config_hash FROM entries WHERE path = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return True
+
+        size, mtime_ns, content_hash, row_model, row_config = row
+        if row_model != self.model_version or row_config != self.config_hash:
+            return True
+        if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+            return False
+        if size != stat.st_size:
+            return True
+
+        # 更新日時のみが変わった場合は内容を比較する
+        current = hash_file(key)
+        if current != content_hash:
+            self._hashes[key] = (stat.st_size, stat.st_mtime_ns, current)
+            return True
+
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE entries SET mtime_ns = ? WHERE path = ?", (stat.st_mtime_ns, key))
+        return False
+
+    def filter_paths(self, paths: Iterable[Union[str, Path]]) -> Iterator[str]:
+        """
+        解析が必要な画像のパスのみを返します（スキップした件数は skipped に加算します）
+
+        Args:
+            paths (Iterable[Union[str, Path]]): 画像ファイルのパス
+
+        Yields:
+            str: 解析が必要な画像ファイルのパス
+        """
+        for path in paths:
+            if self.needs_analysis(path):
+                yield str(path)
+            else:
+                self.skipped += 1
+                get_metrics().inc("pdfexpy_frames_skipped_total", reason="analyzed")
+                logger.debug(f"解析済みのためスキップします: {path}")
+
+    def record(self, path: Union[str, Path], result_file: Optional[str] = None):
+        """
+        画像を解析済みとして記録します
+
+        Args:
+            path (Union[str, Path]): 画像ファイルのパス
+            result_file (Optional[str]): 解析結果の出力先
+
+        Raises:
+            ManifestError: 記録に失敗した場合
+        """
+        key = self._key(path)
+        try:
+            stat = os.stat(key)
+            content_hash = self._hash_for(key, stat.st_size, stat.st_mtime_ns)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(path, size, mtime_ns, content_hash, model_version, config_hash, result_file, analyzed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns, content_hash, self.model_version,
+                     self.config_hash, result_file, datetime.datetime.now().isoformat())
+                )
+        except (OSError, sqlite3.Error) as e:
+            raise ManifestError(f"マニフェストへの記録に失敗しました: {path}: {e}")
+
+    def record_result(self, result: Dict[str, Any]):
+        """
+        解析に成功した結果を記録します（失敗した結果は記録せず、次回も解析対象とします）
+
+        Args:
+            result (Dict[str, Any]): image_path・success・result_file を含む解析結果
+        """
+        if not result.get("success") or not result.get("image_path"):
+            return
+        try:
+            self.record(result["image_path"], result.get("result_file"))
+        except ManifestError as e:
+            logger.warning(str(e))
+
+    def forget(self, path: Union[str, Path]):
+        """
+        画像の記録を削除します（次回は解析対象になります）
+
+        Args:
+            path (Union[str, Path]): 画像ファイルのパス
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE path = ?", (self._key(path),))
+
+    def stale_count(self) -> int:
+        """
+        現在のモデルまたは設定と異なる条件で解析された記録の数を取得します
+
+        Returns:
+            int: 再解析の対象となる記録の数
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE model_version != ? OR config_hash != ?",
+                (self.model_version, self.config_hash)
+            ).fetchone()[0]
+
+    def close(self):
+        """
+        データベースを閉じます
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_manifest(config: Optional[Dict[str, Any]], output_dir: Union[str, Path], mock: bool = True,
+                  model_path: Optional[str] = None, force: bool = False) -> Optional[AnalysisManifest]:
+    """
+    設定に応じてマニフェストを開きます
+
+    Args:
+        config (Optional[Dict[str, Any]]): アプリケーション設定（manifest セクションを参照）
+        output_dir (Union[str, Path]): 出力ディレクトリ（データベースの既定の保存先）
+        mock (bool): モックデータを使用するかどうか
+        model_path (Optional[str]): 使用するモデルのパス
+        force (bool): 設定に関わらずマニフェストを使用するかどうか
+
+    Returns:
+        Optional[AnalysisManifest]: マニフェスト（使用しない場合はNone）
+    """
+    manifest_config = {**DEFAULT_CONFIG["manifest"], **(config or {}).get("manifest", {})}
+    if not (force or manifest_config.get("enabled")):
+        return None
+
+    return AnalysisManifest(
+        manifest_config.get("database") or Path(output_dir) / "manifest.sqlite3",
+        model_version=model_identity(mock, model_path),
+        config_hash=hash_config(config, manifest_config.get("config_keys") or CONFIG_KEYS)
+    )
@@ -0,0 +1,437 @@
+"""
+解析の状態を Prometheus のテキスト形式で公開するモジュール
+
+撮影・解析・スキップした画像の数やモデルのロード状態などのカウンタ・ゲージを保持し、
+取得時にステージごとの処理時間のヒストグラム（PerfStats）、パイプラインのキューの深さ、
+キャッシュのヒット率、常駐メモリを集めて、ローカルの HTTP エンドポイント（/metrics）で返します。
+"""
+
+import math
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .logger import get_logger
+from .perf import LATENCY_BUCKETS_MS, get_perf_stats
+
+logger = get_logger(__name__)
+
+
+# 公開するメトリクス（名前: (種類, 説明)）
+METRICS = {
+    "pdfexpy_frames_captured_total": ("counter", "撮影したスクリーンショットの数"),
+    "pdfexpy_frames_analyzed_total": ("counter", "解析した画像の数（result: success / error）"),
+    "pdfexpy_frames_skipped_total": ("counter", "解析をスキップした画像の数"),
+    "pdfexpy_stage_duration_seconds": ("histogram", "ステージごとの処理時間"),
+    "pdfexpy_pipeline_queue_depth": ("gauge", "パイプラインの各ステージの入力キューにある項目の数"),
+    "pdfexpy_pipeline_queue_size": ("gauge", "パイプラインの各ステージの入力キューの上限"),
+    "pdfexpy_pipeline_stage_utilization": ("gauge", "パイプラインの各ステージのワーカーの稼働率 (0-1)"),
+    "pdfexpy_model_loaded": ("gauge", "モデルがロード済みかどうか (1 / 0)"),
+    "pdfexpy_model_load_seconds": ("gauge", "モデルのロードにかかった時間"),
+    "pdfexpy_cache_hits_total": ("counter", "キャッシュのヒット数"),
+    "pdfexpy_cache_misses_total": ("counter", "キャッシュのミス数"),
+    "pdfexpy_cache_hit_ratio": ("gauge", "キャッシュのヒット率 (0-1)"),
+    "pdfexpy_process_resident_memory_bytes": ("gauge", "プロセスの常駐メモリ"),
+    "pdfexpy_process_start_time_seconds": ("gauge", "プロセスの開始時刻（UNIX時間）"),
+}
+
+# Prometheus のテキスト形式の Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ヒストグラムの系列名の接尾辞
+HISTOGRAM_SUFFIXES = ("_bucket", "_sum", "_count")
+
+# 取得時に値を集める関数の戻り値（系列名, ラベル, 値）
+Sample = Tuple[str, Dict[str, str], float]
+
+# プロセス内のレジストリ
+_registry = None
+_registry_lock = threading.Lock()
+
+
+class MetricsError(Exception):
+    """メトリクスに関するエラー"""
+    pass
+
+
+def _labels_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+    return f"{name}{{{label_text}}} {_format_value(value)}"
+
+
+def _family(name: str) -> Optional[str]:
+    """
+    系列名からメトリクス名を取得します（ヒストグラムの _bucket などの接尾辞を除きます）
+
+    Args:
+        name (str): 系列名
+
+    Returns:
+        Optional[str]: METRICS に登録されたメトリクス名（なければNone）
+    """
+    if name in METRICS:
+        return name
+    for suffix in HISTOGRAM_SUFFIXES:
+        if name.endswith(suffix) and METRICS.get(name[:-len(suffix)], ("",))[0] == "histogram":
+            return name[:-len(suffix)]
+    return None
+
+
+class MetricsRegistry:
+    """カウンタ・ゲージの値と、取得時に値を集める関数を保持するクラス"""
+
+    def __init__(self):
+        """
+        レジストリを初期化します
+        """
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def _check(self, name: str, kinds: Tuple[str, ...]):
+        kind = METRICS.get(name, (None,))[0]
+        if kind not in kinds:
+            raise MetricsError(f"未登録または種類の異なるメトリクスです: {name}")
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """
+        カウンタを加算します
+
+        Args:
+            name (str): メトリクス名
+            value (float): 加算する値
+            **labels: ラベル
+
+        Raises:
+            MetricsError: 未登録のカウンタの場合
+        """
+        self._check(name, ("counter",))
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """
+        ゲージに値を設定します
+
+        Args:
+            name (str): メトリクス名
+            value (float): 値
+            **labels: ラベル
+
+        Raises:
+            MetricsError: 未登録のゲージの場合
+        """
+        self._check(name, ("gauge",))
+        with self._lock:
+            self._values.setdefault(name, {})[_labels_key(labels)] = float(value)
+
+    def get(self, name: str, **labels) -> float:
+        """
+        カウンタ・ゲージの現在の値を取得します
+
+        Args:
+            name (str): メトリクス名
+            **labels: ラベル
+
+        Returns:
+            float: 値（未設定の場合は0）
+        """
+        with self._lock:
+            return self._values.get(name, {}).get(_labels_key(labels), 0.0)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """
+        取得時に値を集める関数を登録します
+
+        Args:
+            collector (Callable[[], Iterable[Sample]]): (系列名, ラベル, 値) を返す関数
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], Iterable[Sample]]):
+        """
+        登録した関数を解除します
+
+        Args:
+            collector (Callable[[], Iterable[Sample]]): add_collector で登録した関数
+        """
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def collect(self) -> Iterator[Sample]:
+        """
+        全ての系列の現在の値を取得します
+
+        Yields:
+            Sample: (系列名, ラベル, 値)
+        """
+        with self._lock:
+            values = {name: dict(series) for name, series in self._values.items()}
+            collectors = list(self._collectors)
+
+        for name, series in values.items():
+            for key, value in series.items():
+                yield name, dict(key), value
+
+        for collector in list(DEFAULT_COLLECTORS) + collectors:
+            try:
+                yield from list(collector())
+            except Exception as e:
+                logger.warning(f"メトリクスの取得中にエラーが発生しました: {collector.__name__}: {str(e)}")
+
+    def render(self) -> str:
+        """
+        Prometheus のテキスト形式の文字列を作成します
+
+        Returns:
+            str: HELP・TYPE 行と系列の値
+        """
+        families: Dict[str, List[str]] = {}
+        for name, labels, value in self.collect():
+            family = _family(name)
+            if family is None:
+                logger.debug(f"未登録のメトリクスを無視します: {name}")
+                continue
+            families.setdefault(family, []).append(_format_sample(name, labels, value))
+
+        lines = []
+        for family, (kind, description) in METRICS.items():
+            if family not in families:
+                continue
+            lines.append(f"# HELP {family} {description}")
+            lines.append(f"# TYPE {family} {kind}")
+            lines.extend(families[family])
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    プロセス内で共有するレジストリを取得します
+
+    Returns:
+        MetricsRegistry: 共有のレジストリ
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+            _registry.set("pdfexpy_process_start_time_seconds", time.time())
+        return _registry
+
+
+def collect_stage_histograms() -> Iterator[Sample]:
+    """
+    PerfStats からステージごとの処理時間のヒストグラムを取得します
+
+    Yields:
+        Sample: pdfexpy_stage_duration_seconds の _bucket・_sum・_count
+    """
+    name = "pdfexpy_stage_duration_seconds"
+    for stage, histogram in get_perf_stats().histograms().items():
+        for bound, count in zip(LATENCY_BUCKETS_MS, histogram["buckets"]):
+            yield f"{name}_bucket", {"stage": stage, "le": f"{bound / 1000:g}"}, count
+        yield f"{name}_bucket", {"stage": stage, "le": "+Inf"}, histogram["count"]
+        yield f"{name}_sum", {"stage": stage}, histogram["sum"] / 1000
+        yield f"{name}_count", {"stage": stage}, histogram["count"]
+
+
+def collect_cache_stats() -> Iterator[Sample]:
+    """
+    OCRキャッシュと描画のテキストサイズのキャッシュのヒット・ミス数を取得します
+
+    Yields:
+        Sample: pdfexpy_cache_* の系列
+    """
+    from .ocr_cache import get_shared_cache_stats
+
+    caches = {}
+    ocr = get_shared_cache_stats()
+    if ocr is not None:
+        caches["ocr"] = (ocr["hits"] + ocr["disk_hits"], ocr["misses"])
+
+    try:
+        from .annotation_renderer import cv2_text_size, pil_text_width
+    except ImportError:
+        pass
+    else:
+        for cache_name, func in (("cv2_text_size", cv2_text_size), ("pil_text_width", pil_text_width)):
+            info = func.cache_info()
+            caches[cache_name] = (info.hits, info.misses)
+
+    for cache_name, (hits, misses) in caches.items():
+        labels = {"cache": cache_name}
+        yield "pdfexpy_cache_hits_total", labels, hits
+        yield "pdfexpy_cache_misses_total", labels, misses
+        yield "pdfexpy_cache_hit_ratio", labels, hits / (hits + misses) if hits + misses else 0.0
+
+
+def collect_process_memory() -> Iterator[Sample]:
+    """
+    プロセスの常駐メモリを取得します
+
+    Yields:
+        Sample: pdfexpy_process_resident_memory_bytes（取得できない場合は何も返しません）
+    """
+    from ..models.model_loader import get_process_memory
+
+    memory = get_process_memory()
+    if memory:
+        yield "pdfexpy_process_resident_memory_bytes", {}, memory
+
+
+def pipeline_collector(stats: Callable[[], Dict[str, Any]]) -> Callable[[], Iterator[Sample]]:
+    """
+    パイプラインの統計からキューの深さと稼働率を取得する関数を作成します
+
+    Args:
+        stats (Callable[[], Dict[str, Any]]): Pipeline.stats のように統計を返す関数
+
+    Returns:
+        Callable[[], Iterator[Sample]]: add_collector に登録する関数
+    """
+    def collect_pipeline() -> Iterator[Sample]:
+        for stage, stage_stats in stats()["stages"].items():
+            labels = {"stage": stage}
+            yield "pdfexpy_pipeline_queue_depth", labels, stage_stats["queue_depth"]
+            yield "pdfexpy_pipeline_queue_size", labels, stage_stats["queue_size"]
+            yield "pdfexpy_pipeline_stage_utilization", labels, stage_stats["utilization"]
+
+    return collect_pipeline
+
+
+# 全てのレジストリで取得時に呼び出す関数
+DEFAULT_COLLECTORS = (collect_stage_histograms, collect_cache_stats, collect_process_memory)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """/metrics へのリクエストにレジストリの値を返すハンドラ"""
+
+    registry: MetricsRegistry = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"メトリクスのリクエスト: {self.address_string()} {format % args}")
+
+
+class MetricsServer:
+    """メトリクスをバックグラウンドのスレッドで HTTP 公開するクラス"""
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1", registry: Optional[MetricsRegistry] = None):
+        """
+        サーバーを初期化します
+
+        Args:
+            port (int): ポート番号（0の場合は空いているポート）
+            host (str): 待ち受けるアドレス（デフォルトはローカルのみ）
+            registry (Optional[MetricsRegistry]): 公開するレジストリ（Noneの場合は共有のレジストリ）
+        """
+        self.host = host
+        self.port = port
+        self.registry = registry or get_metrics()
+        self._server = None
+        self._thread = None
+
+    def start(self) -> int:
+        """
+        サーバーを起動します
+
+        Returns:
+            int: 待ち受けているポート番号
+
+        Raises:
+            MetricsError: 起動できなかった場合
+        """
+        if self._server is not None:
+            return self.port
+
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            raise MetricsError(f"メトリクスのサーバーを起動できません ({self.host}:{self.port}): {str(e)}")
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="pdfexpy-metrics", daemon=True)
+        self._thread.start()
+        logger.info(f"メトリクスを公開しています: http://{self.host}:{self.port}/metrics")
+        return self.port
+
+    def stop(self):
+        """
+        サーバーを停止します
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def start_metrics_server(config: Optional[Dict[str, Any]] = None,
+                         port: Optional[int] = None) -> Optional[MetricsServer]:
+    """
+    設定の metrics セクションに従ってメトリクスのサーバーを起動します
+
+    Args:
+        config (Optional[Dict[str, Any]]): 設定
+        port (Optional[int]): ポート番号（指定した場合は設定に関わらず起動します）
+
+    Returns:
+        Optional[MetricsServer]: 起動したサーバー（無効化されている場合、または起動できない場合はNone）
+    """
+    settings = (config or {}).get("metrics", {})
+    if port is None and not settings.get("enabled", False):
+        return None
+
+    server = MetricsServer(port=port if port is not None else settings.get("port", 9464),
+                           host=settings.get("host", "127.0.0.1"))
+    try:
+        server.start()
+    except MetricsError as e:
+        logger.error(str(e))
+        return None
+    return server
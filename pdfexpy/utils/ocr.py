@@ -0,0 +1,270 @@
+"""
+OCR（文字認識）機能を提供するモジュール
+
+検出されたテキストらしい領域のみを切り出し、常駐エンジンのプールで並列にOCRを実行します。
+"""
+
+from typing import Dict, List, Any, Optional, Union
+
+# 画像処理
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# 数値計算
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# OCR前処理（OpenCVが必要）
+try:
+    import cv2
+    from .image_processing import plan_ocr_preprocessing, apply_ocr_preprocessing
+    PREPROCESS_AVAILABLE = True
+except ImportError:
+    PREPROCESS_AVAILABLE = False
+
+from .logger import get_logger
+from .ocr_cache import OCRCache
+from ..models.ocr_engine import get_engine_pool, OCREngineError, TESSERACT_AVAILABLE
+
+logger = get_logger(__name__)
+
+
+# テキストを含むとみなす検出ラベル
+TEXT_LIKE_LABELS = {"text", "title", "label", "button", "menu", "tab"}
+
+
+class OCRError(Exception):
+    """OCR処理時のエラーを表すカスタム例外"""
+    pass
+
+
+def load_rgb_array(image: Union[str, "np.ndarray"]) -> "np.ndarray":
+    """
+    画像パスまたは配列からRGBのNumPy配列を取得します
+
+    Args:
+        image (Union[str, np.ndarray]): 画像パスまたはRGB配列
+
+    Returns:
+        np.ndarray: RGB形式の画像配列
+    """
+    if isinstance(image, np.ndarray):
+        return image
+
+    with Image.open(image) as img:
+        return np.array(img.convert("RGB"))
+
+
+def select_text_regions(objects: List[Dict], text_labels: Optional[List[str]] = None) -> List[Dict]:
+    """
+    検出オブジェクトからテキストらしい領域のバウンディングボックスを抽出します
+
+    Args:
+        objects (List[Dict]): 検出オブジェクトのリスト
+        text_labels (Optional[List[str]]): テキストとみなすラベル。Noneの場合は既定値
+
+    Returns:
+        List[Dict]: バウンディングボックスのリスト
+    """
+    labels = set(text_labels) if text_labels is not None else TEXT_LIKE_LABELS
+    return [dict(obj["bbox"]) for obj in objects if obj.get("label") in labels]
+
+
+def find_text_bands(rgb: "np.ndarray", min_height: int = 6, max_height: int = 256,
+                    gap: int = 4) -> List[Dict]:
+    """
+    行ごとの輝度変化から、文字を含む可能性のある横帯領域を抽出します
+
+    空白行で区切るため、文字列が帯の境界で分断されることはありません。
+
+    Args:
+        rgb (np.ndarray): RGB形式の画像配列
+        min_height (int): 採用する帯の最小の高さ（ピクセル）
+        max_height (int): 結合後の帯の最大の高さ（ピクセル）
+        gap (int): 同じ帯とみなす空白行の最大数
+
+    Returns:
+        List[Dict]: バウンディングボックスのリスト
+    """
+    height, width = rgb.shape[:2]
+    gray = rgb[:, :, :3].mean(axis=2, dtype=np.float32) if rgb.ndim == 3 else rgb.astype(np.float32)
+
+    # 横方向の輝度差が大きい行を「インクのある行」とみなす
+    row_activity = np.abs(np.diff(gray, axis=1)).max(axis=1) > 32
+
+    bands = []
+    start = None
+    blank = 0
+    for y, active in enumerate(row_activity):
+        if active:
+            if start is None:
+                start = y
+            blank = 0
+        elif start is not None:
+            blank += 1
+            if blank > gap or y - start >= max_height:
+                bands.append((start, y - blank + 1))
+                start = None
+                blank = 0
+    if start is not None:
+        bands.append((start, height))
+
+    regions = []
+    for y0, y1 in bands:
+        if y1 - y0 < min_height:
+            continue
+
+        # 帯の中で文字のある列の範囲に絞り込む
+        col_activity = np.abs(np.diff(gray[y0:y1], axis=1)).max(axis=0) > 32
+        columns = np.flatnonzero(col_activity)
+        if columns.size == 0:
+            continue
+        x0, x1 = int(columns[0]), min(width, int(columns[-1]) + 2)
+
+        regions.append({"x": x0, "y": int(y0), "width": x1 - x0, "height": int(y1 - y0)})
+
+    return regions
+
+
+def _clip_bbox(bbox: Dict, width: int, height: int, padding: int = 0) -> Optional[Dict]:
+    """
+    バウンディングボックスを画像範囲内に収めます
+
+    Args:
+        bbox (Dict): バウンディングボックス
+        width (int): 画像の幅
+        height (int): 画像の高さ
+        padding (int): 周囲に追加する余白（ピクセル）
+
+    Returns:
+        Optional[Dict]: 収めたバウンディングボックス。面積が0の場合はNone
+    """
+    x0 = max(0, int(bbox["x"]) - padding)
+    y0 = max(0, int(bbox["y"]) - padding)
+    x1 = min(width, int(bbox["x"]) + int(bbox["width"]) + padding)
+    y1 = min(height, int(bbox["y"]) + int(bbox["height"]) + padding)
+
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return {"x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0}
+
+
+def extract_text(image: Union[str, "np.ndarray"], regions: Optional[List[Dict]] = None,
+                 language: str = "jpn+eng", config: str = "--psm 6",
+                 max_workers: Optional[int] = None, min_confidence: float = 0.0,
+                 padding: int = 2, thread_limit: int = 1, backend: str = "auto",
+                 cache: Optional[OCRCache] = None, preprocess: bool = True) -> Dict[str, Any]:
+    """
+    指定された領域のテキストを並列に抽出します
+
+    領域は大きいものから順にエンジンプールへ投入されるため、全体の処理時間は
+    おおよそ最大の領域の処理時間に近くなります。
+
+    Args:
+        image (Union[str, np.ndarray]): 画像パスまたはRGB配列
+        regions (Optional[List[Dict]]): OCR対象のバウンディングボックス。Noneの場合は横帯領域を自動抽出
+        language (str): Tesseractの言語設定
+        config (str): Tesseractの追加設定
+        max_workers (Optional[int]): 並列ワーカー数。Noneの場合はCPUコア数
+        min_confidence (float): 採用する最低信頼度 (0.0-1.0)
+        padding (int): 切り出し時に追加する余白（ピクセル）
+        thread_limit (int): ワーカーごとのTesseractスレッド数の上限
+        backend (str): OCRバックエンド（'auto'、'tesserocr'、'pytesseract'）
+        cache (Optional[OCRCache]): OCR結果のキャッシュ。Noneの場合はキャッシュしない
+        preprocess (bool): 反転・拡大・二値化の前処理を行うかどうか（OpenCVが必要）
+
+    Returns:
+        Dict[str, Any]: OCR結果（detected, text, confidence, regions）
+
+    Raises:
+        OCRError: OCRの実行に失敗した場合
+    """
+    if not TESSERACT_AVAILABLE:
+        raise OCRError("tesserocrまたはpytesseractがインストールされていません。'pip install tesserocr' を実行してください。")
+    if not (PIL_AVAILABLE and NUMPY_AVAILABLE):
+        raise OCRError("OCRにはPillowとNumPyが必要です")
+
+    try:
+        rgb = load_rgb_array(image)
+        height, width = rgb.shape[:2]
+
+        if regions is None:
+            regions = find_text_bands(rgb)
+
+        boxes = [b for b in (_clip_bbox(r, width, height, padding) for r in regions) if b is not None]
+
+        # 大きい領域から投入して、最後に大きな領域が残らないようにする
+        order = sorted(range(len(boxes)), key=lambda i: boxes[i]["width"] * boxes[i]["height"], reverse=True)
+
+        # 領域ごとの前処理パラメータを統計量からまとめて決定する
+        preprocess = preprocess and PREPROCESS_AVAILABLE
+        if preprocess:
+            gray = cv2.cvtColor(np.ascontiguousarray(rgb[:, :, :3]), cv2.COLOR_RGB2GRAY) if rgb.ndim == 3 else rgb
+            plans = plan_ocr_preprocessing(gray, boxes)
+
+        results = [None] * len(boxes)
+        futures = {}
+        keys = {}
+        pool = None
+        for i in order:
+            b = boxes[i]
+            crop = np.ascontiguousarray(rgb[b["y"]:b["y"] + b["height"], b["x"]:b["x"] + b["width"]])
+
+            # 文字のない一様な領域はOCRしない
+            if preprocess and plans[i]["skip"]:
+                results[i] = {"text": "", "confidence": 0.0}
+                continue
+
+            # 同じピクセルの領域は以前の結果を使う
+            if cache is not None:
+                keys[i] = cache.make_key(crop, language, f"{config}|preprocess" if preprocess else config)
+                cached = cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+
+            # キャッシュで全て賄える場合はエンジンプールを起動しない
+            if pool is None:
+                pool = get_engine_pool(language, config, max_workers, thread_limit, backend)
+            if preprocess:
+                crop = apply_ocr_preprocessing(gray, b, plans[i])
+            futures[i] = pool.submit(crop)
+
+        for i, future in futures.items():
+            results[i] = future.result()
+            if cache is not None:
+                cache.put(keys[i], results[i])
+
+        ocr_regions = []
+        for bbox, result in zip(boxes, results):
+            if not result["text"] or result["confidence"] < min_confidence:
+                continue
+            ocr_regions.append({
+                "text": result["text"],
+                "bbox": bbox,
+                "confidence": result["confidence"]
+            })
+
+        # 読み順（上から下、左から右）に並べる
+        ocr_regions.sort(key=lambda r: (r["bbox"]["y"], r["bbox"]["x"]))
+
+        return {
+            "detected": bool(ocr_regions),
+            "text": "\n".join(r["text"] for r in ocr_regions),
+            "confidence": (sum(r["confidence"] for r in ocr_regions) / len(ocr_regions)) if ocr_regions else 0.0,
+            "regions": ocr_regions
+        }
+
+    except OCRError:
+        raise
+    except OCREngineError as e:
+        raise OCRError(str(e))
+    except Exception as e:
+        logger.error(f"OCR処理中にエラーが発生しました: {e}")
+        raise OCRError(f"OCR処理に失敗しました: {str(e)}")
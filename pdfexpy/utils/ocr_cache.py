@@ -0,0 +1,224 @@
+"""
+OCR結果のキャッシュを提供するモジュール
+
+切り出した領域のピクセルのハッシュと、言語・PSM設定をキーにOCR結果を保持します。
+メニューやタイトルバーなど繰り返し現れるUIテキストは、Tesseractを実行せずに返されます。
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# 1エントリあたりの管理用オーバーヘッドの概算（バイト）
+ENTRY_OVERHEAD_BYTES = 256
+
+# 設定ごとの共有キャッシュ
+_shared_cache = None
+_shared_cache_settings = None
+_shared_cache_lock = threading.Lock()
+
+
+class OCRCache:
+    """メモリ上限付きのLRUキャッシュ（任意でディスクへ退避）"""
+
+    def __init__(self, max_entries: int = 4096, max_memory_mb: float = 16,
+                 disk_dir: Optional[str] = None):
+        """
+        キャッシュを初期化します
+
+        Args:
+            max_entries (int): メモリ上に保持する最大エントリ数
+            max_memory_mb (float): メモリ上に保持する結果の合計サイズの上限 (MB)
+            disk_dir (Optional[str]): 追い出したエントリを保存するディレクトリ。Noneの場合は破棄
+        """
+        self.max_entries = max_entries
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(crop, language: str, config: str) -> str:
+        """
+        切り出し領域のピクセルと設定からキャッシュキーを生成します
+
+        Args:
+            crop (np.ndarray): 切り出した画像配列
+            language (str): Tesseractの言語設定
+            config (str): Tesseractの追加設定（PSMなど）
+
+        Returns:
+            str: キャッシュキー（16進文字列）
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{crop.shape}|{crop.dtype}|{language}|{config}".encode("utf-8"))
+        digest.update(memoryview(crop).cast("B") if crop.flags.c_contiguous else crop.tobytes())
+        return digest.hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        """
+        ディスク上のエントリのパスを取得します
+
+        Args:
+            key (str): キャッシュキー
+
+        Returns:
+            Path: エントリのファイルパス
+        """
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュから結果を取得します
+
+        Args:
+            key (str): キャッシュキー
+
+        Returns:
+            Optional[Dict[str, Any]]: OCR結果。見つからない場合はNone
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if path.exists():
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        value = json.load(f)
+                    self.put(key, value, on_disk=True)
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                    return value
+                except Exception as e:
+                    logger.warning(f"OCRキャッシュの読み込みに失敗しました: {path}: {e}")
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, value: Dict[str, Any], on_disk: bool = False):
+        """
+        結果をキャッシュに保存します
+
+        上限を超えて追い出したエントリは、ディスク退避が有効な場合は常にディスクへ書き込みます。
+
+        Args:
+            key (str): キャッシュキー
+            value (Dict[str, Any]): OCR結果
+            on_disk (bool): このエントリが既にディスク上にあるかどうか（ディスクから読み込んだ場合）
+        """
+        size = len(value.get("text", "").encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        evicted = []
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.stats["evictions"] += 1
+                evicted.append((old_key, old_value))
+
+        if self.disk_dir is not None:
+            for old_key, old_value in evicted:
+                # ディスクから読み込んだばかりのエントリは書き直さない
+                if on_disk and old_key == key:
+                    continue
+                path = self._disk_path(old_key)
+                try:
+                    path.parent.mkdir(exist_ok=True)
+                    with open(path, "w", encoding="utf-8") as f:
+                        json.dump(old_value, f, ensure_ascii=False)
+                except Exception as e:
+                    logger.warning(f"OCRキャッシュのディスク退避に失敗しました: {path}: {e}")
+
+    def clear(self):
+        """
+        メモリ上のエントリを全て削除します
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得します
+
+        Returns:
+            Dict[str, Any]: ヒット数、ミス数、ヒット率、使用量など
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["memory_bytes"] = self._bytes
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+def get_shared_cache_stats() -> Optional[Dict[str, Any]]:
+    """
+    共有OCRキャッシュの統計を取得します
+
+    Returns:
+        Optional[Dict[str, Any]]: OCRCache.get_stats の結果。共有キャッシュが未作成の場合はNone
+    """
+    with _shared_cache_lock:
+        cache = _shared_cache
+    return cache.get_stats() if cache is not None else None
+
+
+def get_ocr_cache(cache_config: Optional[Dict[str, Any]] = None) -> Optional[OCRCache]:
+    """
+    設定に対応する共有OCRキャッシュを取得します
+
+    Args:
+        cache_config (Optional[Dict[str, Any]]): キャッシュ設定（enabled, max_entries, max_memory_mb, disk_dir）
+
+    Returns:
+        Optional[OCRCache]: 共有キャッシュ。無効化されている場合はNone
+    """
+    global _shared_cache, _shared_cache_settings
+
+    cache_config = cache_config or {}
+    if not cache_config.get("enabled", True):
+        return None
+
+    settings = (
+        cache_config.get("max_entries", 4096),
+        cache_config.get("max_memory_mb", 16),
+        cache_config.get("disk_dir")
+    )
+    with _shared_cache_lock:
+        if _shared_cache is None or _shared_cache_settings != settings:
+            _shared_cache = OCRCache(*settings)
+            _shared_cache_settings = settings
+        return _shared_cache
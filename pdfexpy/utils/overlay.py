@@ -0,0 +1,411 @@
+"""
+解析結果の注釈をベクター形式のオーバーレイとして扱うモジュール
+
+視覚的フィードバックを元画像に描き込んだ画像として再エンコードする代わりに、
+枠・ラベル・情報パネルを座標付きのレイヤー（JSON / SVG）として保存します。
+ビューアやGUIは元画像の上にレイヤーを重ねて表示し、画像が必要な場合のみ
+rasterize_overlay で（必要なら縮小して）ラスタライズします。
+"""
+
+import os
+import sys
+import json
+import argparse
+import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+from xml.sax.saxutils import escape
+from xml.etree import ElementTree
+
+# 画像処理
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .logger import get_logger
+from .annotation_renderer import get_renderer, load_font, TITLE_COLOR, LINE_HEIGHT
+
+logger = get_logger(__name__)
+
+
+OVERLAY_VERSION = 1
+
+# ベクター形式の拡張子と形式名
+VECTOR_FORMATS = {".svg": "svg", ".json": "json"}
+
+# 非可逆形式の拡張子とPILの形式名（品質を指定して保存する）
+LOSSY_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+# 注釈の配色 (R, G, B)
+OBJECT_COLOR = (0, 255, 0)
+TEXT_REGION_COLOR = (255, 0, 0)
+
+
+class OverlayError(Exception):
+    """オーバーレイの処理に関するエラー"""
+    pass
+
+
+def _hex(color) -> str:
+    """
+    (R, G, B) を16進数のカラーコードに変換します
+
+    Args:
+        color (tuple): (R, G, B)
+
+    Returns:
+        str: #rrggbb 形式のカラーコード
+    """
+    return "#{:02x}{:02x}{:02x}".format(*color[:3])
+
+
+def build_overlay(analysis_results: Dict[str, Any], width: int, height: int,
+                  image_path: Optional[str] = None, include_panels: bool = True) -> Dict[str, Any]:
+    """
+    解析結果から注釈のオーバーレイを作成します
+
+    Args:
+        analysis_results (Dict[str, Any]): 解析結果（analyze_image の results）
+        width (int): 元画像の幅
+        height (int): 元画像の高さ
+        image_path (Optional[str]): 元画像のパス
+        include_panels (bool): 画像情報・解析結果サマリーのパネルを含めるかどうか
+
+    Returns:
+        Dict[str, Any]: オーバーレイ（image, shapes, panels）
+    """
+    analysis = analysis_results.get("analysis", {})
+    shapes = []
+
+    # 検出されたオブジェクト
+    for obj in analysis.get("objects", []):
+        bbox = obj["bbox"]
+        shapes.append({
+            "category": "object",
+            "x": bbox["x"], "y": bbox["y"], "width": bbox["width"], "height": bbox["height"],
+            "label": f"{obj['label']} ({obj.get('confidence', 0.0):.2f})",
+            "color": _hex(OBJECT_COLOR),
+            "text_color": "#000000"
+        })
+
+    # OCRテキスト領域
+    ocr = analysis.get("ocr") or {}
+    if ocr.get("detected", False):
+        for region in ocr.get("regions", []):
+            bbox = region["bbox"]
+            shapes.append({
+                "category": "text",
+                "x": bbox["x"], "y": bbox["y"], "width": bbox["width"], "height": bbox["height"],
+                "label": f"{region['text']} ({region.get('confidence', 0.0):.2f})",
+                "color": _hex(TEXT_REGION_COLOR),
+                "text_color": "#ffffff"
+            })
+
+    overlay = {
+        "version": OVERLAY_VERSION,
+        "image": {"path": image_path, "width": width, "height": height},
+        "shapes": shapes,
+        "panels": []
+    }
+    if not include_panels:
+        return overlay
+
+    # 画像情報のパネル
+    image_info = analysis_results.get("image_details", {}).get("image_info", {})
+    panels = overlay["panels"]
+    panels.append({
+        "x": 10, "y": 10, "width": 350,
+        "lines": [
+            {"text": f"解析タイムスタンプ: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"},
+            {"text": f"元画像: {Path(image_path).name if image_path else ''}"},
+            {"text": f"解像度: {width}x{height} ({image_info.get('orientation', '')})"},
+            {"text": f"アスペクト比: {image_info.get('aspect_ratio_name', '')}"}
+        ]
+    })
+
+    # 解析結果サマリーのパネル（画像の下端）
+    if "analysis" in analysis_results:
+        lines = [
+            {"text": "【解析結果サマリー】", "title": True},
+            {"text": f"検出オブジェクト: {len(analysis.get('objects', []))}個"},
+            {"text": f"テキスト検出: {'あり' if ocr.get('detected', False) else 'なし'}"},
+            {"text": f"説明: {analysis.get('description', 'なし')}"}
+        ]
+        panels.append({"x": 10, "y": height - len(lines) * LINE_HEIGHT - 15, "width": 500, "lines": lines})
+
+    return overlay
+
+
+def overlay_to_svg(overlay: Dict[str, Any], image_href: Optional[str] = None) -> str:
+    """
+    オーバーレイをSVGに変換します（オーバーレイ自体もmetadataとして埋め込みます）
+
+    Args:
+        overlay (Dict[str, Any]): オーバーレイ
+        image_href (Optional[str]): 背景に表示する元画像の参照（Noneの場合は背景なし）
+
+    Returns:
+        str: SVG文書
+    """
+    width = overlay["image"]["width"]
+    height = overlay["image"]["height"]
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        f'width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<metadata id="pdfexpy-overlay">{escape(json.dumps(overlay, ensure_ascii=False))}</metadata>'
+    ]
+    if image_href:
+        parts.append(f'<image xlink:href="{escape(image_href, {chr(34): "&quot;"})}" '
+                     f'x="0" y="0" width="{width}" height="{height}"/>')
+
+    parts.append('<g font-family="Meiryo, sans-serif" font-size="14">')
+    for shape in overlay["shapes"]:
+        x, y, w, h = shape["x"], shape["y"], shape["width"], shape["height"]
+        label_width = len(shape["label"]) * 7
+        parts.append(
+            f'<rect x="{x}" y="{y}" width="{w}" height="{h}" fill="none" '
+            f'stroke="{shape["color"]}" stroke-opacity="0.86" stroke-width="2"/>'
+            f'<rect x="{x}" y="{y - 25}" width="{label_width}" height="25" fill="{shape["color"]}" fill-opacity="0.7"/>'
+            f'<text x="{x + 5}" y="{y - 7}" fill="{shape["text_color"]}">{escape(shape["label"])}</text>'
+        )
+
+    for panel in overlay["panels"]:
+        x, y = panel["x"], panel["y"]
+        panel_height = len(panel["lines"]) * LINE_HEIGHT + 10
+        parts.append(f'<rect x="{x - 5}" y="{y - 5}" width="{panel["width"] + 5}" height="{panel_height + 5}" '
+                     f'fill="#000000" fill-opacity="0.7"/>')
+        for i, line in enumerate(panel["lines"]):
+            color = _hex(TITLE_COLOR) if line.get("title") else "#ffffff"
+            size = 20 if line.get("title") else 14
+            parts.append(f'<text x="{x}" y="{y + i * LINE_HEIGHT + size}" fill="{color}" '
+                         f'font-size="{size}">{escape(line["text"])}</text>')
+    parts.append("</g></svg>")
+
+    return "\n".join(parts)
+
+
+def write_overlay(overlay: Dict[str, Any], output_file: Union[str, Path]) -> Path:
+    """
+    オーバーレイを拡張子に応じてSVGまたはJSONで保存します
+
+    Args:
+        overlay (Dict[str, Any]): オーバーレイ
+        output_file (Union[str, Path]): 出力ファイルのパス（.svg または .json）
+
+    Returns:
+        Path: 保存したファイルのパス
+
+    Raises:
+        OverlayError: 未対応の拡張子の場合
+    """
+    output_file = Path(output_file)
+    format = VECTOR_FORMATS.get(output_file.suffix.lower())
+    if format is None:
+        raise OverlayError(f"未対応のオーバーレイ形式です: {output_file.suffix}")
+
+    if format == "svg":
+        image_href = None
+        if overlay["image"].get("path"):
+            # SVGの位置からの相対パスで元画像を参照する
+            try:
+                image_href = os.path.relpath(overlay["image"]["path"], output_file.parent).replace(os.sep, "/")
+            except ValueError:
+                image_href = Path(overlay["image"]["path"]).as_uri()
+        content = overlay_to_svg(overlay, image_href)
+    else:
+        content = json.dumps(overlay, ensure_ascii=False, separators=(",", ":"))
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    return output_file
+
+
+def read_overlay(overlay_file: Union[str, Path]) -> Dict[str, Any]:
+    """
+    保存したオーバーレイ（SVGまたはJSON）を読み込みます
+
+    Args:
+        overlay_file (Union[str, Path]): オーバーレイファイルのパス
+
+    Returns:
+        Dict[str, Any]: オーバーレイ
+
+    Raises:
+        OverlayError: 読み込めない場合
+    """
+    overlay_file = Path(overlay_file)
+    try:
+        if overlay_file.suffix.lower() == ".svg":
+            metadata = ElementTree.parse(overlay_file).getroot().find("{http://www.w3.org/2000/svg}metadata")
+            if metadata is None or not metadata.text:
+                raise OverlayError(f"オーバーレイ情報が含まれていません: {overlay_file}")
+            return json.loads(metadata.text)
+        with open(overlay_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError, ElementTree.ParseError) as e:
+        raise OverlayError(f"オーバーレイを読み込めません: {overlay_file}: {e}")
+
+
+def rasterize_overlay(overlay: Dict[str, Any], image: Optional["Image.Image"] = None,
+                      max_dimension: Optional[int] = None) -> "Image.Image":
+    """
+    オーバーレイを元画像に描き込んだ画像を作成します
+
+    Args:
+        overlay (Dict[str, Any]): オーバーレイ
+        image (Optional[Image.Image]): 元画像（Noneの場合はオーバーレイに記録されたパスから読み込む）。
+            この画像は変更されません
+        max_dimension (Optional[int]): 長辺の最大ピクセル数（プレビュー用に縮小してから描画）
+
+    Returns:
+        Image.Image: 注釈付きのRGBA画像
+
+    Raises:
+        OverlayError: 元画像を読み込めない場合
+    """
+    if not PIL_AVAILABLE:
+        raise OverlayError("PIL (Pillow) ライブラリがインストールされていません。'pip install pillow' を実行してください。")
+
+    if image is None:
+        try:
+            with Image.open(overlay["image"]["path"]) as img:
+                if max_dimension:
+                    # JPEGなどはデコード時に縮小して読み込む
+                    img.draft("RGB", (max_dimension, max_dimension))
+                img.load()
+                image = img
+        except (OSError, TypeError) as e:
+            raise OverlayError(f"元画像を読み込めません: {overlay['image'].get('path')}: {e}")
+
+    if max_dimension and max(image.width, image.height) > max_dimension:
+        ratio = max_dimension / max(image.width, image.height)
+        image = image.resize((max(1, round(image.width * ratio)), max(1, round(image.height * ratio))),
+                             Image.BILINEAR)
+
+    # draft・縮小の有無にかかわらず、座標の倍率はオーバーレイの座標系（元画像の幅）を基準にする
+    scale = image.width / (overlay["image"]["width"] or image.width)
+
+    # 描画用のRGBA画像を作成（変換で新しい画像になるため、元画像を汚さないための複製は不要）
+    if image.mode != "RGBA":
+        canvas = image.convert("RGBA")
+    else:
+        canvas = image.copy()
+
+    draw_overlay(canvas, overlay, scale)
+    return canvas
+
+
+def preview_max_dimension(preview: Optional[Dict[str, Any]]) -> Optional[int]:
+    """
+    プレビュー設定から長辺の最大ピクセル数を取得します
+
+    Args:
+        preview (Optional[Dict[str, Any]]): 設定の preview セクション（Noneの場合は縮小しない）
+
+    Returns:
+        Optional[int]: 長辺の最大ピクセル数（縮小しない場合はNone）
+    """
+    if not preview:
+        return None
+    if preview.get("thumbnail_only"):
+        return preview.get("thumbnail_dimension", 320)
+    return preview.get("max_dimension")
+
+
+def save_raster(image: "Image.Image", output_file: Union[str, Path], quality: Optional[int] = None) -> Path:
+    """
+    注釈付きの画像を拡張子に応じた形式で保存します
+
+    .jpg / .jpeg / .webp の場合は指定した品質の非可逆形式で保存します
+    （JPEGは透過に対応しないためRGBに変換します）。
+
+    Args:
+        image (Image.Image): 保存する画像
+        output_file (Union[str, Path]): 出力ファイルのパス
+        quality (Optional[int]): 非可逆形式の品質 (1-100)。Noneの場合は形式の既定値
+
+    Returns:
+        Path: 保存したファイルのパス
+    """
+    output_file = Path(output_file)
+    image_format = LOSSY_FORMATS.get(output_file.suffix.lower())
+
+    if image_format is None:
+        image.save(output_file)
+        return output_file
+
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    options = {"quality": quality} if quality else {}
+    image.save(output_file, image_format, **options)
+    return output_file
+
+
+def draw_overlay(canvas: "Image.Image", overlay: Dict[str, Any], scale: float = 1.0):
+    """
+    オーバーレイをRGBA画像に直接描き込みます
+
+    Args:
+        canvas (Image.Image): 描画先のRGBA画像（変更されます）
+        overlay (Dict[str, Any]): オーバーレイ
+        scale (float): 座標の倍率（縮小したプレビューに描画する場合）
+    """
+    get_renderer().draw_overlay(canvas, overlay, scale)
+
+
+def render_overlay_file(overlay_file: Union[str, Path], output_file: Optional[Union[str, Path]] = None,
+                        max_dimension: Optional[int] = None, quality: Optional[int] = None) -> Path:
+    """
+    保存したオーバーレイをラスタライズして画像として保存します
+
+    Args:
+        overlay_file (Union[str, Path]): オーバーレイファイルのパス
+        output_file (Optional[Union[str, Path]]): 出力画像のパス（Noneの場合は拡張子を .png に変更）。
+            拡張子が .jpg / .webp の場合は非可逆形式で保存します
+        max_dimension (Optional[int]): 長辺の最大ピクセル数
+        quality (Optional[int]): .jpg / .webp で保存する場合の品質 (1-100)
+
+    Returns:
+        Path: 保存した画像のパス
+    """
+    overlay = read_overlay(overlay_file)
+    if output_file is None:
+        output_file = Path(overlay_file).with_suffix(".png")
+
+    image = rasterize_overlay(overlay, max_dimension=max_dimension)
+    save_raster(image, output_file, quality)
+    logger.info(f"オーバーレイをラスタライズしました: {output_file}")
+    return Path(output_file)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    オーバーレイをラスタライズするコマンドラインエントリーポイント
+
+    Args:
+        argv (Optional[List[str]]): コマンドライン引数（Noneの場合はsys.argv）
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="PDFExPy - オーバーレイのラスタライズ")
+    parser.add_argument("overlay", help="オーバーレイファイル（.svg または .json）")
+    parser.add_argument("--output", "-o", type=str, help="出力画像のパス")
+    parser.add_argument("--max-dimension", type=int, help="長辺の最大ピクセル数（プレビュー用）")
+    parser.add_argument("--quality", type=int, help="出力が .jpg / .webp の場合の品質 (1-100)")
+    args = parser.parse_args(argv)
+
+    try:
+        path = render_overlay_file(args.overlay, args.output, args.max_dimension, args.quality)
+    except OverlayError as e:
+        print(f"[エラー] {e}")
+        return 1
+
+    print(f"[完了] {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
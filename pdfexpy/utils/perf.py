@@ -0,0 +1,372 @@
+"""
+解析のステージごとの処理時間を計測・集計するモジュール
+
+StageTimer は time.perf_counter_ns でステージ（デコード・統計・推論・後処理・描画・書き込み）
+ごとの処理時間を計測し、解析結果の performance に画像サイズとモデルの識別子と共に記録します。
+PerfStats は直近の計測値からステージごとのパーセンタイルを計算し、
+コマンドラインからは保存済みの解析結果を集計して表示できます。
+"""
+
+import sys
+import time
+import argparse
+import threading
+import contextlib
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .logger import get_logger
+from .result_sink import iter_records
+
+logger = get_logger(__name__)
+
+
+# 集計するパーセンタイル
+PERCENTILES = (50, 90, 99)
+
+# 解析全体の処理時間を表す集計上のステージ名
+TOTAL_STAGE = "analysis"
+
+# 処理時間のヒストグラムの上限（ミリ秒）
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# プロセス内の集計
+_perf_stats = None
+_perf_stats_lock = threading.Lock()
+
+# スレッドごとに実行中のステージ（スレッドID → ステージ名）
+_active_stages: Dict[int, str] = {}
+
+# ステージの開始・終了時に呼び出す関数（プロファイラが登録する）
+_stage_hooks: List[Callable[[str, bool], None]] = []
+
+
+def active_stages() -> Dict[int, str]:
+    """
+    スレッドごとに実行中のステージを取得します
+
+    Returns:
+        Dict[int, str]: スレッドIDとステージ名
+    """
+    return dict(_active_stages)
+
+
+def add_stage_hook(hook: Callable[[str, bool], None]):
+    """
+    ステージの開始・終了時に呼び出す関数を登録します
+
+    Args:
+        hook (Callable[[str, bool], None]): ステージ名と開始か（Trueの場合は開始）を受け取る関数
+    """
+    _stage_hooks.append(hook)
+
+
+def remove_stage_hook(hook: Callable[[str, bool], None]):
+    """
+    登録した関数を解除します
+
+    Args:
+        hook (Callable[[str, bool], None]): add_stage_hook で登録した関数
+    """
+    if hook in _stage_hooks:
+        _stage_hooks.remove(hook)
+
+
+class StageTimer:
+    """ステージごとの処理時間をナノ秒単位で計測するクラス"""
+
+    def __init__(self):
+        """
+        計測を開始します
+        """
+        self._start_ns = time.perf_counter_ns()
+        self._stages_ns: Dict[str, int] = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        with ブロックの処理時間をステージの時間に加算します
+
+        Args:
+            name (str): ステージ名
+        """
+        ident = threading.get_ident()
+        previous = _active_stages.get(ident)
+        _active_stages[ident] = name
+        for hook in list(_stage_hooks):
+            hook(name, True)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter_ns() - start)
+            for hook in list(_stage_hooks):
+                hook(name, False)
+            if previous is None:
+                _active_stages.pop(ident, None)
+            else:
+                _active_stages[ident] = previous
+
+    def add(self, name: str, elapsed_ns: int):
+        """
+        ステージの時間を加算します
+
+        Args:
+            name (str): ステージ名
+            elapsed_ns (int): 処理時間（ナノ秒）
+        """
+        self._stages_ns[name] = self._stages_ns.get(name, 0) + elapsed_ns
+
+    def elapsed_seconds(self) -> float:
+        """
+        計測開始からの経過時間を取得します
+
+        Returns:
+            float: 経過時間（秒）
+        """
+        return (time.perf_counter_ns() - self._start_ns) / 1e9
+
+    def stages_ms(self) -> Dict[str, float]:
+        """
+        ステージごとの処理時間を取得します
+
+        Returns:
+            Dict[str, float]: ステージ名と処理時間（ミリ秒、計測順）
+        """
+        return {name: round(ns / 1e6, 3) for name, ns in self._stages_ns.items()}
+
+
+def build_performance(elapsed_seconds: float, stages_ms: Optional[Dict[str, float]] = None,
+                      width: Optional[int] = None, height: Optional[int] = None,
+                      model_name: Optional[str] = None, model_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    解析結果に記録する performance を作成します
+
+    Args:
+        elapsed_seconds (float): 解析全体の処理時間（秒）
+        stages_ms (Optional[Dict[str, float]]): ステージごとの処理時間（ミリ秒）
+        width (Optional[int]): 画像の幅
+        height (Optional[int]): 画像の高さ
+        model_name (Optional[str]): 使用したモデルの名前
+        model_id (Optional[str]): モデルの識別子（ファイル名・サイズ・更新日時）
+
+    Returns:
+        Dict[str, Any]: 処理時間・ステージごとの処理時間・画像サイズ・モデル
+    """
+    megapixels = round(width * height / 1e6, 3) if width and height else None
+    return {
+        "analysis_time_seconds": elapsed_seconds,
+        "analysis_time_ms": elapsed_seconds * 1000,
+        "stages_ms": dict(stages_ms or {}),
+        "image": {"width": width, "height": height, "megapixels": megapixels},
+        "model": {"name": model_name, "id": model_id}
+    }
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """
+    ソート済みの値のパーセンタイルを線形補間で計算します
+
+    Args:
+        sorted_values (Sequence[float]): 昇順にソートした値
+        q (float): パーセンタイル (0-100)
+
+    Returns:
+        Optional[float]: パーセンタイル（値がない場合はNone）
+    """
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class PerfStats:
+    """ステージごとの直近の処理時間を保持し、パーセンタイルを計算するクラス"""
+
+    def __init__(self, window: Optional[int] = 2048):
+        """
+        集計を初期化します
+
+        Args:
+            window (Optional[int]): ステージごとに保持する直近の計測値の数（Noneの場合は全て保持）
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._sums: Dict[str, float] = {}
+        self._buckets: Dict[str, List[int]] = {}
+
+    def add_stage(self, name: str, elapsed_ms: float):
+        """
+        ステージの処理時間を1件追加します
+
+        Args:
+            name (str): ステージ名
+            elapsed_ms (float): 処理時間（ミリ秒）
+        """
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(elapsed_ms)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            self._sums[name] = self._sums.get(name, 0.0) + elapsed_ms
+            buckets = self._buckets.setdefault(name, [0] * len(LATENCY_BUCKETS_MS))
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    buckets[i] += 1
+
+    def add(self, performance: Dict[str, Any]):
+        """
+        解析結果の performance を集計に加えます
+
+        Args:
+            performance (Dict[str, Any]): build_performance で作成した performance
+        """
+        for name, elapsed_ms in (performance.get("stages_ms") or {}).items():
+            self.add_stage(name, elapsed_ms)
+        if performance.get("analysis_time_ms") is not None:
+            self.add_stage(TOTAL_STAGE, performance["analysis_time_ms"])
+
+    def summary(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[str, Dict[str, Any]]:
+        """
+        ステージごとの件数・平均・パーセンタイル・最大値を取得します
+
+        Args:
+            percentiles (Iterable[float]): 計算するパーセンタイル
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ステージ名と統計（count は累計、他は直近の計測値から計算）
+        """
+        with self._lock:
+            snapshot = {name: (sorted(samples), self._counts[name]) for name, samples in self._samples.items()}
+
+        summary = {}
+        for name, (values, count) in snapshot.items():
+            stats = {"count": count, "mean": sum(values) / len(values), "max": values[-1]}
+            for q in percentiles:
+                stats[f"p{q:g}"] = percentile(values, q)
+            summary[name] = stats
+        return summary
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        """
+        ステージごとの処理時間の累積ヒストグラムを取得します
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ステージ名と buckets（LATENCY_BUCKETS_MS の各上限以下の累計件数）・sum（ミリ秒）・count
+        """
+        with self._lock:
+            return {
+                name: {"buckets": list(self._buckets[name]), "sum": self._sums[name], "count": count}
+                for name, count in self._counts.items()
+            }
+
+    def reset(self):
+        """
+        集計をクリアします
+        """
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._sums.clear()
+            self._buckets.clear()
+
+
+def get_perf_stats() -> PerfStats:
+    """
+    プロセス内で共有する集計を取得します
+
+    Returns:
+        PerfStats: 共有の集計
+    """
+    global _perf_stats
+
+    with _perf_stats_lock:
+        if _perf_stats is None:
+            _perf_stats = PerfStats()
+        return _perf_stats
+
+
+def summarize_results(directory: Union[str, Path], model: Optional[str] = None,
+                      limit: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    保存済みの解析結果（JSON・NDJSON）からステージごとの処理時間を集計します
+
+    Args:
+        directory (Union[str, Path]): 解析結果のディレクトリ
+        model (Optional[str]): 集計するモデルの名前または識別子（Noneの場合は全て）
+        limit (Optional[int]): 新しい順にこの件数のみを集計する
+
+    Returns:
+        Dict[str, Dict[str, Any]]: PerfStats.summary の結果
+    """
+    records = []
+    for record in iter_records(directory):
+        performance = record.get("performance")
+        if not performance:
+            continue
+        model_info = performance.get("model") or {}
+        if model is not None and model not in (model_info.get("name"), model_info.get("id")):
+            continue
+        records.append((record.get("timestamp") or "", performance))
+
+    records.sort(key=lambda item: item[0], reverse=True)
+    if limit:
+        records = records[:limit]
+
+    stats = PerfStats(window=None)
+    for _, performance in records:
+        stats.add(performance)
+    return stats.summary()
+
+
+def format_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """
+    集計結果を表形式の文字列にします
+
+    Args:
+        summary (Dict[str, Dict[str, Any]]): PerfStats.summary の結果
+
+    Returns:
+        str: 表形式の文字列（単位はミリ秒）
+    """
+    columns = ["count", "mean"] + [f"p{q}" for q in PERCENTILES] + ["max"]
+    lines = [f"{'stage':<14}" + "".join(f"{column:>10}" for column in columns)]
+    for name, stats in summary.items():
+        cells = [f"{stats['count']:>10}"] + [f"{stats[column]:>10.2f}" for column in columns[1:]]
+        lines.append(f"{name:<14}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    保存済みの解析結果の処理時間を集計して表示するコマンドラインエントリーポイント
+
+    Args:
+        argv (Optional[List[str]]): コマンドライン引数（Noneの場合はsys.argv）
+
+    Returns:
+        int: 終了コード
+    """
+    parser = argparse.ArgumentParser(description="PDFExPy - ステージごとの処理時間の集計（ミリ秒）")
+    parser.add_argument("directory", nargs="?", default="analysis_results", help="解析結果のディレクトリ")
+    parser.add_argument("--model", type=str, help="集計するモデルの名前または識別子")
+    parser.add_argument("--limit", "-n", type=int, help="新しい順に集計する件数")
+    args = parser.parse_args(argv)
+
+    summary = summarize_results(args.directory, model=args.model, limit=args.limit)
+    if not summary:
+        print(f"[エラー] 処理時間を含む解析結果が見つかりません: {args.directory}")
+        return 1
+
+    print(format_summary(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
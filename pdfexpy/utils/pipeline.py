@@ -0,0 +1,587 @@
+"""
+ステージ単位で並行に処理するパイプラインのモジュール
+
+各ステージは専用のワーカースレッドと上限付きのキューを持ち、前のステージの出力を
+受け取って次のステージへ渡します。下流のキューが満杯になると上流のステージが待機し、
+最終的には入力（ファイルの列挙やスクリーンショットの取得）の読み進めが止まるため、
+メモリ使用量はキューの大きさで決まります。
+
+画像の解析では デコード → 統計 → 検出 → 描画 → 保存 の各ステージを重ねて実行するため、
+ディスクの読み込み・推論・結果の書き込みが同時に進みます。画像処理とモデルの推論は
+GILを解放するため、ステージはスレッドで実行します。
+"""
+
+import queue
+import time
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Union
+
+from .logger import get_logger
+from .config import DEFAULT_CONFIG
+from .image_context import ImageContext
+from .image_analysis import (
+    YOLO_AVAILABLE,
+    ensure_output_dir,
+    iter_input_paths,
+    get_image_details,
+    run_detection,
+    assemble_results,
+    feedback_settings,
+    generate_visual_feedback
+)
+from .result_sink import ResultSink, create_result_sink
+from .manifest import model_identity
+from .perf import StageTimer, get_perf_stats
+from .metrics import get_metrics, pipeline_collector
+
+# YOLOモデル
+try:
+    from ..models import YOLOModel
+except ImportError:
+    YOLOModel = None
+
+logger = get_logger(__name__)
+
+
+# 画像解析のステージ名（処理順）
+ANALYSIS_STAGES = ("decode", "stats", "detect", "render", "persist")
+
+# キューの待機を中断して停止を確認する間隔（秒）
+_POLL_SECONDS = 0.1
+
+# ステージの終了を下流に伝える目印
+_END = object()
+
+
+class PipelineError(Exception):
+    """パイプラインの処理に関するエラー"""
+    pass
+
+
+class StageFailure:
+    """ステージで失敗した項目（以降のステージは処理せず、そのまま出力に渡します）"""
+
+    __slots__ = ("item", "stage", "error")
+
+    def __init__(self, item: Any, stage: str, error: Exception):
+        """
+        失敗した項目を初期化します
+
+        Args:
+            item (Any): 失敗したステージに渡された項目
+            stage (str): 失敗したステージの名前
+            error (Exception): 発生した例外
+        """
+        self.item = item
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """パイプラインの1つのステージ（処理関数・ワーカー数・入力キューの大きさ）"""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1,
+                 queue_size: Optional[int] = None):
+        """
+        ステージを初期化します
+
+        Args:
+            name (str): ステージの名前
+            func (Callable[[Any], Any]): 項目を受け取り、次のステージに渡す値を返す関数
+            workers (int): ワーカースレッド数
+            queue_size (Optional[int]): 入力キューの上限。Noneの場合はワーカー数の2倍
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size or self.workers * 2)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        統計情報を初期化します
+        """
+        with self._lock:
+            self.processed = 0
+            self.failed = 0
+            self.busy_seconds = 0.0
+
+    def _record(self, elapsed: float, failed: bool):
+        """
+        1項目の処理結果を統計に加えます
+
+        Args:
+            elapsed (float): 処理時間（秒）
+            failed (bool): 失敗したかどうか
+        """
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += elapsed
+            if failed:
+                self.failed += 1
+
+
+class Pipeline:
+    """上限付きキューでステージをつなぎ、並行に処理するパイプライン"""
+
+    def __init__(self, stages: List[Stage], output_queue_size: Optional[int] = None):
+        """
+        パイプラインを初期化します
+
+        Args:
+            stages (List[Stage]): 処理順のステージ
+            output_queue_size (Optional[int]): 出力キューの上限。Noneの場合は最後のステージのワーカー数の2倍
+
+        Raises:
+            PipelineError: ステージがない場合、またはステージ名が重複している場合
+        """
+        if not stages:
+            raise PipelineError("ステージが指定されていません")
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise PipelineError(f"ステージ名が重複しています: {names}")
+
+        self.stages = stages
+        self.output_queue_size = max(1, output_queue_size or stages[-1].workers * 2)
+        self._queues: List[queue.Queue] = []
+        self._stop = threading.Event()
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._running = False
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """
+        キューに空きができるまで待って項目を追加します（停止された場合は諦めます）
+
+        Args:
+            target (queue.Queue): 追加先のキュー
+            item (Any): 項目
+
+        Returns:
+            bool: 追加できた場合はTrue
+        """
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """
+        キューから項目を取り出します（停止された場合は終了の目印を返します）
+
+        Args:
+            source (queue.Queue): 取り出し元のキュー
+
+        Returns:
+            Any: 項目
+        """
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(self, source: Iterable[Any]):
+        """
+        入力を最初のステージのキューに投入します（キューが満杯の間は入力を読み進めません）
+
+        Args:
+            source (Iterable[Any]): 入力
+        """
+        try:
+            for item in source:
+                if not self._put(self._queues[0], item):
+                    return
+        except Exception as e:
+            logger.error(f"パイプラインの入力の取得中にエラーが発生しました: {e}")
+        finally:
+            for _ in range(self.stages[0].workers):
+                self._put(self._queues[0], _END)
+
+    def _work(self, index: int, remaining: List[int], lock: threading.Lock):
+        """
+        ステージのワーカーの処理です
+
+        Args:
+            index (int): ステージの番号
+            remaining (List[int]): ステージで稼働中のワーカー数（全ワーカーで共有）
+            lock (threading.Lock): remaining を保護するロック
+        """
+        stage = self.stages[index]
+        inbox, outbox = self._queues[index], self._queues[index + 1]
+        downstream = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+
+        while True:
+            item = self._get(inbox)
+            if item is _END:
+                break
+
+            if isinstance(item, StageFailure):
+                output = item
+            else:
+                start = time.perf_counter()
+                try:
+                    output = stage.func(item)
+                    failed = False
+                except Exception as e:
+                    logger.error(f"ステージ {stage.name} でエラーが発生しました: {e}")
+                    output = StageFailure(item, stage.name, e)
+                    failed = True
+                stage._record(time.perf_counter() - start, failed)
+
+            if not self._put(outbox, output):
+                return
+
+        # 最後に終了したワーカーが下流のワーカーに終了を伝える
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(downstream):
+                self._put(outbox, _END)
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        """
+        入力をパイプラインで処理し、完了した順に出力を返します
+
+        失敗した項目は StageFailure として返します。途中でループを抜けると
+        全てのステージを停止します。
+
+        Args:
+            source (Iterable[Any]): 入力
+
+        Yields:
+            Any: 最後のステージの出力、または StageFailure
+
+        Raises:
+            PipelineError: 既に実行中の場合
+        """
+        if self._running:
+            raise PipelineError("パイプラインは既に実行中です")
+
+        self._running = True
+        self._stop.clear()
+        for stage in self.stages:
+            stage.reset()
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        self._queues.append(queue.Queue(maxsize=self.output_queue_size))
+        self._started_at = time.perf_counter()
+        self._finished_at = None
+
+        feeder = threading.Thread(target=self._feed, args=(source,), name="pdfexpy-pipeline-feed", daemon=True)
+        threads = []
+        for index, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(index, remaining, lock),
+                    name=f"pdfexpy-pipeline-{stage.name}-{worker}", daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+        feeder.start()
+
+        try:
+            while True:
+                item = self._get(self._queues[-1])
+                if item is _END:
+                    break
+                yield item
+        finally:
+            # 途中で停止された場合は待機中のワーカーを解放する
+            # （入力の取得中に待機している場合があるため、入力のスレッドは待たない）
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self._finished_at = time.perf_counter()
+            self._running = False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ステージごとの処理件数・スループット・稼働率・キューの使用量を取得します
+
+        Returns:
+            Dict[str, Any]: 経過時間とステージごとの統計情報
+        """
+        if self._started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+
+        stages = {}
+        for index, stage in enumerate(self.stages):
+            pending = self._queues[index].qsize() if self._queues else 0
+            stages[stage.name] = {
+                "workers": stage.workers,
+                "processed": stage.processed,
+                "failed": stage.failed,
+                "busy_seconds": stage.busy_seconds,
+                "items_per_second": stage.processed / elapsed if elapsed > 0 else 0.0,
+                "utilization": stage.busy_seconds / (elapsed * stage.workers) if elapsed > 0 else 0.0,
+                "queue_depth": pending,
+                "queue_size": stage.queue_size
+            }
+        return {"elapsed_seconds": elapsed, "stages": stages}
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """
+    パイプラインの統計情報を表形式の文字列にします
+
+    Args:
+        stats (Dict[str, Any]): Pipeline.stats の結果
+
+    Returns:
+        str: 表形式の文字列
+    """
+    lines = [f"経過時間: {stats['elapsed_seconds']:.2f}秒"]
+    for name, stage in stats["stages"].items():
+        lines.append(f"  {name}: ワーカー {stage['workers']}, {stage['processed']}件 (失敗 {stage['failed']}件), "
+                     f"{stage['items_per_second']:.1f}件/秒, 稼働率 {stage['utilization'] * 100:.0f}%")
+    return "\n".join(lines)
+
+
+class AnalysisPipeline:
+    """画像の解析をステージごとに並行して実行するクラス"""
+
+    def __init__(self, output_dir: str = "analysis_results", generate_visual: bool = True,
+                 mock: bool = True, model_path: Optional[str] = None,
+                 config: Optional[Dict[str, Any]] = None, sink: Optional[ResultSink] = None,
+                 workers: Optional[Dict[str, int]] = None, queue_size: Optional[int] = None):
+        """
+        解析パイプラインを初期化します
+
+        Args:
+            output_dir (str): 結果を出力するディレクトリ
+            generate_visual (bool): 視覚的フィードバックを生成するかどうか
+            mock (bool): モックデータを使用するかどうか
+            model_path (Optional[str]): 使用するモデルのパス
+            config (Optional[Dict[str, Any]]): アプリケーション設定（pipeline セクションを参照）
+            sink (Optional[ResultSink]): 結果の出力先（Noneの場合は設定の result_sink に従って作成し、終了時に閉じる）
+            workers (Optional[Dict[str, int]]): ステージ名ごとのワーカー数（設定の pipeline.workers より優先）
+            queue_size (Optional[int]): 各ステージの入力キューの上限（設定の pipeline.queue_size より優先）
+        """
+        self.config = config or DEFAULT_CONFIG
+        pipeline_config = {**DEFAULT_CONFIG["pipeline"], **self.config.get("pipeline", {})}
+        stage_workers = {**DEFAULT_CONFIG["pipeline"]["workers"], **pipeline_config.get("workers", {}),
+                         **(workers or {})}
+        queue_size = queue_size or pipeline_config.get("queue_size")
+
+        self.output_path = ensure_output_dir(output_dir)
+        self.generate_visual = generate_visual
+        self.mock = mock
+        self.model_path = model_path
+        self.owns_sink = sink is None
+        self.sink = sink or create_result_sink(config, output_dir)
+        # 検出ステージのワーカーごとにモデルを持つ（推論はスレッド間で共有しない）
+        self._models = threading.local()
+
+        funcs = {
+            "decode": self._decode,
+            "stats": self._stats,
+            "detect": self._detect,
+            "render": self._render,
+            "persist": self._persist
+        }
+        self.pipeline = Pipeline([
+            Stage(name, funcs[name], workers=stage_workers.get(name, 1), queue_size=queue_size)
+            for name in ANALYSIS_STAGES
+        ])
+        # 実行中はキューの深さと稼働率をメトリクスとして公開する
+        self._collector = pipeline_collector(self.stats)
+        get_metrics().add_collector(self._collector)
+
+    def _decode(self, image_path: str) -> Dict[str, Any]:
+        """
+        画像をデコードします（デコードステージ）
+
+        Args:
+            image_path (str): 画像ファイルのパス
+
+        Returns:
+            Dict[str, Any]: 次のステージに渡す作業データ
+        """
+        timer = StageTimer()
+        context = ImageContext(str(image_path))
+        try:
+            with timer.stage("decode"):
+                context.rgb
+        except Exception:
+            context.close()
+            raise
+        return {"image_path": str(image_path), "context": context, "timer": timer}
+
+    def _stats(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        画像の詳細情報と色の統計を計算します（統計ステージ）
+
+        Args:
+            job (Dict[str, Any]): 作業データ
+
+        Returns:
+            Dict[str, Any]: image_details を加えた作業データ
+        """
+        with job["timer"].stage("stats"):
+            job["image_details"] = get_image_details(job["context"])
+        return job
+
+    def _model(self) -> Optional["YOLOModel"]:
+        """
+        現在のワーカーのモデルを取得します（なければ作成します）
+
+        Returns:
+            Optional[YOLOModel]: モデル（モックの場合はNone）
+        """
+        if self.mock or not YOLO_AVAILABLE:
+            return None
+        model = getattr(self._models, "model", None)
+        if model is None:
+            model = self._models.model = YOLOModel(model_path=self.model_path)
+        return model
+
+    def _detect(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        物体検出とOCRを実行し、保存する解析結果を構築します（検出ステージ）
+
+        Args:
+            job (Dict[str, Any]): 作業データ
+
+        Returns:
+            Dict[str, Any]: results を加えた作業データ
+        """
+        context, timer = job["context"], job["timer"]
+        analysis_results, model_used = run_detection(context, job["image_details"], self.mock,
+                                                     self._model(), self.model_path, self.config, timer)
+        # 解析時間はキューでの待ち時間を除いた、各ステージの処理時間の合計とする
+        stages_ms = timer.stages_ms()
+        job["results"] = assemble_results(context.path, job["image_details"], analysis_results, self.mock,
+                                          model_used, sum(stages_ms.values()) / 1000, stages_ms,
+                                          model_identity(self.mock, self.model_path))
+        job["filename"] = Path(context.path).stem
+        job["timestamp"] = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return job
+
+    def _render(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        視覚的フィードバックを生成し、画素データを解放します（描画ステージ）
+
+        Args:
+            job (Dict[str, Any]): 作業データ
+
+        Returns:
+            Dict[str, Any]: visual_feedback を加えた作業データ
+        """
+        job["visual_feedback"] = None
+        try:
+            if self.generate_visual:
+                feedback_file, preview = feedback_settings(self.output_path, job["filename"], job["timestamp"],
+                                                           self.config)
+                with job["timer"].stage("render"):
+                    job["visual_feedback"] = str(generate_visual_feedback(job["context"], job["results"],
+                                                                          feedback_file, preview))
+                job["results"]["performance"]["stages_ms"] = job["timer"].stages_ms()
+        finally:
+            job["context"].close()
+        return job
+
+    def _persist(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        解析結果を出力先に書き込みます（保存ステージ）
+
+        Args:
+            job (Dict[str, Any]): 作業データ
+
+        Returns:
+            Dict[str, Any]: analyze_image の結果に image_path を加えたもの
+        """
+        timer, performance = job["timer"], job["results"]["performance"]
+        with timer.stage("write"):
+            result_file = self.sink.write(job["results"], job["filename"])
+        performance["stages_ms"] = timer.stages_ms()
+        get_perf_stats().add(performance)
+        return {
+            "image_path": job["image_path"],
+            "results": job["results"],
+            "result_file": str(result_file),
+            "visual_feedback": job["visual_feedback"],
+            "success": True
+        }
+
+    def run(self, paths_or_dir: Union[str, Path, Iterable[str]], recursive: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        画像をパイプラインで解析し、完了した順に結果を返します
+
+        Args:
+            paths_or_dir (Union[str, Path, Iterable[str]]): ディレクトリ、画像ファイル、またはパスのイテラブル
+            recursive (bool): ディレクトリを指定した場合にサブディレクトリも探索するかどうか
+
+        Yields:
+            Dict[str, Any]: analyze_image の結果に image_path を加えたもの（失敗した場合は success=False と error）
+        """
+        try:
+            for output in self.pipeline.run(iter_input_paths(paths_or_dir, recursive)):
+                if isinstance(output, StageFailure):
+                    get_metrics().inc("pdfexpy_frames_analyzed_total", result="error")
+                    yield self._failure_result(output)
+                else:
+                    get_metrics().inc("pdfexpy_frames_analyzed_total", result="success")
+                    yield output
+        finally:
+            self.sink.flush()
+
+    @staticmethod
+    def _failure_result(failure: StageFailure) -> Dict[str, Any]:
+        """
+        失敗した項目を解析結果の形式に変換します（画素データを保持していれば解放します）
+
+        Args:
+            failure (StageFailure): 失敗した項目
+
+        Returns:
+            Dict[str, Any]: success=False の解析結果
+        """
+        item = failure.item
+        if isinstance(item, dict):
+            if item.get("context") is not None:
+                item["context"].close()
+            image_path = item.get("image_path")
+        else:
+            image_path = str(item)
+        return {
+            "image_path": image_path,
+            "success": False,
+            "error": f"{failure.stage}: {failure.error}",
+            "stage": failure.stage
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ステージごとの統計情報を取得します
+
+        Returns:
+            Dict[str, Any]: Pipeline.stats の結果
+        """
+        return self.pipeline.stats()
+
+    def close(self):
+        """
+        作成した出力先を閉じます
+        """
+        get_metrics().remove_collector(self._collector)
+        if self.owns_sink:
+            self.sink.close()
+        else:
+            self.sink.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,350 @@
+"""
+解析の実行をプロファイルするモジュール
+
+cProfile または組み込みのサンプリングプロファイラで処理を計測し、関数ごとの上位N件を
+StageTimer のステージ（デコード・推論・描画など）ごとに集計して出力します。
+サンプリングの結果は flamegraph.pl や speedscope で読み込める collapsed stacks 形式でも保存し、
+py-spy がインストールされている場合は py-spy で計測することもできます。
+"""
+
+import io
+import os
+import sys
+import signal
+import pstats
+import shutil
+import cProfile
+import datetime
+import threading
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Union
+
+from .logger import get_logger
+from .perf import active_stages, add_stage_hook, remove_stage_hook
+
+logger = get_logger(__name__)
+
+# py-spy（任意）
+PY_SPY_PATH = shutil.which("py-spy")
+PY_SPY_AVAILABLE = PY_SPY_PATH is not None
+
+# 対応するプロファイラ
+PROFILERS = ("cprofile", "sample", "py-spy")
+
+# ステージ外の処理を集計する名前
+OTHER_STAGE = "(other)"
+
+# 待機中とみなすサンプルの末尾の関数（ファイル名, 関数名）
+IDLE_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+}
+
+
+class ProfilingError(Exception):
+    """プロファイルに関するエラー"""
+    pass
+
+
+def _frame_label(code) -> str:
+    """
+    コードオブジェクトの表示名を作成します
+
+    Args:
+        code: コードオブジェクト
+
+    Returns:
+        str: 関数名 (ファイル名:行番号)
+    """
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def format_samples(stacks: Counter, top: int = 25, interval: Optional[float] = None) -> str:
+    """
+    スタックごとのサンプル数をステージごとの上位N件の表にします
+
+    Args:
+        stacks (Counter): 先頭がステージ名、以降が呼び出し元から順の関数であるタプルとサンプル数
+        top (int): ステージごとに表示する関数の数
+        interval (Optional[float]): サンプリング間隔（秒、指定した場合は推定時間を表示）
+
+    Returns:
+        str: 自己時間の多い順に並べた表
+    """
+    by_stage: Dict[str, Tuple[Counter, Counter, int]] = {}
+    for stack, count in stacks.items():
+        stage, frames = stack[0], stack[1:]
+        own, inclusive, total = by_stage.get(stage, (Counter(), Counter(), 0))
+        if frames:
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+        by_stage[stage] = (own, inclusive, total + count)
+
+    grand_total = sum(total for _, _, total in by_stage.values()) or 1
+    lines = []
+    for stage, (own, inclusive, total) in sorted(by_stage.items(), key=lambda item: -item[1][2]):
+        header = f"[{stage}] {total}サンプル ({total / grand_total:.1%})"
+        if interval:
+            header += f", 推定 {total * interval * 1000:.0f}ms"
+        lines.append(header)
+        lines.append(f"  {'self':>7} {'total':>7}  function")
+        for frame, count in own.most_common(top):
+            lines.append(f"  {count / total:>7.1%} {inclusive[frame] / total:>7.1%}  {frame}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+class _CProfileRunner:
+    """cProfile でステージごとに計測するクラス"""
+
+    def __init__(self):
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._stack = []
+        self._thread = None
+
+    def start(self):
+        # プロファイルは開始したスレッドのみが対象なので、ステージの切り替えもそのスレッドのみ
+        self._thread = threading.get_ident()
+        self._stack = [self._profiles.setdefault(OTHER_STAGE, cProfile.Profile())]
+        add_stage_hook(self._on_stage)
+        self._stack[-1].enable()
+
+    def _on_stage(self, name: str, entering: bool):
+        if threading.get_ident() != self._thread or not self._stack:
+            return
+        self._stack[-1].disable()
+        if entering:
+            self._stack.append(self._profiles.setdefault(name, cProfile.Profile()))
+        elif len(self._stack) > 1:
+            self._stack.pop()
+        self._stack[-1].enable()
+
+    def stop(self):
+        remove_stage_hook(self._on_stage)
+        if self._stack:
+            self._stack[-1].disable()
+            self._stack = []
+
+    def write(self, base: Path, top: int) -> Dict[str, str]:
+        profiles = {name: profile for name, profile in self._profiles.items() if profile.getstats()}
+        if not profiles:
+            raise ProfilingError("計測された関数呼び出しがありません")
+
+        stats_file = base.with_suffix(".prof")
+        pstats.Stats(*profiles.values()).dump_stats(str(stats_file))
+
+        summary = io.StringIO()
+        for name, profile in profiles.items():
+            summary.write(f"[{name}]\n")
+            pstats.Stats(profile, stream=summary).strip_dirs().sort_stats("tottime").print_stats(top)
+        summary_file = base.with_suffix(".txt")
+        summary_file.write_text(summary.getvalue(), encoding="utf-8")
+        return {"stats": str(stats_file), "summary": str(summary_file)}
+
+
+class _StackSampler:
+    """全スレッドのスタックを一定間隔で記録するクラス"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="pdfexpy-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stages = active_stages()
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FUNCTIONS:
+                    continue
+                frames = []
+                while frame is not None:
+                    label = self._labels.get(frame.f_code)
+                    if label is None:
+                        label = self._labels[frame.f_code] = _frame_label(frame.f_code)
+                    frames.append(label)
+                    frame = frame.f_back
+                self.stacks[(stages.get(ident, OTHER_STAGE),) + tuple(reversed(frames))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, base: Path, top: int) -> Dict[str, str]:
+        if not self.stacks:
+            raise ProfilingError("サンプルが記録されていません（実行時間が短すぎる可能性があります）")
+
+        stacks_file = base.with_suffix(".folded")
+        with open(stacks_file, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+        summary_file = base.with_suffix(".txt")
+        summary_file.write_text(format_samples(self.stacks, top, self.interval), encoding="utf-8")
+        return {"stacks": str(stacks_file), "summary": str(summary_file)}
+
+
+class _PySpyRunner:
+    """py-spy を別プロセスで起動して計測するクラス"""
+
+    def __init__(self, interval: float, output: Path):
+        self.interval = interval
+        self.output = output
+        self._process = None
+
+    def start(self):
+        rate = max(1, int(round(1 / self.interval)))
+        self._process = subprocess.Popen(
+            [PY_SPY_PATH, "record", "--pid", str(os.getpid()), "--format", "raw",
+             "--rate", str(rate), "--output", str(self.output)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+
+    def stop(self):
+        try:
+            self._process.send_signal(signal.SIGINT)
+        except ValueError:
+            self._process.terminate()
+        _, stderr = self._process.communicate(timeout=60)
+        if not self.output.exists():
+            raise ProfilingError(f"py-spy の出力がありません: {stderr.decode(errors='replace').strip()}")
+
+    def write(self, base: Path, top: int) -> Dict[str, str]:
+        # py-spy の raw 形式は collapsed stacks なので、ステージの区別なしで集計する
+        stacks = Counter()
+        with open(self.output, encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    stacks[("all",) + tuple(stack.split(";"))] += int(count)
+
+        summary_file = base.with_suffix(".txt")
+        summary_file.write_text(format_samples(stacks, top, self.interval), encoding="utf-8")
+        return {"stacks": str(self.output), "summary": str(summary_file)}
+
+
+class Profiler:
+    """処理をプロファイルし、結果をファイルに保存するクラス"""
+
+    def __init__(self, output_dir: Union[str, Path] = "profiles", profiler: str = "cprofile",
+                 top: int = 25, interval: float = 0.005, name: str = "profile"):
+        """
+        プロファイラを初期化します
+
+        Args:
+            output_dir (Union[str, Path]): 結果の出力ディレクトリ
+            profiler (str): cprofile、sample（組み込みのサンプリング）または py-spy
+            top (int): ステージごとに出力する関数の数
+            interval (float): サンプリング間隔（秒）
+            name (str): 出力ファイル名の接頭辞
+
+        Raises:
+            ProfilingError: 未対応のプロファイラが指定された場合
+        """
+        if profiler not in PROFILERS:
+            raise ProfilingError(f"未対応のプロファイラです: {profiler}")
+        if profiler == "py-spy" and not PY_SPY_AVAILABLE:
+            logger.warning("py-spy が見つからないため、組み込みのサンプリングプロファイラを使用します")
+            profiler = "sample"
+
+        self.output_dir = Path(output_dir)
+        self.profiler = profiler
+        self.top = top
+        self.interval = interval
+        self.name = name
+        self.outputs: Dict[str, str] = {}
+        self._runner = None
+        self._base = None
+
+    def start(self):
+        """
+        計測を開始します
+
+        Raises:
+            ProfilingError: 既に計測中の場合
+        """
+        if self._runner is not None:
+            raise ProfilingError("プロファイルは既に開始しています")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._base = self.output_dir / f"{self.name}_{timestamp}"
+
+        if self.profiler == "cprofile":
+            self._runner = _CProfileRunner()
+        elif self.profiler == "sample":
+            self._runner = _StackSampler(self.interval)
+        else:
+            self._runner = _PySpyRunner(self.interval, self._base.with_suffix(".folded"))
+        self._runner.start()
+        logger.info(f"プロファイルを開始しました ({self.profiler})")
+
+    def stop(self) -> Dict[str, str]:
+        """
+        計測を終了し、結果を保存します
+
+        Returns:
+            Dict[str, str]: 出力の種類（summary・stats・stacks）とファイルパス
+
+        Raises:
+            ProfilingError: 計測していない場合、または結果がない場合
+        """
+        if self._runner is None:
+            raise ProfilingError("プロファイルが開始されていません")
+
+        runner, self._runner = self._runner, None
+        runner.stop()
+        self.outputs = runner.write(self._base, self.top)
+        for kind, path in self.outputs.items():
+            logger.info(f"プロファイル結果 ({kind}): {path}")
+        return self.outputs
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.stop()
+        except ProfilingError as e:
+            # 処理自体の例外を隠さない
+            if exc_type is None:
+                raise
+            logger.warning(f"プロファイル結果を保存できませんでした: {str(e)}")
+
+
+def profiler_from_config(config: Optional[Dict[str, Any]] = None, profiler: Optional[str] = None,
+                         output_dir: Optional[Union[str, Path]] = None, name: str = "profile") -> Profiler:
+    """
+    設定の profiling セクションからプロファイラを作成します
+
+    Args:
+        config (Optional[Dict[str, Any]]): 設定
+        profiler (Optional[str]): プロファイラ（Noneの場合は設定の値）
+        output_dir (Optional[Union[str, Path]]): 出力ディレクトリ（Noneの場合は設定の値）
+        name (str): 出力ファイル名の接頭辞
+
+    Returns:
+        Profiler: プロファイラ
+    """
+    settings = (config or {}).get("profiling", {})
+    return Profiler(
+        output_dir=output_dir or settings.get("output_dir", "profiles"),
+        profiler=profiler or settings.get("profiler", "cprofile"),
+        top=settings.get("top", 25),
+        interval=settings.get("interval_ms", 5) / 1000,
+        name=name
+    )
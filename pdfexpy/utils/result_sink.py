@@ -0,0 +1,477 @@
+"""
+解析結果の出力先（シンク）を提供するモジュール
+
+1件ごとに整形済みJSONファイルを作成する JsonFileSink と、バッファリングしながら
+1行1レコードのコンパクトなJSON（NDJSON）を追記する NDJSONSink を提供します。
+NDJSONSink はサイズまたは経過時間でファイルをローテーションし、orjson が
+インストールされている場合はそれを使ってエンコードします。
+"""
+
+import os
+import json
+import time
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union
+
+# 高速なJSONエンコーダ
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResultSinkError(Exception):
+    """結果の出力に関するエラー"""
+    pass
+
+
+def dumps_compact(record: Dict[str, Any]) -> bytes:
+    """
+    レコードを改行を含まないコンパクトなJSONにエンコードします
+
+    Args:
+        record (Dict[str, Any]): エンコードするレコード
+
+    Returns:
+        bytes: UTF-8のJSON
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            # 文字列以外のキーなど orjson が扱えない値は標準ライブラリで処理する
+            pass
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _bbox_columns(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    検出結果のバウンディングボックスを列に展開します
+
+    Args:
+        item (Dict[str, Any]): bbox を含む検出結果
+
+    Returns:
+        Dict[str, Any]: x, y, width, height
+    """
+    bbox = item.get("bbox") or {}
+    return {key: bbox.get(key) for key in ("x", "y", "width", "height")}
+
+
+def flatten_result(record: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    入れ子になった解析結果を、画像・検出物体・OCR領域の平坦な行に展開します
+
+    Args:
+        record (Dict[str, Any]): analyze_image の結果（results）
+
+    Returns:
+        Tuple[Dict, List[Dict], List[Dict]]: 画像の行、検出物体の行、OCR領域の行
+    """
+    details = record.get("image_details", {})
+    file_info = details.get("file_info", {})
+    image_info = details.get("image_info", {})
+    color_info = image_info.get("color_info", {})
+    metadata = record.get("metadata", {})
+    analysis = record.get("analysis", {})
+    debug_info = record.get("debug_info", {})
+
+    image = {
+        "image_path": metadata.get("image_path") or file_info.get("filepath"),
+        "filename": file_info.get("filename"),
+        "timestamp": record.get("timestamp") or datetime.datetime.now().isoformat(),
+        "width": image_info.get("width"),
+        "height": image_info.get("height"),
+        "brightness_percent": color_info.get("brightness_percent"),
+        "color_variance": color_info.get("color_variance"),
+        "avg_color_hex": color_info.get("avg_color_hex"),
+        "theme": color_info.get("theme"),
+        "mode": metadata.get("mode"),
+        "model": debug_info.get("model_used") or ("mock" if debug_info.get("mock_data") else None),
+        "description": analysis.get("description"),
+        "analysis_time_ms": record.get("performance", {}).get("analysis_time_ms")
+    }
+    detections = [
+        {"label": obj.get("label", "unknown"), "confidence": obj.get("confidence"), **_bbox_columns(obj)}
+        for obj in analysis.get("objects", [])
+    ]
+    ocr_regions = [
+        {"text": region.get("text"), "confidence": region.get("confidence"), **_bbox_columns(region)}
+        for region in (analysis.get("ocr") or {}).get("regions", [])
+    ]
+    return image, detections, ocr_regions
+
+
+class FlushTimer:
+    """バッファの最初のレコードから一定時間後に書き出すタイマー（書き込みが途絶えても期限を守ります）"""
+
+    def __init__(self, seconds: Optional[float], flush: Callable[[], None]):
+        """
+        タイマーを初期化します
+
+        Args:
+            seconds (Optional[float]): 書き出すまでの秒数（Noneの場合はタイマーを使わない）
+            flush (Callable[[], None]): 期限に呼び出す書き出し処理（シンクのロックを自分で取得するもの）
+        """
+        self.seconds = seconds
+        self.flush = flush
+        self._timer = None
+
+    def start(self):
+        """
+        タイマーが動いていなければ開始します（シンクのロックを保持した状態で呼び出します）
+        """
+        if self.seconds is None or self._timer is not None:
+            return
+        self._timer = threading.Timer(self.seconds, self._run)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self):
+        """
+        タイマーを止めます（シンクのロックを保持した状態で呼び出します）
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _run(self):
+        try:
+            self.flush()
+        except ResultSinkError as e:
+            logger.error(f"バッファの定期書き出しに失敗しました: {str(e)}")
+
+
+class ResultSink:
+    """解析結果の出力先の基底クラス"""
+
+    def write(self, record: Dict[str, Any], name: str) -> str:
+        """
+        レコードを出力します
+
+        Args:
+            record (Dict[str, Any]): 出力するレコード
+            name (str): レコードの名前（画像ファイル名など）
+
+        Returns:
+            str: レコードの出力先のファイルパス
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """
+        バッファリングしているレコードを書き出します
+        """
+        pass
+
+    def close(self):
+        """
+        出力先を閉じます
+        """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class JsonFileSink(ResultSink):
+    """1レコードごとにJSONファイルを作成するシンク（従来の出力形式）"""
+
+    def __init__(self, output_dir: Union[str, Path], prefix: str = "analysis_", indent: Optional[int] = 2):
+        """
+        シンクを初期化します
+
+        Args:
+            output_dir (Union[str, Path]): 出力ディレクトリ
+            prefix (str): ファイル名の接頭辞
+            indent (Optional[int]): JSONのインデント幅（Noneの場合は整形しない）
+        """
+        self.output_dir = Path(output_dir)
+        self.prefix = prefix
+        self.indent = indent
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: Dict[str, Any], name: str) -> str:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = self.output_dir / f"{self.prefix}{name}_{timestamp}.json"
+
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False, indent=self.indent)
+        except (OSError, TypeError, ValueError) as e:
+            raise ResultSinkError(f"結果の保存に失敗しました: {path}: {e}")
+
+        return str(path)
+
+
+class NDJSONSink(ResultSink):
+    """レコードをバッファリングしてNDJSONファイルに追記するシンク"""
+
+    def __init__(self, output_dir: Union[str, Path], basename: str = "results",
+                 max_bytes: int = 64 * 1024 * 1024, rotate_seconds: Optional[float] = 3600,
+                 buffer_bytes: int = 256 * 1024, flush_seconds: Optional[float] = 5.0):
+        """
+        シンクを初期化します
+
+        Args:
+            output_dir (Union[str, Path]): 出力ディレクトリ
+            basename (str): ファイル名の接頭辞（{basename}_{日時}.ndjson）
+            max_bytes (int): 1ファイルの最大サイズ。超えると新しいファイルに切り替える
+            rotate_seconds (Optional[float]): ファイルを切り替える間隔（秒）。Noneの場合はサイズのみ
+            buffer_bytes (int): この量を超えるとバッファを書き出す
+            flush_seconds (Optional[float]): バッファの最初のレコードからこの秒数を過ぎると書き出す
+                （次の書き込みがなくてもタイマーで書き出します）
+        """
+        self.output_dir = Path(output_dir)
+        self.basename = basename
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.buffer_bytes = buffer_bytes
+        self.flush_seconds = flush_seconds
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_started = None
+        self._flush_timer = FlushTimer(flush_seconds, self.flush)
+        self._file = None
+        self._path = None
+        self._file_bytes = 0
+        self._opened_at = 0.0
+
+    @property
+    def path(self) -> Optional[str]:
+        """現在書き込み中のファイルのパス"""
+        return str(self._path) if self._path else None
+
+    def _open_new_file(self):
+        """
+        新しいファイルを開きます（同名のファイルがあれば連番を付けます）
+        """
+        if self._file is not None:
+            self._file.close()
+
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = self.output_dir / f"{self.basename}_{stamp}.ndjson"
+        index = 1
+        while path.exists():
+            path = self.output_dir / f"{self.basename}_{stamp}_{index}.ndjson"
+            index += 1
+
+        self._file = open(path, "ab")
+        self._path = path
+        self._file_bytes = 0
+        self._opened_at = time.monotonic()
+        logger.debug(f"結果ファイルを開きました: {path}")
+
+    def _needs_rotation(self, incoming: int) -> bool:
+        """
+        次の書き込みの前にファイルを切り替える必要があるかを判定します
+
+        Args:
+            incoming (int): これから書き込むバイト数
+
+        Returns:
+            bool: 切り替える必要がある場合はTrue
+        """
+        if self._file is None:
+            return True
+        if self._file_bytes > 0 and self._file_bytes + incoming > self.max_bytes:
+            return True
+        if self.rotate_seconds is not None and time.monotonic() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def write(self, record: Dict[str, Any], name: str) -> str:
+        line = dumps_compact(record) + b"\n"
+
+        with self._lock:
+            if self._needs_rotation(self._buffered + len(line)):
+                self._flush_locked()
+                self._open_new_file()
+
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffer_started is None:
+                self._buffer_started = time.monotonic()
+                self._flush_timer.start()
+
+            if (self._buffered >= self.buffer_bytes or
+                    (self.flush_seconds is not None and
+                     time.monotonic() - self._buffer_started >= self.flush_seconds)):
+                self._flush_locked()
+
+            return str(self._path)
+
+    def _flush_locked(self):
+        """
+        バッファを現在のファイルに書き出します（ロックを保持した状態で呼び出します）
+        """
+        self._flush_timer.cancel()
+        if not self._buffer or self._file is None:
+            return
+
+        try:
+            self._file.write(b"".join(self._buffer))
+            self._file.flush()
+        except OSError as e:
+            raise ResultSinkError(f"結果の書き込みに失敗しました: {self._path}: {e}")
+
+        self._file_bytes += self._buffered
+        self._buffer.clear()
+        self._buffered = 0
+        self._buffer_started = None
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def create_result_sink(config: Optional[Dict[str, Any]], output_dir: Union[str, Path],
+                       basename: str = "results") -> ResultSink:
+    """
+    設定に応じたシンクを作成します
+
+    Args:
+        config (Optional[Dict[str, Any]]): アプリケーション設定（result_sink セクションを参照）
+        output_dir (Union[str, Path]): 出力ディレクトリ
+        basename (str): NDJSONファイル名の接頭辞
+
+    Returns:
+        ResultSink: 作成したシンク
+
+    Raises:
+        ResultSinkError: 未対応の種類が指定された場合
+    """
+    sink_config = (config or {}).get("result_sink", {})
+    sink_type = sink_config.get("type", "json")
+
+    if sink_type == "json":
+        return JsonFileSink(output_dir, indent=sink_config.get("indent", 2))
+    if sink_type == "ndjson":
+        return NDJSONSink(
+            output_dir,
+            basename=basename,
+            max_bytes=int(sink_config.get("max_mb", 64) * 1024 * 1024),
+            rotate_seconds=sink_config.get("rotate_seconds", 3600),
+            buffer_bytes=int(sink_config.get("buffer_kb", 256) * 1024),
+            flush_seconds=sink_config.get("flush_seconds", 5.0)
+        )
+    if sink_type == "sqlite":
+        # result_store は本モジュールに依存するため、ここでインポートする
+        from .result_store import SQLiteResultStore
+        return SQLiteResultStore(
+            sink_config.get("database") or Path(output_dir) / "results.sqlite3",
+            batch_size=sink_config.get("batch_size", 100),
+            flush_seconds=sink_config.get("flush_seconds", 5.0),
+            store_json=sink_config.get("store_json", False)
+        )
+    if sink_type in ("parquet", "arrow"):
+        from .columnar_export import ColumnarSink
+        return ColumnarSink(
+            output_dir,
+            format=sink_type,
+            rows_per_file=sink_config.get("rows_per_file", 10000),
+            flush_seconds=sink_config.get("flush_seconds", 5.0)
+        )
+    raise ResultSinkError(f"未対応の出力形式です: {sink_type}")
+
+
+def iter_records(directory: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    ディレクトリ内のJSONファイルとNDJSONファイルからレコードを読み込みます
+
+    Args:
+        directory (Union[str, Path]): 読み込むディレクトリ
+
+    Yields:
+        Dict[str, Any]: レコード
+    """
+    for path in sorted(Path(directory).glob("*.json")) + sorted(Path(directory).glob("*.ndjson")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if path.suffix == ".json":
+                    yield json.load(f)
+                    continue
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except (OSError, ValueError) as e:
+            logger.warning(f"結果ファイルを読み込めません: {path}: {e}")
+
+
+def _iter_lines_reversed(f, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    ファイルの行を末尾から順に読み込みます（ファイル全体は読み込みません）
+
+    Args:
+        f: バイナリモードで開いたファイル
+        block_size (int): 一度に読み込むバイト数
+
+    Yields:
+        bytes: 改行を含まない行
+    """
+    position = f.seek(0, os.SEEK_END)
+    remainder = b""
+    while position > 0:
+        size = min(block_size, position)
+        position -= size
+        f.seek(position)
+        lines = (f.read(size) + remainder).split(b"\n")
+        remainder = lines.pop(0)
+        yield from reversed(lines)
+    yield remainder
+
+
+def iter_recent_records(directory: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    ディレクトリ内のJSONファイルとNDJSONファイルから、新しい順にレコードを読み込みます
+
+    ファイルを更新日時の新しい順に開き、NDJSONファイルは末尾の行から読むため、
+    必要な件数だけ取り出せば古い履歴は読み込みません。
+
+    Args:
+        directory (Union[str, Path]): 読み込むディレクトリ
+
+    Yields:
+        Dict[str, Any]: レコード（おおむね新しい順）
+    """
+    paths = list(Path(directory).glob("*.json")) + list(Path(directory).glob("*.ndjson"))
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = path.stat().st_mtime
+        except OSError:
+            continue
+
+    for path in sorted(mtimes, key=mtimes.get, reverse=True):
+        try:
+            if path.suffix == ".json":
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                yield record
+                continue
+            with open(path, "rb") as f:
+                for line in _iter_lines_reversed(f):
+                    if line.strip():
+                        yield json.loads(line)
+        except (OSError, ValueError) as e:
+            logger.warning(f"結果ファイルを読み込めません: {path}: {e}")
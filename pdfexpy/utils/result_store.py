@@ -0,0 +1,362 @@
+"""
+解析結果をSQLiteに保存・検索するモジュール
+
+画像・検出物体・OCR領域を正規化したテーブルに保存し、日時・ラベル・信頼度の
+インデックスにより、長期間の履歴からも条件に合う画像をすぐに検索できます。
+ResultSink として解析パイプラインに組み込むと、結果はまとめてトランザクションで挿入されます。
+"""
+
+import time
+import sqlite3
+import datetime
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from .logger import get_logger
+from .result_sink import ResultSink, ResultSinkError, dumps_compact, flatten_result, iter_records
+
+logger = get_logger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    image_path TEXT,
+    filename TEXT,
+    timestamp TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    brightness_percent REAL,
+    theme TEXT,
+    mode TEXT,
+    model TEXT,
+    description TEXT,
+    analysis_time_ms REAL,
+    result_json TEXT
+);
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY,
+    image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+    label TEXT NOT NULL,
+    confidence REAL,
+    x INTEGER,
+    y INTEGER,
+    width INTEGER,
+    height INTEGER
+);
+CREATE TABLE IF NOT EXISTS ocr_regions (
+    id INTEGER PRIMARY KEY,
+    image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+    text TEXT,
+    confidence REAL,
+    x INTEGER,
+    y INTEGER,
+    width INTEGER,
+    height INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_images_timestamp ON images(timestamp);
+CREATE INDEX IF NOT EXISTS idx_detections_label_confidence ON detections(label, confidence);
+CREATE INDEX IF NOT EXISTS idx_detections_image ON detections(image_id);
+CREATE INDEX IF NOT EXISTS idx_ocr_regions_image ON ocr_regions(image_id);
+CREATE INDEX IF NOT EXISTS idx_ocr_regions_confidence ON ocr_regions(confidence);
+"""
+
+
+class ResultStoreError(ResultSinkError):
+    """結果ストアに関するエラー"""
+    pass
+
+
+def _to_timestamp(value: Union[str, datetime.datetime, datetime.date, None]) -> Optional[str]:
+    """
+    検索条件の日時をISO形式の文字列に変換します
+
+    Args:
+        value (Union[str, datetime.datetime, datetime.date, None]): 日時
+
+    Returns:
+        Optional[str]: ISO形式の文字列
+    """
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+class SQLiteResultStore(ResultSink):
+    """解析結果をSQLiteに保存し、検索するクラス"""
+
+    def __init__(self, database: Union[str, Path], batch_size: int = 100,
+                 flush_seconds: Optional[float] = 5.0, store_json: bool = False):
+        """
+        ストアを初期化します（データベースとテーブルがなければ作成します）
+
+        Args:
+            database (Union[str, Path]): データベースファイルのパス（":memory:" も可）
+            batch_size (int): まとめて挿入する結果の件数
+            flush_seconds (Optional[float]): バッファの最初の結果からこの秒数を過ぎると挿入する
+            store_json (bool): 結果全体をJSONとしても保存するかどうか
+        """
+        self.database = str(database)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.store_json = store_json
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_started = None
+
+        if self.database != ":memory:":
+            Path(self.database).parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            # 複数のワーカープロセスから同じデータベースに書き込めるよう、WALモードで待機時間を設ける
+            self._conn = sqlite3.connect(self.database, timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            raise ResultStoreError(f"データベースを開けません: {self.database}: {e}")
+
+    def write(self, record: Dict[str, Any], name: str) -> str:
+        with self._lock:
+            self._pending.append(record)
+            if self._pending_started is None:
+                self._pending_started = time.monotonic()
+
+            if (len(self._pending) >= self.batch_size or
+                    (self.flush_seconds is not None and
+                     time.monotonic() - self._pending_started >= self.flush_seconds)):
+                self._flush_locked()
+
+        return self.database
+
+    def add_results(self, records: List[Dict[str, Any]]) -> int:
+        """
+        解析結果をまとめて1つのトランザクションで挿入します
+
+        Args:
+            records (List[Dict[str, Any]]): analyze_image の結果（results）のリスト
+
+        Returns:
+            int: 挿入した件数
+        """
+        with self._lock:
+            self._pending.extend(records)
+            count = len(self._pending)
+            self._flush_locked()
+        return count
+
+    def _flush_locked(self):
+        """
+        バッファの結果を挿入します（ロックを保持した状態で呼び出します）
+        """
+        if not self._pending:
+            return
+
+        try:
+            with self._conn:
+                for record in self._pending:
+                    self._insert(record)
+        except sqlite3.Error as e:
+            raise ResultStoreError(f"結果の保存に失敗しました: {self.database}: {e}")
+
+        logger.debug(f"{len(self._pending)}件の結果をデータベースに保存しました: {self.database}")
+        self._pending.clear()
+        self._pending_started = None
+
+    def _insert(self, record: Dict[str, Any]):
+        """
+        解析結果1件を各テーブルに挿入します
+
+        Args:
+            record (Dict[str, Any]): analyze_image の結果（results）
+        """
+        image, detections, ocr_regions = flatten_result(record)
+
+        cursor = self._conn.execute(
+            "INSERT INTO images (image_path, filename, timestamp, width, height, brightness_percent, "
+            "theme, mode, model, description, analysis_time_ms, result_json) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                image["image_path"], image["filename"], image["timestamp"], image["width"], image["height"],
+                image["brightness_percent"], image["theme"], image["mode"], image["model"],
+                image["description"], image["analysis_time_ms"],
+                dumps_compact(record).decode("utf-8") if self.store_json else None
+            )
+        )
+        image_id = cursor.lastrowid
+
+        self._conn.executemany(
+            "INSERT INTO detections (image_id, label, confidence, x, y, width, height) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(image_id, d["label"], d["confidence"], d["x"], d["y"], d["width"], d["height"]) for d in detections]
+        )
+        self._conn.executemany(
+            "INSERT INTO ocr_regions (image_id, text, confidence, x, y, width, height) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(image_id, r["text"], r["confidence"], r["x"], r["y"], r["width"], r["height"]) for r in ocr_regions]
+        )
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def import_results(self, directory: Union[str, Path]) -> int:
+        """
+        既存のJSON・NDJSONの解析結果をまとめて取り込みます
+
+        Args:
+            directory (Union[str, Path]): 解析結果のディレクトリ
+
+        Returns:
+            int: 取り込んだ件数
+        """
+        count = 0
+        batch = []
+        for record in iter_records(directory):
+            if "analysis" not in record:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                count += self.add_results(batch)
+                batch = []
+        if batch:
+            count += self.add_results(batch)
+
+        logger.info(f"{count}件の解析結果を取り込みました: {directory}")
+        return count
+
+    def query_images(self, since: Union[str, datetime.datetime, datetime.date, None] = None,
+                     until: Union[str, datetime.datetime, datetime.date, None] = None,
+                     label: Optional[str] = None, min_confidence: Optional[float] = None,
+                     min_brightness: Optional[float] = None, max_brightness: Optional[float] = None,
+                     theme: Optional[str] = None, text: Optional[str] = None,
+                     limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """
+        条件に合う画像を新しい順に検索します
+
+        Args:
+            since (Union[str, datetime, date, None]): この日時以降に解析された画像
+            until (Union[str, datetime, date, None]): この日時より前に解析された画像
+            label (Optional[str]): このラベルの物体が検出された画像
+            min_confidence (Optional[float]): 検出物体の信頼度の下限（label と組み合わせ可）
+            min_brightness (Optional[float]): 明るさ (%) の下限
+            max_brightness (Optional[float]): 明るさ (%) の上限
+            theme (Optional[str]): 配色テーマ（dark / light / mixed）
+            text (Optional[str]): OCRで認識されたテキストに含まれる文字列
+            limit (Optional[int]): 最大件数（Noneの場合は全件）
+
+        Returns:
+            List[Dict[str, Any]]: 画像のレコード
+        """
+        conditions = []
+        params = []
+
+        if since is not None:
+            conditions.append("i.timestamp >= ?")
+            params.append(_to_timestamp(since))
+        if until is not None:
+            conditions.append("i.timestamp < ?")
+            params.append(_to_timestamp(until))
+        if min_brightness is not None:
+            conditions.append("i.brightness_percent >= ?")
+            params.append(min_brightness)
+        if max_brightness is not None:
+            conditions.append("i.brightness_percent <= ?")
+            params.append(max_brightness)
+        if theme is not None:
+            conditions.append("i.theme = ?")
+            params.append(theme)
+        if label is not None or min_confidence is not None:
+            detection_conditions = ["d.image_id = i.id"]
+            if label is not None:
+                detection_conditions.append("d.label = ?")
+                params.append(label)
+            if min_confidence is not None:
+                detection_conditions.append("d.confidence >= ?")
+                params.append(min_confidence)
+            conditions.append(f"EXISTS (SELECT 1 FROM detections d WHERE {' AND '.join(detection_conditions)})")
+        if text is not None:
+            conditions.append("EXISTS (SELECT 1 FROM ocr_regions o WHERE o.image_id = i.id AND o.text LIKE ?)")
+            params.append(f"%{text}%")
+
+        sql = "SELECT i.* FROM images i"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY i.timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_detections(self, image_id: int) -> List[Dict[str, Any]]:
+        """
+        画像の検出物体を取得します
+
+        Args:
+            image_id (int): 画像のID
+
+        Returns:
+            List[Dict[str, Any]]: 検出物体のレコード
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM detections WHERE image_id = ? ORDER BY confidence DESC", (image_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_ocr_regions(self, image_id: int) -> List[Dict[str, Any]]:
+        """
+        画像のOCR領域を取得します
+
+        Args:
+            image_id (int): 画像のID
+
+        Returns:
+            List[Dict[str, Any]]: OCR領域のレコード
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM ocr_regions WHERE image_id = ? ORDER BY y, x", (image_id,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def label_counts(self, since: Union[str, datetime.datetime, datetime.date, None] = None,
+                     until: Union[str, datetime.datetime, datetime.date, None] = None) -> Dict[str, int]:
+        """
+        ラベルごとの検出数を集計します
+
+        Args:
+            since (Union[str, datetime, date, None]): この日時以降に解析された画像
+            until (Union[str, datetime, date, None]): この日時より前に解析された画像
+
+        Returns:
+            Dict[str, int]: ラベルごとの検出数
+        """
+        sql = "SELECT d.label, COUNT(*) AS count FROM detections d JOIN images i ON i.id = d.image_id WHERE 1 = 1"
+        params = []
+        if since is not None:
+            sql += " AND i.timestamp >= ?"
+            params.append(_to_timestamp(since))
+        if until is not None:
+            sql += " AND i.timestamp < ?"
+            params.append(_to_timestamp(until))
+        sql += " GROUP BY d.label ORDER BY count DESC"
+
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return {row["label"]: row["count"] for row in rows}
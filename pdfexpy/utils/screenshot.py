@@ -23,6 +23,7 @@ except ImportError:
     PYAUTOGUI_AVAILABLE = False
 
 from .logger import get_logger
+from .metrics import get_metrics
 
 logger = get_logger(__name__)
 
@@ -204,4 +205,5 @@ def take_screenshot(output_dir="screenshots", method="auto", filename=None,
     if not success:
         raise ScreenshotError(error or "不明なエラーが発生しました")
     
+    get_metrics().inc("pdfexpy_frames_captured_total", method=method.lower())
     return success, filepath, error 
\ No newline at end of file
@@ -15,6 +15,12 @@ import pyautogui
 
 from pdfexpy.models import YOLOModel
 from pdfexpy.utils.image_processing import visualize_annotations
+from pdfexpy.utils.image_context import ImageContext
+from pdfexpy.utils.overlay import build_overlay, write_overlay, preview_max_dimension
+from pdfexpy.utils.config import DEFAULT_CONFIG
+from pdfexpy.utils.manifest import model_identity
+from pdfexpy.utils.perf import StageTimer, build_performance, get_perf_stats
+from pdfexpy.utils.metrics import get_metrics
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -46,6 +52,7 @@ def take_screenshot(output_dir: str = "screenshots", prefix: str = "debug") -> O
         
         # 画像ファイルとして保存
         screenshot.save(filepath)
+        get_metrics().inc("pdfexpy_frames_captured_total", method="pyautogui")
         
         logger.info(f"スクリーンショットを保存しました: {filepath}")
         return filepath
@@ -54,13 +61,73 @@ def take_screenshot(output_dir: str = "screenshots", prefix: str = "debug") -> O
         logger.error(f"スクリーンショットの取得中にエラーが発生しました: {str(e)}")
         return None
 
+def _imwrite_params(path: str, quality: Optional[int]) -> list:
+    """
+    cv2.imwrite に渡す品質のパラメータを取得します
+    
+    Args:
+        path: 出力ファイルのパス
+        quality: .jpg / .webp の品質 (1-100)。Noneの場合は形式の既定値
+        
+    Returns:
+        list: cv2.imwrite のパラメータ
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if not quality:
+        return []
+    if suffix in (".jpg", ".jpeg"):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    if suffix == ".webp":
+        return [cv2.IMWRITE_WEBP_QUALITY, int(quality)]
+    return []
+
+def _write_visual_feedback(context: ImageContext, objects: list, screenshot_path: str, visual_path: str,
+                           visual_format: str, preview: Optional[Dict]):
+    """
+    検出結果の視覚的フィードバックを保存します
+    
+    Args:
+        context: 検出時にデコード済みの画像コンテキスト
+        objects: 検出オブジェクトのリスト
+        screenshot_path: スクリーンショットのパス
+        visual_path: 出力ファイルのパス
+        visual_format: 視覚的フィードバックの形式（svg / json / png / jpg / webp）
+        preview: 描き込んだ画像の縮小・品質の設定（Noneの場合は設定の既定値）
+    """
+    if visual_format in ("svg", "json"):
+        # 元画像に重ねるオーバーレイとして保存（画像の再エンコードは行わない）
+        overlay = build_overlay({"analysis": {"objects": objects}}, context.width, context.height,
+                                screenshot_path, include_panels=False)
+        write_overlay(overlay, visual_path)
+    else:
+        # プレビューの大きさに縮小してから、縮尺に合わせて枠を描画する
+        # （縮小しない場合は検出時にデコード済みのBGR配列に直接描画する。以降は使用しない）
+        if preview is None:
+            preview = DEFAULT_CONFIG["preview"]
+        image = context.bgr
+        scale = 1.0
+        max_dimension = preview_max_dimension(preview)
+        if max_dimension and max(context.width, context.height) > max_dimension:
+            scale = max_dimension / max(context.width, context.height)
+            size = (max(1, round(context.width * scale)), max(1, round(context.height * scale)))
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        
+        annotated_image = visualize_annotations(
+            image=image,
+            objects=objects,
+            scale=scale
+        )
+        cv2.imwrite(visual_path, annotated_image, _imwrite_params(visual_path, preview.get("quality")))
+
 def analyze_screenshot(
     screenshot_path: Optional[str] = None,
     output_dir: str = "analysis_results",
     model_path: Optional[str] = None,
     confidence: float = 0.25,
     take_new_screenshot: bool = False,
-    screenshot_prefix: str = "debug"
+    screenshot_prefix: str = "debug",
+    visual_format: str = "svg",
+    preview: Optional[Dict] = None
 ) -> Dict:
     """
     スクリーンショットをYOLOv8モデルで解析します。
@@ -72,16 +139,20 @@ def analyze_screenshot(
         confidence: 検出の信頼度しきい値
         take_new_screenshot: 新しいスクリーンショットを撮影するかどうか
         screenshot_prefix: スクリーンショットファイル名の接頭辞
+        visual_format: 視覚的フィードバックの形式（svg / json はオーバーレイ、png / jpg / webp は描き込んだ画像）
+        preview: 描き込んだ画像の縮小・品質の設定（Noneの場合は設定の既定値）
         
     Returns:
-        Dict: 解析結果
+        Dict: 解析結果（performance にステージごとの処理時間・画像サイズ・モデルを含む）
     """
     start_time = time.time()
+    timer = StageTimer()
     
     try:
         # スクリーンショットのパスが指定されていない、または新しいスクリーンショットを撮影する場合
         if screenshot_path is None or take_new_screenshot:
-            screenshot_path = take_screenshot(output_dir="screenshots", prefix=screenshot_prefix)
+            with timer.stage("capture"):
+                screenshot_path = take_screenshot(output_dir="screenshots", prefix=screenshot_prefix)
             if screenshot_path is None:
                 return {
                     "success": False,
@@ -96,7 +167,9 @@ def analyze_screenshot(
         yolo = YOLOModel(model_path=model_path, confidence=confidence)
         
         # モデルをロード
-        if not yolo.load():
+        with timer.stage("model_load"):
+            loaded = yolo.load()
+        if not loaded:
             return {
                 "success": False,
                 "error": "YOLOモデルのロードに失敗しました",
@@ -104,8 +177,14 @@ def analyze_screenshot(
                 "time_taken": time.time() - start_time
             }
         
+        # 画像を一度だけデコードし、検出と描画で共有する
+        with timer.stage("decode"):
+            context = ImageContext(screenshot_path)
+            context.bgr
+        
         # オブジェクト検出を実行
-        detection_results = yolo.detect(screenshot_path)
+        with timer.stage("inference"):
+            detection_results = yolo.detect(context)
         
         if "error" in detection_results:
             return {
@@ -122,28 +201,19 @@ def analyze_screenshot(
         # JSONファイルに結果を保存
         json_path = os.path.join(output_dir, f"{filename_without_ext}-analysis.json")
         
-        # 視覚的フィードバックを生成
-        image = cv2.imread(screenshot_path)
-        if image is None:
-            return {
-                "success": False,
-                "error": f"画像の読み込みに失敗しました: {screenshot_path}",
-                "time_taken": time.time() - start_time
-            }
-        
         # 検出されたオブジェクトを描画
         objects = detection_results.get("objects", [])
         
+        def performance():
+            result = build_performance(timer.elapsed_seconds(), timer.stages_ms(), context.width, context.height,
+                                       "yolov8", model_identity(False, yolo.model_path))
+            get_perf_stats().add(result)
+            return result
+        
         if objects:
-            # 結果を視覚化
-            annotated_image = visualize_annotations(
-                image=image.copy(),
-                objects=objects
-            )
-            
-            # 視覚的フィードバックを保存
-            visual_path = os.path.join(output_dir, f"{filename_without_ext}-visual.png")
-            cv2.imwrite(visual_path, annotated_image)
+            visual_path = os.path.join(output_dir, f"{filename_without_ext}-visual.{visual_format}")
+            with timer.stage("render"):
+                _write_visual_feedback(context, objects, screenshot_path, visual_path, visual_format, preview)
             
             logger.info(f"視覚的フィードバックを保存しました: {visual_path}")
             logger.info(f"検出されたオブジェクト: {len(objects)}個")
@@ -154,7 +224,8 @@ def analyze_screenshot(
                 "visual_feedback": visual_path,
                 "detection_results": detection_results,
                 "objects_count": len(objects),
-                "time_taken": time.time() - start_time
+                "time_taken": time.time() - start_time,
+                "performance": performance()
             }
         else:
             logger.info("オブジェクトが検出されませんでした")
@@ -165,7 +236,8 @@ def analyze_screenshot(
                 "visual_feedback": None,
                 "detection_results": detection_results,
                 "objects_count": 0,
-                "time_taken": time.time() - start_time
+                "time_taken": time.time() - start_time,
+                "performance": performance()
             }
     
     except Exception as e:
@@ -0,0 +1,136 @@
+"""
+スクリーンショット向けのテキスト領域検出モジュール
+
+モルフォロジー勾配と横方向のクロージングで文字を行単位にまとめ、
+テキスト行のバウンディングボックスをCPUのみで数ミリ秒で提案します。
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def propose_text_regions(
+    image: np.ndarray,
+    min_height: int = 6,
+    max_height: int = 120,
+    min_width: int = 8,
+    min_fill_ratio: float = 0.2,
+    max_dimension: Optional[int] = 1920
+) -> List[Dict]:
+    """
+    画像からテキスト行らしい領域を提案します
+
+    Args:
+        image: RGB画像またはグレースケール画像 (uint8)
+        min_height: 採用する領域の最小の高さ（元画像のピクセル）
+        max_height: 採用する領域の最大の高さ（元画像のピクセル）
+        min_width: 採用する領域の最小の幅（元画像のピクセル）
+        min_fill_ratio: 領域内でエッジが占める割合の下限（背景やアイコンの除外用）
+        max_dimension: 処理前に縮小する最大サイズ。Noneの場合は縮小しない
+
+    Returns:
+        List[Dict]: テキスト行のバウンディングボックスのリスト（上から下、左から右の順）
+    """
+    if image.ndim == 3:
+        gray = cv2.cvtColor(np.ascontiguousarray(image[:, :, :3]), cv2.COLOR_RGB2GRAY)
+    else:
+        gray = image
+
+    height, width = gray.shape[:2]
+
+    # 大きな画像は縮小して処理する（テキスト行の検出には十分な解像度）
+    scale = 1.0
+    if max_dimension and max(height, width) > max_dimension:
+        scale = max_dimension / max(height, width)
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    # 文字の輪郭を強調する
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+    _, edges = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    # 横方向に閉じて、隣接する文字をまとめる
+    line_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    lines = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, line_kernel)
+
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    # 単語間の空白は文字の高さに比例するため、同じ行の近い塊をまとめる
+    boxes = merge_line_boxes([cv2.boundingRect(c) for c in contours])
+
+    regions = []
+    for x, y, w, h in boxes:
+        # 元画像の座標に戻す
+        ox, oy = int(x / scale), int(y / scale)
+        ow, oh = int(np.ceil(w / scale)), int(np.ceil(h / scale))
+
+        if oh < min_height or oh > max_height or ow < min_width:
+            continue
+
+        # エッジが疎な領域は文字ではないとみなす
+        fill_ratio = cv2.countNonZero(edges[y:y + h, x:x + w]) / float(w * h)
+        if fill_ratio < min_fill_ratio:
+            continue
+
+        regions.append({
+            "x": ox,
+            "y": oy,
+            "width": min(ow, width - ox),
+            "height": min(oh, height - oy)
+        })
+
+    regions.sort(key=lambda r: (r["y"], r["x"]))
+    return regions
+
+
+def merge_line_boxes(boxes: List[Tuple[int, int, int, int]], gap_ratio: float = 1.0,
+                     overlap_ratio: float = 0.5) -> List[Tuple[int, int, int, int]]:
+    """
+    同じ行に並ぶ近接したボックスを1つのテキスト行にまとめます
+
+    Args:
+        boxes: (x, y, width, height) のリスト
+        gap_ratio: まとめる横方向の間隔の上限（ボックスの高さに対する比率）
+        overlap_ratio: 同じ行とみなす縦方向の重なりの下限（低い方の高さに対する比率）
+
+    Returns:
+        List[Tuple[int, int, int, int]]: まとめた (x, y, width, height) のリスト
+    """
+    if not boxes:
+        return []
+
+    # 縦方向を一定の高さの帯に分け、各帯にかかる行だけを比較対象にする
+    band = max(8, int(np.median([b[3] for b in boxes])))
+    rows: Dict[int, List[int]] = defaultdict(list)
+
+    lines = []
+    for x, y, w, h in sorted(boxes):
+        candidates = set()
+        for r in range((y - 1) // band, (y + h) // band + 1):
+            candidates.update(rows.get(r, ()))
+
+        for i in sorted(candidates):
+            lx, ly, lw, lh = lines[i]
+            overlap = min(ly + lh, y + h) - max(ly, y)
+            gap = x - (lx + lw)
+            if overlap >= overlap_ratio * min(lh, h) and gap <= gap_ratio * max(lh, h):
+                nx0, ny0 = min(lx, x), min(ly, y)
+                nx1, ny1 = max(lx + lw, x + w), max(ly + lh, y + h)
+                lines[i] = (nx0, ny0, nx1 - nx0, ny1 - ny0)
+                # 行が縦に広がった場合は新たにかかる帯にも登録する
+                for r in range(ny0 // band, (ny1 - 1) // band + 1):
+                    if not ly // band <= r <= (ly + lh - 1) // band:
+                        rows[r].append(i)
+                break
+        else:
+            for r in range(y // band, (y + h - 1) // band + 1):
+                rows[r].append(len(lines))
+            lines.append((x, y, w, h))
+    return lines
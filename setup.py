@@ -32,6 +32,8 @@ setup(
     entry_points={
         "console_scripts": [
             "pdfexpy=pdfexpy.app:main",
+            "pdfexpy-batch=pdfexpy.utils.batch:main",
+            "pdfexpy-perf=pdfexpy.utils.perf:main",
         ],
     },
     classifiers=[